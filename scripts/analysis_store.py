@@ -0,0 +1,234 @@
+"""
+분석 결과 컬럼 저장소 (Parquet)
+analyze_chat_errors.py의 상세 결과를 실행(run) 단위로 파티션된 Parquet 테이블에 누적합니다.
+
+- issues: 문제 하나당 한 행
+- scores: 대화 하나당 한 행
+
+analysis_results/columnar/{issues,scores}/run=<타임스탬프>/part-0.parquet 형태로
+추가만 하므로, 여러 실행을 비교할 때 필요한 컬럼/실행만 읽을 수 있습니다.
+pyarrow가 설치되어 있어야 합니다 (pip install pyarrow).
+"""
+
+import os
+import sys
+import io
+import glob
+import json
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DEFAULT_STORE_DIR = os.path.join('analysis_results', 'columnar')
+RUN_PARTITION = 'run'
+
+if pa is not None:
+    ISSUE_SCHEMA = pa.schema([
+        ('error_key', pa.string()),
+        ('persona_id', pa.string()),
+        ('persona_name', pa.string()),
+        ('message_index', pa.int32()),
+        ('type', pa.string()),
+        ('severity', pa.string()),
+        ('description', pa.string()),
+        ('user_message', pa.string()),
+        ('ai_response', pa.string()),
+        ('suggestion', pa.string()),
+    ])
+    SCORE_SCHEMA = pa.schema([
+        ('error_key', pa.string()),
+        ('persona_id', pa.string()),
+        ('persona_name', pa.string()),
+        ('overall_coherence', pa.float64()),
+        ('topic_consistency', pa.float64()),
+        ('natural_flow', pa.float64()),
+        ('issue_count', pa.int32()),
+        ('critical_issue_count', pa.int32()),
+        ('greeting_repetitions', pa.int32()),
+        ('macro_pattern_count', pa.int32()),
+    ])
+    TABLE_SCHEMAS = {'issues': ISSUE_SCHEMA, 'scores': SCORE_SCHEMA}
+
+
+def is_available() -> bool:
+    """pyarrow 설치 여부"""
+    return pa is not None
+
+
+def issue_rows(detailed_results: List[Dict]) -> List[Dict]:
+    """상세 결과를 문제 단위 행으로 펼칩니다."""
+    rows = []
+    for result in detailed_results:
+        for issue in result.get('issues', []):
+            rows.append({
+                'error_key': result.get('error_key'),
+                'persona_id': result.get('persona_id'),
+                'persona_name': result.get('persona_name'),
+                'message_index': issue.get('message_index'),
+                'type': issue.get('type'),
+                'severity': issue.get('severity'),
+                'description': issue.get('description'),
+                'user_message': issue.get('user_message'),
+                'ai_response': issue.get('ai_response'),
+                'suggestion': issue.get('suggestion'),
+            })
+    return rows
+
+
+def score_rows(detailed_results: List[Dict]) -> List[Dict]:
+    """상세 결과를 대화 단위 점수 행으로 변환합니다."""
+    rows = []
+    for result in detailed_results:
+        scores = result.get('scores', {})
+        issues = result.get('issues', [])
+        rows.append({
+            'error_key': result.get('error_key'),
+            'persona_id': result.get('persona_id'),
+            'persona_name': result.get('persona_name'),
+            'overall_coherence': scores.get('overall_coherence'),
+            'topic_consistency': scores.get('topic_consistency'),
+            'natural_flow': scores.get('natural_flow'),
+            'issue_count': len(issues),
+            'critical_issue_count': sum(1 for i in issues if i.get('severity') == 'critical'),
+            'greeting_repetitions': result.get('greeting_repetitions', 0),
+            'macro_pattern_count': len(result.get('macro_patterns', [])),
+        })
+    return rows
+
+
+def _write_partition(store_dir: str, table_name: str, run: str, rows: List[Dict]) -> str:
+    """실행 파티션에 새 파트 파일을 추가합니다 (기존 파일은 건드리지 않음)."""
+    partition_dir = os.path.join(store_dir, table_name, f'{RUN_PARTITION}={run}')
+    os.makedirs(partition_dir, exist_ok=True)
+
+    part = len(glob.glob(os.path.join(partition_dir, 'part-*.parquet')))
+    path = os.path.join(partition_dir, f'part-{part}.parquet')
+
+    table = pa.Table.from_pylist(rows, schema=TABLE_SCHEMAS[table_name])
+    # 쓰는 도중 읽혀도 깨진 파일이 보이지 않도록 임시 파일로 쓴 뒤 교체
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+def append_run(detailed_results: List[Dict], run: str,
+               store_dir: str = DEFAULT_STORE_DIR) -> Optional[Tuple[str, str]]:
+    """한 번의 분석 실행 결과를 컬럼 저장소에 추가합니다.
+
+    pyarrow가 없으면 경고만 출력하고 None을 반환합니다.
+    """
+    if not is_available():
+        print("⚠️  pyarrow가 설치되지 않아 컬럼 저장소 기록을 건너뜁니다 (pip install pyarrow)")
+        return None
+
+    issues_path = _write_partition(store_dir, 'issues', run, issue_rows(detailed_results))
+    scores_path = _write_partition(store_dir, 'scores', run, score_rows(detailed_results))
+    return issues_path, scores_path
+
+
+def list_runs(store_dir: str = DEFAULT_STORE_DIR, table_name: str = 'scores') -> List[str]:
+    """저장된 실행 타임스탬프 목록 (파일을 읽지 않고 디렉토리 이름만 사용)"""
+    prefix = f'{RUN_PARTITION}='
+    table_dir = os.path.join(store_dir, table_name)
+    if not os.path.isdir(table_dir):
+        return []
+    return sorted(name[len(prefix):] for name in os.listdir(table_dir) if name.startswith(prefix))
+
+
+def _read_table(store_dir: str, table_name: str, columns: Optional[List[str]], runs: Optional[List[str]]):
+    if not is_available():
+        raise RuntimeError("pyarrow가 필요합니다: pip install pyarrow")
+
+    table_dir = os.path.join(store_dir, table_name)
+    if not os.path.isdir(table_dir):
+        return TABLE_SCHEMAS[table_name].append(pa.field(RUN_PARTITION, pa.string())).empty_table()
+
+    dataset = ds.dataset(
+        table_dir,
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([(RUN_PARTITION, pa.string())]), flavor='hive'),
+        exclude_invalid_files=True
+    )
+    row_filter = ds.field(RUN_PARTITION).isin(runs) if runs else None
+    return dataset.to_table(columns=columns, filter=row_filter)
+
+
+def read_issues(store_dir: str = DEFAULT_STORE_DIR, columns: Optional[List[str]] = None,
+                runs: Optional[List[str]] = None):
+    """문제 테이블에서 필요한 컬럼/실행만 읽습니다 (pyarrow.Table)."""
+    return _read_table(store_dir, 'issues', columns, runs)
+
+
+def read_scores(store_dir: str = DEFAULT_STORE_DIR, columns: Optional[List[str]] = None,
+                runs: Optional[List[str]] = None):
+    """점수 테이블에서 필요한 컬럼/실행만 읽습니다 (pyarrow.Table)."""
+    return _read_table(store_dir, 'scores', columns, runs)
+
+
+def backfill_from_json(analysis_dir: str = 'analysis_results', store_dir: str = DEFAULT_STORE_DIR) -> int:
+    """기존 detailed_*.json 파일 중 저장소에 없는 실행을 가져옵니다."""
+    existing = set(list_runs(store_dir))
+    imported = 0
+
+    for path in sorted(glob.glob(os.path.join(analysis_dir, 'detailed_*.json'))):
+        run = os.path.basename(path)[len('detailed_'):-len('.json')]
+        if run in existing:
+            continue
+
+        with open(path, 'r', encoding='utf-8') as f:
+            detailed_results = json.load(f)
+
+        if append_run(detailed_results, run, store_dir) is None:
+            break
+        imported += 1
+        print(f"  - {run}: 대화 {len(detailed_results)}개")
+
+    return imported
+
+
+def print_issue_type_counts(store_dir: str = DEFAULT_STORE_DIR):
+    """실행별 문제 유형 건수 (run, type 컬럼만 읽음)"""
+    table = read_issues(store_dir, columns=[RUN_PARTITION, 'type'])
+    counts = table.group_by([RUN_PARTITION, 'type']).aggregate([('type', 'count')])
+
+    by_run = {}
+    for row in counts.to_pylist():
+        by_run.setdefault(row[RUN_PARTITION], {})[row['type']] = row['type_count']
+
+    for run in sorted(by_run):
+        types = ', '.join(f"{t}: {c}" for t, c in sorted(by_run[run].items(), key=lambda x: x[1], reverse=True))
+        print(f"  {run} | {types}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # UTF-8 인코딩 설정
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    parser = argparse.ArgumentParser(description='분석 결과 컬럼 저장소 도구')
+    parser.add_argument('--analysis-dir', type=str, default='analysis_results',
+                        help='detailed_*.json 파일이 있는 폴더 (기본: analysis_results)')
+    parser.add_argument('--store-dir', type=str, default=DEFAULT_STORE_DIR,
+                        help=f'컬럼 저장소 폴더 (기본: {DEFAULT_STORE_DIR})')
+    parser.add_argument('--backfill', action='store_true', help='기존 JSON 결과를 저장소로 가져오기')
+    args = parser.parse_args()
+
+    if not is_available():
+        print("Error: pyarrow 패키지가 설치되지 않았습니다.")
+        print("설치: pip install pyarrow")
+        sys.exit(1)
+
+    if args.backfill:
+        print(f"📥 {args.analysis_dir}의 JSON 결과 가져오는 중...")
+        count = backfill_from_json(args.analysis_dir, args.store_dir)
+        print(f"✅ {count}개 실행 추가")
+
+    print(f"\n📊 실행별 문제 유형 ({len(list_runs(args.store_dir))}개 실행):")
+    print_issue_type_counts(args.store_dir)
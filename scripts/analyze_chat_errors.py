@@ -2,14 +2,22 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
 import json
+import hashlib
+import sqlite3
 from collections import defaultdict
 import sys
 import io
 import os
 import re
+import math
+import threading
+import queue
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
+from keyword_matcher import KeywordMatcher
+import analysis_store
 
 # UTF-8 인코딩 설정
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -67,16 +75,352 @@ class ConversationAnalysis:
     macro_patterns: List[str]
     analysis_timestamp: datetime
 
+# 모듈 로드 시 한 번만 컴파일/생성하는 패턴과 단어 집합
+WORD_PATTERN = re.compile(r'\w+')
+EMOTICON_PATTERN = re.compile(r'[ㅋㅎㅠㅜ~!?♥♡💕😊😭.]+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+KEYWORD_STOPWORDS = frozenset(['은', '는', '이', '가', '을', '를', '에', '에서', '으로', '와', '과', '도', '만', '의', '로', '라', '고'])
+GREETING_KEYWORDS = ('안녕', '반가워', '만나서', '처음', '인사', 'hi', 'hello')
+GREETING_REPLY_WORDS = ('안녕', '반가워', 'hi', 'hello', '하이', '헬로')
+QUESTION_MARKERS = ('?', '뭐', '무엇', '어떻게', '왜', '언제', '어디', '누구', '얼마나', '무슨')
+QUESTION_TYPE_ANSWERS = (
+    ('뭐해', ('하고', '있어', '중', '지금')),
+    ('어때', ('좋', '괜찮', '별로', '그저')),
+    ('먹었', ('먹', '밥', '아직', '배고')),
+    ('어디', ('집', '회사', '학교', '카페', '여기')),
+)
+POSITIVE_KEYWORDS = ('좋아', '좋은', '행복', '기뻐', '사랑', '최고', '멋진', '훌륭')
+NEGATIVE_KEYWORDS = ('싫어', '나쁜', '슬퍼', '화나', '짜증', '최악', '별로')
+
+# 다국어 지원 - 사용자가 지적한 문제 타입 키워드 (등록 순서가 우선순위)
+PROBLEM_KEYWORDS = {
+    # 한국어
+    '이상': IssueSeverity.HIGH,
+    '안맞': IssueSeverity.HIGH,
+    '반복': IssueSeverity.MEDIUM,
+    '엉뚱': IssueSeverity.HIGH,
+    '무시': IssueSeverity.HIGH,
+    '대답안': IssueSeverity.CRITICAL,
+    '말안됨': IssueSeverity.CRITICAL,
+    '어색': IssueSeverity.MEDIUM,
+    '끊': IssueSeverity.HIGH,
+    '갑자기': IssueSeverity.MEDIUM,
+    '맥락': IssueSeverity.HIGH,
+    '관련없': IssueSeverity.HIGH,
+    '틀린': IssueSeverity.HIGH,
+    '잘못': IssueSeverity.HIGH,
+    '줄바꿈': IssueSeverity.MEDIUM,
+    '줄바꾸기': IssueSeverity.MEDIUM,
+    '띄어쓰기': IssueSeverity.LOW,
+    
+    # 영어
+    'strange': IssueSeverity.HIGH,
+    'weird': IssueSeverity.HIGH,
+    'wrong': IssueSeverity.HIGH,
+    'repeat': IssueSeverity.MEDIUM,
+    'repetitive': IssueSeverity.MEDIUM,
+    'ignore': IssueSeverity.HIGH,
+    'ignored': IssueSeverity.HIGH,
+    'no answer': IssueSeverity.CRITICAL,
+    'no response': IssueSeverity.CRITICAL,
+    'awkward': IssueSeverity.MEDIUM,
+    'sudden': IssueSeverity.MEDIUM,
+    'suddenly': IssueSeverity.MEDIUM,
+    'context': IssueSeverity.HIGH,
+    'unrelated': IssueSeverity.HIGH,
+    'irrelevant': IssueSeverity.HIGH,
+    'incorrect': IssueSeverity.HIGH,
+    'error': IssueSeverity.HIGH,
+    'line break': IssueSeverity.MEDIUM,
+    'newline': IssueSeverity.MEDIUM,
+    'spacing': IssueSeverity.LOW,
+    
+    # 일본어
+    'おかしい': IssueSeverity.HIGH,
+    '変': IssueSeverity.HIGH,
+    '繰り返': IssueSeverity.MEDIUM,
+    '無視': IssueSeverity.HIGH,
+    '答えない': IssueSeverity.CRITICAL,
+    '違う': IssueSeverity.HIGH,
+    '間違': IssueSeverity.HIGH,
+    '改行': IssueSeverity.MEDIUM,
+    
+    # 중국어
+    '奇怪': IssueSeverity.HIGH,
+    '错误': IssueSeverity.HIGH,
+    '重复': IssueSeverity.MEDIUM,
+    '忽略': IssueSeverity.HIGH,
+    '没回答': IssueSeverity.CRITICAL,
+    '不对': IssueSeverity.HIGH,
+    '换行': IssueSeverity.MEDIUM,
+    
+    # 태국어 (Thai)
+    'แปลก': IssueSeverity.HIGH,
+    'ผิด': IssueSeverity.HIGH,
+    'ซ้ำ': IssueSeverity.MEDIUM,
+    'ไม่ตอบ': IssueSeverity.CRITICAL,
+    'ขัดจังหวะ': IssueSeverity.HIGH,
+    
+    # 베트남어 (Vietnamese)
+    'lạ': IssueSeverity.HIGH,
+    'sai': IssueSeverity.HIGH,
+    'lặp lại': IssueSeverity.MEDIUM,
+    'bỏ qua': IssueSeverity.HIGH,
+    'không trả lời': IssueSeverity.CRITICAL,
+    
+    # 인도네시아어 (Indonesian)
+    'aneh': IssueSeverity.HIGH,
+    'salah': IssueSeverity.HIGH,
+    'berulang': IssueSeverity.MEDIUM,
+    'abaikan': IssueSeverity.HIGH,
+    'tidak menjawab': IssueSeverity.CRITICAL,
+    
+    # 타갈로그어 (Tagalog)
+    'kakaiba': IssueSeverity.HIGH,
+    'mali': IssueSeverity.HIGH,
+    'paulit-ulit': IssueSeverity.MEDIUM,
+    'hindi sumagot': IssueSeverity.CRITICAL,
+    
+    # 스페인어 (Spanish)
+    'extraño': IssueSeverity.HIGH,
+    'raro': IssueSeverity.HIGH,
+    'incorrecto': IssueSeverity.HIGH,
+    'repetir': IssueSeverity.MEDIUM,
+    'ignorar': IssueSeverity.HIGH,
+    'sin respuesta': IssueSeverity.CRITICAL,
+    
+    # 프랑스어 (French)
+    'étrange': IssueSeverity.HIGH,
+    'bizarre': IssueSeverity.HIGH,
+    'incorrect': IssueSeverity.HIGH,
+    'répéter': IssueSeverity.MEDIUM,
+    'ignorer': IssueSeverity.HIGH,
+    'pas de réponse': IssueSeverity.CRITICAL,
+    
+    # 독일어 (German)
+    'seltsam': IssueSeverity.HIGH,
+    'falsch': IssueSeverity.HIGH,
+    'wiederholen': IssueSeverity.MEDIUM,
+    'ignorieren': IssueSeverity.HIGH,
+    'keine antwort': IssueSeverity.CRITICAL,
+    
+    # 러시아어 (Russian)
+    'странный': IssueSeverity.HIGH,
+    'неправильный': IssueSeverity.HIGH,
+    'повторять': IssueSeverity.MEDIUM,
+    'игнорировать': IssueSeverity.HIGH,
+    'нет ответа': IssueSeverity.CRITICAL,
+    
+    # 포르투갈어 (Portuguese)
+    'estranho': IssueSeverity.HIGH,
+    'errado': IssueSeverity.HIGH,
+    'repetir': IssueSeverity.MEDIUM,
+    'ignorar': IssueSeverity.HIGH,
+    'sem resposta': IssueSeverity.CRITICAL,
+    
+    # 이탈리아어 (Italian)
+    'strano': IssueSeverity.HIGH,
+    'sbagliato': IssueSeverity.HIGH,
+    'ripetere': IssueSeverity.MEDIUM,
+    'ignorare': IssueSeverity.HIGH,
+    'nessuna risposta': IssueSeverity.CRITICAL,
+    
+    # 네덜란드어 (Dutch)
+    'vreemd': IssueSeverity.HIGH,
+    'fout': IssueSeverity.HIGH,
+    'herhalen': IssueSeverity.MEDIUM,
+    'negeren': IssueSeverity.HIGH,
+    'geen antwoord': IssueSeverity.CRITICAL,
+    
+    # 스웨덴어 (Swedish)
+    'konstig': IssueSeverity.HIGH,
+    'fel': IssueSeverity.HIGH,
+    'upprepa': IssueSeverity.MEDIUM,
+    'ignorera': IssueSeverity.HIGH,
+    'inget svar': IssueSeverity.CRITICAL,
+    
+    # 폴란드어 (Polish)
+    'dziwny': IssueSeverity.HIGH,
+    'błędny': IssueSeverity.HIGH,
+    'powtarzać': IssueSeverity.MEDIUM,
+    'ignorować': IssueSeverity.HIGH,
+    'brak odpowiedzi': IssueSeverity.CRITICAL,
+    
+    # 터키어 (Turkish)
+    'garip': IssueSeverity.HIGH,
+    'yanlış': IssueSeverity.HIGH,
+    'tekrar': IssueSeverity.MEDIUM,
+    'görmezden': IssueSeverity.HIGH,
+    'cevap yok': IssueSeverity.CRITICAL,
+    
+    # 아랍어 (Arabic)
+    'غريب': IssueSeverity.HIGH,
+    'خطأ': IssueSeverity.HIGH,
+    'تكرار': IssueSeverity.MEDIUM,
+    'تجاهل': IssueSeverity.HIGH,
+    'لا جواب': IssueSeverity.CRITICAL,
+    
+    # 힌디어 (Hindi)
+    'अजीब': IssueSeverity.HIGH,
+    'गलत': IssueSeverity.HIGH,
+    'दोहराना': IssueSeverity.MEDIUM,
+    'अनदेखा': IssueSeverity.HIGH,
+    'कोई जवाब नहीं': IssueSeverity.CRITICAL,
+    
+    # 우르두어 (Urdu)
+    'عجیب': IssueSeverity.HIGH,
+    'غلط': IssueSeverity.HIGH,
+    'دہرانا': IssueSeverity.MEDIUM,
+    'نظرانداز': IssueSeverity.HIGH,
+    'کوئی جواب نہیں': IssueSeverity.CRITICAL,
+}
+
+# "Problem Message:" 등 문제 메시지 인용 표시 (다국어 지원)
+PROBLEM_MESSAGE_MARKERS = (
+    'Problem Message:', 'problem message:',
+    '문제 메시지:', '오류 메시지:',
+    'Error Message:', 'error message:',
+    '問題メッセージ:', 'エラーメッセージ:',
+    '问题消息:', '错误消息:'
+)
+
+# 키워드 기반 탐지기가 공유하는 컴파일된 매처
+PROBLEM_KEYWORD_MATCHER = KeywordMatcher(PROBLEM_KEYWORDS, ignore_case=True)
+PROBLEM_MESSAGE_MATCHER = KeywordMatcher(PROBLEM_MESSAGE_MARKERS)
+GREETING_MATCHER = KeywordMatcher(GREETING_KEYWORDS)
+GREETING_REPLY_MATCHER = KeywordMatcher(GREETING_REPLY_WORDS)
+QUESTION_MARKER_MATCHER = KeywordMatcher(QUESTION_MARKERS)
+POSITIVE_MATCHER = KeywordMatcher(POSITIVE_KEYWORDS)
+NEGATIVE_MATCHER = KeywordMatcher(NEGATIVE_KEYWORDS)
+
+@dataclass(frozen=True)
+class MessageFeatures:
+    """메시지 하나에서 한 번만 계산해 두는 특징값"""
+    text: str
+    lower: str
+    normalized: str  # 이모티콘/공백 정리 후 소문자
+    keywords: Tuple[str, ...]  # 불용어 제거, 2글자 이상
+    keyword_set: frozenset
+    word_set: frozenset  # 정규화 메시지의 공백 단위 단어 (유사도 계산용)
+
+def compute_message_features(text: str) -> MessageFeatures:
+    """메시지의 정규화/토큰화/키워드 추출을 한 번에 수행합니다."""
+    lower = text.lower()
+    
+    # 이모티콘 및 특수문자 제거 → 연속 공백 정리 → 소문자/양끝 공백 제거
+    normalized = WHITESPACE_PATTERN.sub(' ', EMOTICON_PATTERN.sub('', text)).lower().strip()
+    
+    keywords = tuple(word for word in WORD_PATTERN.findall(lower)
+                     if word not in KEYWORD_STOPWORDS and len(word) >= 2)
+    
+    return MessageFeatures(
+        text=text,
+        lower=lower,
+        normalized=normalized,
+        keywords=keywords,
+        keyword_set=frozenset(keywords),
+        word_set=frozenset(normalized.split())
+    )
+
+class MessageFeatureStore:
+    """대화 하나를 분석하는 동안 메시지별 특징값을 재사용하기 위한 저장소"""
+    
+    def __init__(self):
+        self._features: Dict[str, MessageFeatures] = {}
+    
+    def get(self, text: str) -> MessageFeatures:
+        features = self._features.get(text)
+        if features is None:
+            features = compute_message_features(text)
+            self._features[text] = features
+        return features
+
+# 유사 응답 판정 기준 (Jaccard 유사도)
+SIMILAR_RESPONSE_THRESHOLD = 0.7
+
+class SimilarResponseIndex:
+    """Jaccard 유사도가 기준을 넘는 메시지 쌍을 찾는 prefix-filtering 인덱스
+    
+    각 메시지를 한 번만 토큰화하고, 대화 내 출현 빈도가 낮은 토큰 순으로 정렬한
+    prefix 토큰만 역색인에 넣습니다. 유사도가 t 이상인 두 집합은 반드시 prefix
+    토큰을 하나 이상 공유하므로(PPJoin), 후보만 정확히 검증해도 전수 비교와
+    같은 결과를 얻습니다.
+    """
+    
+    def __init__(self, token_sets: List[frozenset], threshold: float = SIMILAR_RESPONSE_THRESHOLD):
+        self.token_sets = token_sets
+        self.threshold = threshold
+        
+        # 희귀 토큰이 앞에 오도록 전역 순서 결정
+        doc_freq = defaultdict(int)
+        for tokens in token_sets:
+            for token in tokens:
+                doc_freq[token] += 1
+        
+        self.postings = defaultdict(list)
+        for pos, tokens in enumerate(token_sets):
+            if not tokens:
+                continue
+            ordered = sorted(tokens, key=lambda t: (doc_freq[t], t))
+            for token in ordered[:self._prefix_length(len(tokens))]:
+                self.postings[token].append(pos)
+    
+    def _prefix_length(self, size: int) -> int:
+        # 부동소수점 오차로 prefix가 짧아지지 않도록 보정
+        return size - math.ceil(self.threshold * size - 1e-9) + 1
+    
+    def jaccard(self, pos1: int, pos2: int) -> float:
+        words1, words2 = self.token_sets[pos1], self.token_sets[pos2]
+        if not words1 or not words2:
+            return 0.0
+        return len(words1 & words2) / len(words1 | words2)
+    
+    def candidates_after(self, pos: int) -> List[int]:
+        """pos 이후 메시지 중 prefix 토큰을 공유하는 후보를 순서대로 반환합니다."""
+        tokens = self.token_sets[pos]
+        if not tokens:
+            return []
+        
+        size = len(tokens)
+        found = set()
+        for token in tokens:
+            for other in self.postings.get(token, ()):
+                if other > pos:
+                    found.add(other)
+        
+        # 크기 필터: |B| >= t|A| 이고 |A| >= t|B| 여야 유사도 t 이상 가능
+        return sorted(other for other in found
+                      if self.threshold * size <= len(self.token_sets[other]) + 1e-9
+                      and self.threshold * len(self.token_sets[other]) <= size + 1e-9)
+
 class ContextAnalyzer:
     """대화 맥락 분석기"""
     
-    def __init__(self):
+    def __init__(self, similarity_mode: str = 'index'):
         self.topic_keywords = {}
         self.conversation_patterns = []
+        # 유사 응답 탐지 방식: index(prefix 인덱스), exact(전수 비교), check(둘 다 실행해 비교)
+        self.similarity_mode = similarity_mode
+        # 분석 중인 대화의 메시지 특징값 저장소 (대화마다 새로 생성)
+        self._feature_store: Optional[MessageFeatureStore] = None
+    
+    def _features(self, text: str) -> MessageFeatures:
+        """메시지 특징값을 반환합니다 (대화 분석 중에는 캐시 사용)."""
+        if self._feature_store is not None:
+            return self._feature_store.get(text)
+        return compute_message_features(text)
         
     def analyze_conversation(self, messages: List[Dict], persona_name: str, persona_id: str, error_key: str, user_comment: str = "") -> ConversationAnalysis:
         """전체 대화를 분석하여 맥락 일관성을 평가합니다."""
-        
+        self._feature_store = MessageFeatureStore()
+        try:
+            return self._analyze_conversation(messages, persona_name, persona_id, error_key, user_comment)
+        finally:
+            self._feature_store = None
+    
+    def _analyze_conversation(self, messages: List[Dict], persona_name: str, persona_id: str,
+                              error_key: str, user_comment: str) -> ConversationAnalysis:
         context_issues = []
         greeting_count = 0
         macro_patterns = []
@@ -106,9 +450,8 @@ class ContextAnalyzer:
                     })
         
         # 1. 인사 반복 감지
-        greeting_keywords = ['안녕', '반가워', '만나서', '처음', '인사', 'hi', 'hello']
         for ai_idx, ai_content in ai_messages:
-            if any(keyword in ai_content.lower() for keyword in greeting_keywords):
+            if GREETING_MATCHER.contains_any(self._features(ai_content).lower):
                 greeting_count += 1
                 if greeting_count > 1:
                     context_issues.append(ContextIssue(
@@ -146,35 +489,21 @@ class ContextAnalyzer:
                 ai_message_counts[normalized] = 1
         
         # 유사 패턴 감지 (70% 이상 유사도)
-        for i, (idx1, content1) in enumerate(ai_messages):
-            for idx2, content2 in ai_messages[i+1:]:
-                similarity = self._calculate_similarity(content1, content2)
-                if similarity > 0.7 and content1 != content2:
-                    context_issues.append(ContextIssue(
-                        message_index=idx2,
-                        issue_type="similar_response",
-                        severity=IssueSeverity.HIGH,
-                        description=f"유사한 응답 패턴 (유사도: {similarity:.1%})",
-                        user_message="",
-                        ai_response=content2,
-                        suggestion="응답 템플릿 다양화 및 개성 표현 강화 필요"
-                    ))
-                    break
-        
-        # 3. 대화 쌍 맥락 분석
-        for pair in conversation_pairs:
-            issues = self._analyze_conversation_pair(
-                user_content=pair['user_content'],
-                ai_content=pair['ai_content'],
-                user_idx=pair['user_idx'],
-                ai_idx=pair['ai_idx'],
-                emotion=pair['emotion'],
-                previous_context=conversation_pairs[:conversation_pairs.index(pair)]
-            )
-            context_issues.extend(issues)
+        for pos, similarity in self._find_similar_responses(ai_messages):
+            idx2, content2 = ai_messages[pos]
+            context_issues.append(ContextIssue(
+                message_index=idx2,
+                issue_type="similar_response",
+                severity=IssueSeverity.HIGH,
+                description=f"유사한 응답 패턴 (유사도: {similarity:.1%})",
+                user_message="",
+                ai_response=content2,
+                suggestion="응답 템플릿 다양화 및 개성 표현 강화 필요"
+            ))
         
-        # 4. 전체 대화 흐름 분석
-        flow_issues = self._analyze_conversation_flow(conversation_pairs)
+        # 3~4. 대화 쌍 맥락 분석 + 전체 대화 흐름 분석 (한 번의 순회)
+        pair_issues, flow_issues, topic_score = self._analyze_pairs(conversation_pairs)
+        context_issues.extend(pair_issues)
         context_issues.extend(flow_issues)
         
         # 5. 사용자 코멘트 분석 (있는 경우)
@@ -184,7 +513,6 @@ class ContextAnalyzer:
         
         # 점수 계산
         coherence_score = self._calculate_coherence_score(context_issues, len(messages))
-        topic_score = self._calculate_topic_consistency_score(conversation_pairs)
         flow_score = self._calculate_natural_flow_score(conversation_pairs, context_issues)
         
         return ConversationAnalysis(
@@ -201,9 +529,90 @@ class ContextAnalyzer:
             analysis_timestamp=datetime.now()
         )
     
+    def _find_similar_responses(self, ai_messages: List[Tuple[int, str]]) -> List[Tuple[int, float]]:
+        """각 AI 메시지마다 뒤에 나오는 첫 번째 유사 메시지의 위치와 유사도를 찾습니다."""
+        if self.similarity_mode == 'exact':
+            return self._find_similar_responses_exact(ai_messages)
+        
+        indexed = self._find_similar_responses_indexed(ai_messages)
+        if self.similarity_mode == 'check':
+            exact = self._find_similar_responses_exact(ai_messages)
+            if indexed != exact:
+                print(f"⚠️  유사 응답 인덱스 결과 불일치: index={indexed}, exact={exact}")
+            return exact
+        
+        return indexed
+    
+    def _find_similar_responses_exact(self, ai_messages: List[Tuple[int, str]]) -> List[Tuple[int, float]]:
+        """모든 메시지 쌍을 비교합니다 (O(n²), 검증용)."""
+        results = []
+        for i, (idx1, content1) in enumerate(ai_messages):
+            for pos in range(i + 1, len(ai_messages)):
+                content2 = ai_messages[pos][1]
+                similarity = self._calculate_similarity(content1, content2)
+                if similarity > SIMILAR_RESPONSE_THRESHOLD and content1 != content2:
+                    results.append((pos, similarity))
+                    break
+        return results
+    
+    def _find_similar_responses_indexed(self, ai_messages: List[Tuple[int, str]]) -> List[Tuple[int, float]]:
+        """prefix 인덱스로 후보 쌍만 검증합니다 (전수 비교와 같은 결과)."""
+        token_sets = [self._features(content).word_set for _, content in ai_messages]
+        index = SimilarResponseIndex(token_sets)
+        
+        results = []
+        for i, (_, content1) in enumerate(ai_messages):
+            for pos in index.candidates_after(i):
+                similarity = index.jaccard(i, pos)
+                if similarity > SIMILAR_RESPONSE_THRESHOLD and content1 != ai_messages[pos][1]:
+                    results.append((pos, similarity))
+                    break
+        return results
+    
+    def _analyze_pairs(self, conversation_pairs: List[Dict]) -> Tuple[List[ContextIssue], List[ContextIssue], float]:
+        """대화 쌍을 한 번만 순회하며 쌍 분석, 흐름 분석, 주제 일관성 점수를 함께 계산합니다.
+        
+        각 탐지기는 직전 한두 개의 쌍과 누적값만 유지하므로 대화 길이에 선형으로 동작합니다.
+        반환: (쌍 분석 이슈, 흐름 이슈, 주제 일관성 점수)
+        """
+        pair_issues = []
+        flow_issues = []
+        prev1 = prev2 = None  # 직전 쌍, 그 이전 쌍
+        overlap_sum = 0.0
+        overlap_count = 0
+        
+        for pair in conversation_pairs:
+            # 쌍 맥락 분석 (직전 쌍만 참조)
+            pair_issues.extend(self._analyze_conversation_pair(
+                user_content=pair['user_content'],
+                ai_content=pair['ai_content'],
+                user_idx=pair['user_idx'],
+                ai_idx=pair['ai_idx'],
+                emotion=pair['emotion'],
+                previous_pair=prev1
+            ))
+            
+            # 흐름 분석: 최근 두 응답과 구조가 비슷한지 (쌍이 3개 이상일 때부터)
+            if prev2 is not None:
+                flow_issue = self._check_repetitive_pattern(pair, prev1, prev2)
+                if flow_issue:
+                    flow_issues.append(flow_issue)
+            
+            # 주제 일관성: 직전 응답과의 키워드 겹침 누적
+            if prev1 is not None:
+                overlap = self._keyword_overlap(prev1['ai_content'], pair['ai_content'])
+                if overlap is not None:
+                    overlap_sum += overlap
+                    overlap_count += 1
+            
+            prev2, prev1 = prev1, pair
+        
+        topic_score = round(overlap_sum / overlap_count * 100, 2) if overlap_count else 100.0
+        return pair_issues, flow_issues, topic_score
+    
     def _analyze_conversation_pair(self, user_content: str, ai_content: str, 
                                   user_idx: int, ai_idx: int, emotion: str,
-                                  previous_context: List[Dict]) -> List[ContextIssue]:
+                                  previous_pair: Optional[Dict]) -> List[ContextIssue]:
         """사용자 메시지와 AI 응답 쌍을 분석합니다."""
         issues = []
         
@@ -221,9 +630,8 @@ class ContextAnalyzer:
                 ))
         
         # 2. 주제 급변 체크
-        if previous_context:
-            last_pair = previous_context[-1]
-            if self._detect_topic_shift(last_pair['ai_content'], user_content, ai_content):
+        if previous_pair:
+            if self._detect_topic_shift(previous_pair['ai_content'], user_content, ai_content):
                 issues.append(ContextIssue(
                     message_index=ai_idx,
                     issue_type="abrupt_topic_change",
@@ -261,33 +669,24 @@ class ContextAnalyzer:
         
         return issues
     
-    def _analyze_conversation_flow(self, conversation_pairs: List[Dict]) -> List[ContextIssue]:
-        """전체 대화의 흐름을 분석합니다."""
-        issues = []
-        
-        # 대화가 너무 짧은 경우 분석 제한
-        if len(conversation_pairs) < 3:
-            return issues
-        
-        # 반복적인 패턴 감지
-        for i in range(2, len(conversation_pairs)):
-            current = conversation_pairs[i]['ai_content']
-            prev1 = conversation_pairs[i-1]['ai_content']
-            prev2 = conversation_pairs[i-2]['ai_content']
-            
-            # 유사한 구조의 응답 반복 체크
-            if self._is_similar_structure(current, prev1) or self._is_similar_structure(current, prev2):
-                issues.append(ContextIssue(
-                    message_index=conversation_pairs[i]['ai_idx'],
-                    issue_type="repetitive_pattern",
-                    severity=IssueSeverity.MEDIUM,
-                    description="유사한 패턴의 응답이 반복됨",
-                    user_message=conversation_pairs[i]['user_content'],
-                    ai_response=current,
-                    suggestion="응답 다양성을 높이고 템플릿 의존도 감소 필요"
-                ))
+    def _check_repetitive_pattern(self, pair: Dict, prev1: Dict, prev2: Dict) -> Optional[ContextIssue]:
+        """현재 응답이 최근 두 응답과 유사한 구조로 반복되는지 확인합니다."""
+        current = pair['ai_content']
+        
+        # 유사한 구조의 응답 반복 체크
+        if self._is_similar_structure(current, prev1['ai_content']) or \
+           self._is_similar_structure(current, prev2['ai_content']):
+            return ContextIssue(
+                message_index=pair['ai_idx'],
+                issue_type="repetitive_pattern",
+                severity=IssueSeverity.MEDIUM,
+                description="유사한 패턴의 응답이 반복됨",
+                user_message=pair['user_content'],
+                ai_response=current,
+                suggestion="응답 다양성을 높이고 템플릿 의존도 감소 필요"
+            )
         
-        return issues
+        return None
     
     def analyze_user_comment(self, comment: str, messages: List[Dict]) -> List[ContextIssue]:
         """사용자 코멘트를 분석하여 문제점을 식별합니다."""
@@ -296,259 +695,60 @@ class ContextAnalyzer:
         if not comment:
             return issues
             
-        # 다국어 지원 - 사용자가 지적한 문제 타입 키워드 분석
-        problem_keywords = {
-            # 한국어
-            '이상': IssueSeverity.HIGH,
-            '안맞': IssueSeverity.HIGH,
-            '반복': IssueSeverity.MEDIUM,
-            '엉뚱': IssueSeverity.HIGH,
-            '무시': IssueSeverity.HIGH,
-            '대답안': IssueSeverity.CRITICAL,
-            '말안됨': IssueSeverity.CRITICAL,
-            '어색': IssueSeverity.MEDIUM,
-            '끊': IssueSeverity.HIGH,
-            '갑자기': IssueSeverity.MEDIUM,
-            '맥락': IssueSeverity.HIGH,
-            '관련없': IssueSeverity.HIGH,
-            '틀린': IssueSeverity.HIGH,
-            '잘못': IssueSeverity.HIGH,
-            '줄바꿈': IssueSeverity.MEDIUM,
-            '줄바꾸기': IssueSeverity.MEDIUM,
-            '띄어쓰기': IssueSeverity.LOW,
-            
-            # 영어
-            'strange': IssueSeverity.HIGH,
-            'weird': IssueSeverity.HIGH,
-            'wrong': IssueSeverity.HIGH,
-            'repeat': IssueSeverity.MEDIUM,
-            'repetitive': IssueSeverity.MEDIUM,
-            'ignore': IssueSeverity.HIGH,
-            'ignored': IssueSeverity.HIGH,
-            'no answer': IssueSeverity.CRITICAL,
-            'no response': IssueSeverity.CRITICAL,
-            'awkward': IssueSeverity.MEDIUM,
-            'sudden': IssueSeverity.MEDIUM,
-            'suddenly': IssueSeverity.MEDIUM,
-            'context': IssueSeverity.HIGH,
-            'unrelated': IssueSeverity.HIGH,
-            'irrelevant': IssueSeverity.HIGH,
-            'incorrect': IssueSeverity.HIGH,
-            'error': IssueSeverity.HIGH,
-            'line break': IssueSeverity.MEDIUM,
-            'newline': IssueSeverity.MEDIUM,
-            'spacing': IssueSeverity.LOW,
-            
-            # 일본어
-            'おかしい': IssueSeverity.HIGH,
-            '変': IssueSeverity.HIGH,
-            '繰り返': IssueSeverity.MEDIUM,
-            '無視': IssueSeverity.HIGH,
-            '答えない': IssueSeverity.CRITICAL,
-            '違う': IssueSeverity.HIGH,
-            '間違': IssueSeverity.HIGH,
-            '改行': IssueSeverity.MEDIUM,
-            
-            # 중국어
-            '奇怪': IssueSeverity.HIGH,
-            '错误': IssueSeverity.HIGH,
-            '重复': IssueSeverity.MEDIUM,
-            '忽略': IssueSeverity.HIGH,
-            '没回答': IssueSeverity.CRITICAL,
-            '不对': IssueSeverity.HIGH,
-            '换行': IssueSeverity.MEDIUM,
-            
-            # 태국어 (Thai)
-            'แปลก': IssueSeverity.HIGH,
-            'ผิด': IssueSeverity.HIGH,
-            'ซ้ำ': IssueSeverity.MEDIUM,
-            'ไม่ตอบ': IssueSeverity.CRITICAL,
-            'ขัดจังหวะ': IssueSeverity.HIGH,
-            
-            # 베트남어 (Vietnamese)
-            'lạ': IssueSeverity.HIGH,
-            'sai': IssueSeverity.HIGH,
-            'lặp lại': IssueSeverity.MEDIUM,
-            'bỏ qua': IssueSeverity.HIGH,
-            'không trả lời': IssueSeverity.CRITICAL,
-            
-            # 인도네시아어 (Indonesian)
-            'aneh': IssueSeverity.HIGH,
-            'salah': IssueSeverity.HIGH,
-            'berulang': IssueSeverity.MEDIUM,
-            'abaikan': IssueSeverity.HIGH,
-            'tidak menjawab': IssueSeverity.CRITICAL,
-            
-            # 타갈로그어 (Tagalog)
-            'kakaiba': IssueSeverity.HIGH,
-            'mali': IssueSeverity.HIGH,
-            'paulit-ulit': IssueSeverity.MEDIUM,
-            'hindi sumagot': IssueSeverity.CRITICAL,
-            
-            # 스페인어 (Spanish)
-            'extraño': IssueSeverity.HIGH,
-            'raro': IssueSeverity.HIGH,
-            'incorrecto': IssueSeverity.HIGH,
-            'repetir': IssueSeverity.MEDIUM,
-            'ignorar': IssueSeverity.HIGH,
-            'sin respuesta': IssueSeverity.CRITICAL,
+        # 코멘트에서 문제 키워드 찾기 (대소문자 구분 없이, 한 번의 스캔)
+        # 여러 키워드가 걸리면 PROBLEM_KEYWORDS에 먼저 등록된 키워드를 사용
+        hits = PROBLEM_KEYWORD_MATCHER.find_all(comment)
+        if hits:
+            severity = min(hits, key=lambda hit: hit.order).value
             
-            # 프랑스어 (French)
-            'étrange': IssueSeverity.HIGH,
-            'bizarre': IssueSeverity.HIGH,
-            'incorrect': IssueSeverity.HIGH,
-            'répéter': IssueSeverity.MEDIUM,
-            'ignorer': IssueSeverity.HIGH,
-            'pas de réponse': IssueSeverity.CRITICAL,
+            # 문제가 지적된 메시지 찾기
+            problem_message_idx = len(messages) - 1  # 기본적으로 마지막 메시지
             
-            # 독일어 (German)
-            'seltsam': IssueSeverity.HIGH,
-            'falsch': IssueSeverity.HIGH,
-            'wiederholen': IssueSeverity.MEDIUM,
-            'ignorieren': IssueSeverity.HIGH,
-            'keine antwort': IssueSeverity.CRITICAL,
+            # "Problem Message:" 패턴이 있으면 해당 메시지 찾기 (다국어 지원)
+            if PROBLEM_MESSAGE_MATCHER.contains_any(comment):
+                for i, msg in enumerate(messages):
+                    if not msg.get('isFromUser', False):
+                        msg_content = msg.get('content', '')
+                        if msg_content in comment:
+                            problem_message_idx = i
+                            break
             
-            # 러시아어 (Russian)
-            'странный': IssueSeverity.HIGH,
-            'неправильный': IssueSeverity.HIGH,
-            'повторять': IssueSeverity.MEDIUM,
-            'игнорировать': IssueSeverity.HIGH,
-            'нет ответа': IssueSeverity.CRITICAL,
-            
-            # 포르투갈어 (Portuguese)
-            'estranho': IssueSeverity.HIGH,
-            'errado': IssueSeverity.HIGH,
-            'repetir': IssueSeverity.MEDIUM,
-            'ignorar': IssueSeverity.HIGH,
-            'sem resposta': IssueSeverity.CRITICAL,
-            
-            # 이탈리아어 (Italian)
-            'strano': IssueSeverity.HIGH,
-            'sbagliato': IssueSeverity.HIGH,
-            'ripetere': IssueSeverity.MEDIUM,
-            'ignorare': IssueSeverity.HIGH,
-            'nessuna risposta': IssueSeverity.CRITICAL,
-            
-            # 네덜란드어 (Dutch)
-            'vreemd': IssueSeverity.HIGH,
-            'fout': IssueSeverity.HIGH,
-            'herhalen': IssueSeverity.MEDIUM,
-            'negeren': IssueSeverity.HIGH,
-            'geen antwoord': IssueSeverity.CRITICAL,
-            
-            # 스웨덴어 (Swedish)
-            'konstig': IssueSeverity.HIGH,
-            'fel': IssueSeverity.HIGH,
-            'upprepa': IssueSeverity.MEDIUM,
-            'ignorera': IssueSeverity.HIGH,
-            'inget svar': IssueSeverity.CRITICAL,
-            
-            # 폴란드어 (Polish)
-            'dziwny': IssueSeverity.HIGH,
-            'błędny': IssueSeverity.HIGH,
-            'powtarzać': IssueSeverity.MEDIUM,
-            'ignorować': IssueSeverity.HIGH,
-            'brak odpowiedzi': IssueSeverity.CRITICAL,
-            
-            # 터키어 (Turkish)
-            'garip': IssueSeverity.HIGH,
-            'yanlış': IssueSeverity.HIGH,
-            'tekrar': IssueSeverity.MEDIUM,
-            'görmezden': IssueSeverity.HIGH,
-            'cevap yok': IssueSeverity.CRITICAL,
-            
-            # 아랍어 (Arabic)
-            'غريب': IssueSeverity.HIGH,
-            'خطأ': IssueSeverity.HIGH,
-            'تكرار': IssueSeverity.MEDIUM,
-            'تجاهل': IssueSeverity.HIGH,
-            'لا جواب': IssueSeverity.CRITICAL,
-            
-            # 힌디어 (Hindi)
-            'अजीब': IssueSeverity.HIGH,
-            'गलत': IssueSeverity.HIGH,
-            'दोहराना': IssueSeverity.MEDIUM,
-            'अनदेखा': IssueSeverity.HIGH,
-            'कोई जवाब नहीं': IssueSeverity.CRITICAL,
-            
-            # 우르두어 (Urdu)
-            'عجیب': IssueSeverity.HIGH,
-            'غلط': IssueSeverity.HIGH,
-            'دہرانا': IssueSeverity.MEDIUM,
-            'نظرانداز': IssueSeverity.HIGH,
-            'کوئی جواب نہیں': IssueSeverity.CRITICAL,
-        }
-        
-        # 코멘트에서 문제 키워드 찾기 (대소문자 구분 없이)
-        comment_lower = comment.lower()
-        for keyword, severity in problem_keywords.items():
-            if keyword.lower() in comment_lower:
-                # 문제가 지적된 메시지 찾기
-                problem_message_idx = len(messages) - 1  # 기본적으로 마지막 메시지
-                
-                # "Problem Message:" 패턴이 있으면 해당 메시지 찾기 (다국어 지원)
-                problem_patterns = [
-                    'Problem Message:', 'problem message:', 
-                    '문제 메시지:', '오류 메시지:',
-                    'Error Message:', 'error message:',
-                    '問題メッセージ:', 'エラーメッセージ:',
-                    '问题消息:', '错误消息:'
-                ]
-                
-                if any(pattern in comment for pattern in problem_patterns):
-                    for i, msg in enumerate(messages):
-                        if not msg.get('isFromUser', False):
-                            msg_content = msg.get('content', '')
-                            if msg_content in comment:
-                                problem_message_idx = i
-                                break
-                
-                issues.append(ContextIssue(
-                    message_index=problem_message_idx,
-                    issue_type="user_reported",
-                    severity=severity,
-                    description=f"사용자 지적: {comment[:100]}...",
-                    user_message="",
-                    ai_response=messages[problem_message_idx].get('content', '') if problem_message_idx < len(messages) else "",
-                    suggestion="사용자가 직접 지적한 문제이므로 우선적으로 개선 필요"
-                ))
-                break
+            issues.append(ContextIssue(
+                message_index=problem_message_idx,
+                issue_type="user_reported",
+                severity=severity,
+                description=f"사용자 지적: {comment[:100]}...",
+                user_message="",
+                ai_response=messages[problem_message_idx].get('content', '') if problem_message_idx < len(messages) else "",
+                suggestion="사용자가 직접 지적한 문제이므로 우선적으로 개선 필요"
+            ))
         
         return issues
     
     def _is_question(self, text: str) -> bool:
         """텍스트가 질문인지 판단합니다."""
-        question_markers = ['?', '뭐', '무엇', '어떻게', '왜', '언제', '어디', '누구', '얼마나', '무슨']
-        return any(marker in text for marker in question_markers)
+        return QUESTION_MARKER_MATCHER.contains_any(text)
     
     def _is_relevant_answer(self, question: str, answer: str) -> bool:
         """답변이 질문과 관련이 있는지 판단합니다."""
         # 질문의 핵심 키워드 추출
-        question_keywords = self._extract_keywords(question)
-        answer_keywords = self._extract_keywords(answer)
+        question_features = self._features(question)
+        answer_features = self._features(answer)
         
         # 키워드 겹침 확인
-        common_keywords = set(question_keywords) & set(answer_keywords)
+        common_keywords = question_features.keyword_set & answer_features.keyword_set
         
         # 관련성 판단 (최소 1개 이상의 공통 키워드 또는 의미적 연관성)
         if len(common_keywords) > 0:
             return True
         
         # 특수 케이스 처리 (예: 인사에 인사로 응답)
-        greeting_words = ['안녕', '반가워', 'hi', 'hello', '하이', '헬로']
-        if any(word in question.lower() for word in greeting_words) and \
-           any(word in answer.lower() for word in greeting_words):
+        if GREETING_REPLY_MATCHER.contains_any(question_features.lower) and \
+           GREETING_REPLY_MATCHER.contains_any(answer_features.lower):
             return True
         
         # 질문 타입별 특수 처리
-        question_types = {
-            '뭐해': ['하고', '있어', '중', '지금'],
-            '어때': ['좋', '괜찮', '별로', '그저'],
-            '먹었': ['먹', '밥', '아직', '배고'],
-            '어디': ['집', '회사', '학교', '카페', '여기'],
-        }
-        
-        for q_type, expected_words in question_types.items():
+        for q_type, expected_words in QUESTION_TYPE_ANSWERS:
             if q_type in question and any(word in answer for word in expected_words):
                 return True
         
@@ -556,22 +756,14 @@ class ContextAnalyzer:
     
     def _extract_keywords(self, text: str) -> List[str]:
         """텍스트에서 핵심 키워드를 추출합니다."""
-        # 불용어 제거
-        stopwords = ['은', '는', '이', '가', '을', '를', '에', '에서', '으로', '와', '과', '도', '만', '의', '를', '로', '라', '고']
-        
-        # 특수문자 제거 및 토큰화
-        words = re.findall(r'\w+', text.lower())
-        
-        # 불용어 제거 및 2글자 이상 단어만 선택
-        keywords = [word for word in words if word not in stopwords and len(word) >= 2]
-        
-        return keywords
+        # 불용어 제거 및 2글자 이상 단어만 선택 (compute_message_features 참고)
+        return list(self._features(text).keywords)
     
     def _detect_topic_shift(self, prev_content: str, user_content: str, ai_content: str) -> bool:
         """주제가 급격히 변했는지 감지합니다."""
-        prev_keywords = set(self._extract_keywords(prev_content))
-        user_keywords = set(self._extract_keywords(user_content))
-        ai_keywords = set(self._extract_keywords(ai_content))
+        prev_keywords = self._features(prev_content).keyword_set
+        user_keywords = self._features(user_content).keyword_set
+        ai_keywords = self._features(ai_content).keyword_set
         
         # 이전 대화와 현재 대화 간 키워드 연관성 확인
         continuity_score = len((prev_keywords | user_keywords) & ai_keywords) / max(len(ai_keywords), 1)
@@ -581,14 +773,9 @@ class ContextAnalyzer:
     
     def _check_emotion_consistency(self, user_content: str, ai_content: str, emotion: str) -> Optional[str]:
         """감정이 대화 내용과 일치하는지 확인합니다."""
-        # 긍정적 키워드
-        positive_keywords = ['좋아', '좋은', '행복', '기뻐', '사랑', '최고', '멋진', '훌륭']
-        # 부정적 키워드
-        negative_keywords = ['싫어', '나쁜', '슬퍼', '화나', '짜증', '최악', '별로']
-        
         content = user_content + " " + ai_content
-        has_positive = any(keyword in content for keyword in positive_keywords)
-        has_negative = any(keyword in content for keyword in negative_keywords)
+        has_positive = POSITIVE_MATCHER.contains_any(content)
+        has_negative = NEGATIVE_MATCHER.contains_any(content)
         
         # 감정 불일치 체크
         if emotion in ['happy', 'love'] and has_negative and not has_positive:
@@ -612,26 +799,13 @@ class ContextAnalyzer:
     
     def _normalize_message(self, message: str) -> str:
         """메시지를 정규화합니다 (이모티콘, 공백 제거)."""
-        # 이모티콘 및 특수문자 제거
-        normalized = re.sub(r'[ㅋㅎㅠㅜ~!?♥♡💕😊😭.]+', '', message)
-        # 연속 공백 제거
-        normalized = re.sub(r'\s+', ' ', normalized)
-        # 소문자 변환 및 공백 제거
-        normalized = normalized.lower().strip()
-        return normalized
+        return self._features(message).normalized
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """두 텍스트의 유사도를 계산합니다 (0.0 ~ 1.0)."""
-        # 정규화
-        norm1 = self._normalize_message(text1)
-        norm2 = self._normalize_message(text2)
-        
-        if not norm1 or not norm2:
-            return 0.0
-        
-        # 단어 집합 비교
-        words1 = set(norm1.split())
-        words2 = set(norm2.split())
+        # 정규화된 단어 집합 비교
+        words1 = self._features(text1).word_set
+        words2 = self._features(text2).word_set
         
         if not words1 or not words2:
             return 0.0
@@ -683,25 +857,15 @@ class ContextAnalyzer:
         
         return round(score, 2)
     
-    def _calculate_topic_consistency_score(self, conversation_pairs: List[Dict]) -> float:
-        """주제 일관성 점수를 계산합니다."""
-        if len(conversation_pairs) < 2:
-            return 100.0
+    def _keyword_overlap(self, prev_content: str, curr_content: str) -> Optional[float]:
+        """연속된 두 응답의 키워드 Jaccard 겹침 (키워드가 없으면 None)."""
+        prev_keywords = self._features(prev_content).keyword_set
+        curr_keywords = self._features(curr_content).keyword_set
         
-        consistency_scores = []
+        if prev_keywords and curr_keywords:
+            return len(prev_keywords & curr_keywords) / len(prev_keywords | curr_keywords)
         
-        for i in range(1, len(conversation_pairs)):
-            prev_keywords = set(self._extract_keywords(conversation_pairs[i-1]['ai_content']))
-            curr_keywords = set(self._extract_keywords(conversation_pairs[i]['ai_content']))
-            
-            if prev_keywords and curr_keywords:
-                overlap = len(prev_keywords & curr_keywords) / len(prev_keywords | curr_keywords)
-                consistency_scores.append(overlap)
-        
-        if consistency_scores:
-            return round(sum(consistency_scores) / len(consistency_scores) * 100, 2)
-        
-        return 100.0
+        return None
     
     def _calculate_natural_flow_score(self, conversation_pairs: List[Dict], issues: List[ContextIssue]) -> float:
         """대화 흐름의 자연스러움 점수를 계산합니다."""
@@ -719,8 +883,68 @@ class ContextAnalyzer:
         
         return round(score, 2)
 
-def save_analysis_results(analyses: List[ConversationAnalysis], output_dir: str = "analysis_results"):
-    """분석 결과를 JSON 파일로 저장합니다."""
+def analysis_to_dict(analysis: ConversationAnalysis) -> Dict:
+    """분석 결과를 상세 결과 파일 형식의 딕셔너리로 변환합니다."""
+    return {
+        "error_key": analysis.error_key,
+        "persona_id": analysis.persona_id,
+        "persona_name": analysis.persona_name,
+        "user_comment": analysis.user_comment,  # 사용자 코멘트 추가
+        "scores": {
+            "overall_coherence": analysis.overall_coherence_score,
+            "topic_consistency": analysis.topic_consistency_score,
+            "natural_flow": analysis.natural_flow_score
+        },
+        "issues": [
+            {
+                "message_index": issue.message_index,
+                "type": issue.issue_type,
+                "severity": issue.severity.value,
+                "description": issue.description,
+                "user_message": issue.user_message,
+                "ai_response": issue.ai_response,
+                "suggestion": issue.suggestion
+            }
+            for issue in analysis.context_issues
+        ],
+        "greeting_repetitions": analysis.greeting_repetitions,
+        "macro_patterns": analysis.macro_patterns
+    }
+
+def analysis_from_dict(data: Dict) -> ConversationAnalysis:
+    """상세 결과 딕셔너리를 분석 결과 객체로 복원합니다."""
+    scores = data.get("scores", {})
+    return ConversationAnalysis(
+        error_key=data.get("error_key", "Unknown"),
+        persona_id=data.get("persona_id", "Unknown"),
+        persona_name=data.get("persona_name", "Unknown"),
+        user_comment=data.get("user_comment", ""),
+        overall_coherence_score=scores.get("overall_coherence", 100.0),
+        context_issues=[
+            ContextIssue(
+                message_index=issue["message_index"],
+                issue_type=issue["type"],
+                severity=IssueSeverity(issue["severity"]),
+                description=issue["description"],
+                user_message=issue["user_message"],
+                ai_response=issue["ai_response"],
+                suggestion=issue["suggestion"]
+            )
+            for issue in data.get("issues", [])
+        ],
+        topic_consistency_score=scores.get("topic_consistency", 100.0),
+        natural_flow_score=scores.get("natural_flow", 100.0),
+        greeting_repetitions=data.get("greeting_repetitions", 0),
+        macro_patterns=data.get("macro_patterns", []),
+        analysis_timestamp=datetime.now()
+    )
+
+def save_analysis_results(analyses: List[ConversationAnalysis], output_dir: str = "analysis_results",
+                          columnar: bool = False):
+    """분석 결과를 JSON 파일로 저장합니다.
+    
+    columnar가 True이면 output_dir/columnar 아래 Parquet 저장소에도 이번 실행을 추가합니다.
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     # 전체 요약 데이터
@@ -761,34 +985,7 @@ def save_analysis_results(analyses: List[ConversationAnalysis], output_dir: str
         summary["personas_with_issues"][persona_name] = stats
     
     # 상세 분석 결과
-    detailed_results = []
-    for analysis in analyses:
-        result = {
-            "error_key": analysis.error_key,
-            "persona_id": analysis.persona_id,
-            "persona_name": analysis.persona_name,
-            "user_comment": analysis.user_comment,  # 사용자 코멘트 추가
-            "scores": {
-                "overall_coherence": analysis.overall_coherence_score,
-                "topic_consistency": analysis.topic_consistency_score,
-                "natural_flow": analysis.natural_flow_score
-            },
-            "issues": [
-                {
-                    "message_index": issue.message_index,
-                    "type": issue.issue_type,
-                    "severity": issue.severity.value,
-                    "description": issue.description,
-                    "user_message": issue.user_message,
-                    "ai_response": issue.ai_response,
-                    "suggestion": issue.suggestion
-                }
-                for issue in analysis.context_issues
-            ],
-            "greeting_repetitions": analysis.greeting_repetitions,
-            "macro_patterns": analysis.macro_patterns
-        }
-        detailed_results.append(result)
+    detailed_results = [analysis_to_dict(analysis) for analysis in analyses]
     
     # 파일 저장
     os.makedirs(output_dir, exist_ok=True)
@@ -807,6 +1004,14 @@ def save_analysis_results(analyses: List[ConversationAnalysis], output_dir: str
     print(f"  - 요약: {summary_path}")
     print(f"  - 상세: {detailed_path}")
     
+    # 컬럼 저장소 (실행 타임스탬프로 파티션)
+    if columnar:
+        columnar_paths = analysis_store.append_run(
+            detailed_results, timestamp, os.path.join(output_dir, 'columnar')
+        )
+        if columnar_paths:
+            print(f"  - 컬럼 저장소: {columnar_paths[0]}, {columnar_paths[1]}")
+    
     return summary_path, detailed_path
 
 def print_analysis_summary(analyses: List[ConversationAnalysis]):
@@ -887,8 +1092,424 @@ def print_analysis_summary(analyses: List[ConversationAnalysis]):
             }.get(issue_type, issue_type)
             print(f"    - {issue_type_korean}: {count}건")
 
-def analyze_chat_errors(recheck=False, collection_name=None):
-    """오류 보고서를 분석합니다."""
+# 스트리밍 모드 기본값
+DEFAULT_PAGE_SIZE = 200
+DEFAULT_CHECKPOINT_PATH = os.path.join("analysis_results", "analyze_checkpoint.json")
+
+def load_checkpoint(checkpoint_path: str, collection_name: str, recheck: bool) -> Optional[Dict]:
+    """같은 조건으로 중단된 실행의 체크포인트를 불러옵니다."""
+    if not os.path.exists(checkpoint_path):
+        return None
+    
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    
+    # 다른 컬렉션/모드의 체크포인트는 무시
+    if checkpoint.get('collection') != collection_name or checkpoint.get('recheck') != recheck:
+        print(f"⚠️  체크포인트 조건이 달라 처음부터 시작합니다: {checkpoint_path}")
+        return None
+    
+    return checkpoint
+
+def save_checkpoint(checkpoint_path: str, collection_name: str, recheck: bool,
+                    last_doc_id: str, processed: int, partial_offset: Optional[int] = None):
+    """현재 페이지까지의 진행 상황을 체크포인트로 기록합니다.
+    
+    partial_offset은 이 페이지까지 반영된 중간 결과 파일의 바이트 길이입니다.
+    """
+    os.makedirs(os.path.dirname(checkpoint_path) or '.', exist_ok=True)
+    checkpoint = {
+        'collection': collection_name,
+        'recheck': recheck,
+        'last_doc_id': last_doc_id,
+        'processed': processed,
+        'partial_offset': partial_offset,
+        'updated_at': datetime.now().isoformat()
+    }
+    # 중간에 죽어도 깨진 파일이 남지 않도록 임시 파일로 쓴 뒤 교체
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, checkpoint_path)
+
+def partial_results_path(checkpoint_path: str) -> str:
+    """체크포인트와 함께 쓰이는 중간 결과(JSONL) 파일 경로"""
+    return os.path.splitext(checkpoint_path)[0] + '_partial.jsonl'
+
+def load_partial_results(checkpoint_path: str, partial_offset: Optional[int] = None) -> List[ConversationAnalysis]:
+    """중단된 실행에서 이미 분석한 결과를 복원합니다.
+    
+    partial_offset(체크포인트에 기록된 길이) 이후의 내용은 커서가 전진하기 전에
+    중단된 페이지이므로 잘라냅니다. 그 페이지는 재개 시 다시 분석되어 추가됩니다.
+    """
+    path = partial_results_path(checkpoint_path)
+    analyses = []
+    if not os.path.exists(path):
+        return analyses
+    
+    if partial_offset is not None and os.path.getsize(path) > partial_offset:
+        with open(path, 'r+b') as f:
+            f.truncate(partial_offset)
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                analyses.append(analysis_from_dict(json.loads(line)))
+    return analyses
+
+def append_partial_results(checkpoint_path: str, analyses: List[ConversationAnalysis]) -> int:
+    """페이지 단위 분석 결과를 중간 결과 파일에 추가하고, 추가 후 파일 길이를 반환합니다."""
+    path = partial_results_path(checkpoint_path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for analysis in analyses:
+            f.write(json.dumps(analysis_to_dict(analysis), ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+def clear_checkpoint(checkpoint_path: str):
+    """실행이 정상 종료되면 체크포인트와 중간 결과를 삭제합니다."""
+    for path in (checkpoint_path, partial_results_path(checkpoint_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+def iter_report_pages(collection_name: str, recheck: bool, page_size: int = DEFAULT_PAGE_SIZE,
+                      start_after_id: Optional[str] = None):
+    """문서 ID 기준 커서 페이지네이션으로 오류 보고서를 페이지 단위로 가져옵니다.
+    
+    recheck가 아니면 is_check == False 조건을 서버에서 필터링합니다.
+    is_check 필드가 아예 없는 문서는 Firestore 동등 조건에 걸리지 않으므로
+    기본(전체 조회) 모드로 한 번 처리해야 합니다.
+    """
+    query = db.collection(collection_name)
+    if not recheck:
+        query = query.where('is_check', '==', False)
+    query = query.order_by('__name__').limit(page_size)
+    
+    cursor = start_after_id
+    while True:
+        page_query = query.start_after({'__name__': cursor}) if cursor else query
+        page = list(page_query.stream())
+        if not page:
+            return
+        
+        yield page
+        
+        if len(page) < page_size:
+            return
+        cursor = page[-1].id
+
+# Firestore WriteBatch 한 번에 담을 수 있는 최대 쓰기 수
+FIRESTORE_BATCH_LIMIT = 500
+
+class CheckMarkWriter:
+    """is_check 표시를 WriteBatch로 묶어 백그라운드 스레드에서 커밋합니다.
+    
+    분석 결과가 파일에 저장된 문서만 submit()으로 넘겨야 합니다.
+    그래야 중간에 죽어도 결과 없이 체크만 된 보고서가 생기지 않습니다.
+    """
+    
+    def __init__(self, batch_size: int = FIRESTORE_BATCH_LIMIT):
+        self.batch_size = max(1, min(batch_size, FIRESTORE_BATCH_LIMIT))
+        self.committed = 0
+        self.batches = 0
+        self.failed = []
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='check-mark-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, refs):
+        """결과 저장이 끝난 문서 참조들을 커밋 대기열에 넣습니다."""
+        refs = list(refs)
+        if refs:
+            self._queue.put(refs)
+    
+    def close(self):
+        """남은 표시를 모두 커밋하고 스레드를 종료합니다."""
+        self._queue.put(None)
+        self._thread.join()
+        if self.failed:
+            print(f"⚠️  is_check 표시 실패: {len(self.failed)}개 (다음 실행에서 다시 분석됩니다)")
+    
+    def _run(self):
+        pending = []
+        done = False
+        while not done:
+            item = self._queue.get()
+            if item is None:
+                done = True
+            else:
+                pending.extend(item)
+            
+            # 가득 찬 배치는 바로, 나머지는 대기열이 비었을 때 커밋
+            while len(pending) >= self.batch_size or (pending and (done or self._queue.empty())):
+                chunk, pending = pending[:self.batch_size], pending[self.batch_size:]
+                self._commit(chunk)
+    
+    def _commit(self, refs):
+        batch = db.batch()
+        for ref in refs:
+            batch.update(ref, {'is_check': True})
+        try:
+            batch.commit()
+            self.committed += len(refs)
+            self.batches += 1
+        except Exception as e:
+            print(f"⚠️  is_check 배치 커밋 실패 ({len(refs)}개): {e}")
+            self.failed.extend(ref.id for ref in refs)
+
+def analyze_report(analyzer: ContextAnalyzer, data: Dict) -> ConversationAnalysis:
+    """오류 보고서 문서 하나를 분석합니다."""
+    error_key = data.get('error_key', 'Unknown')
+    persona_name = data.get('persona_name', 'Unknown')
+    persona_id = data.get('persona', 'Unknown')
+    chat_messages = data.get('chat', [])
+    user_comment = data.get('user_message', '')  # 사용자 코멘트 읽기
+    
+    print(f"분석 중: {error_key} - {persona_name}")
+    if user_comment:
+        print(f"  💬 사용자 코멘트: {user_comment[:80]}...")
+    
+    # 대화 분석 수행
+    return analyzer.analyze_conversation(
+        messages=chat_messages,
+        persona_name=persona_name,
+        persona_id=persona_id,
+        error_key=error_key,
+        user_comment=user_comment
+    )
+
+def _report_payload(data: Dict) -> Dict:
+    """워커 프로세스로 보낼 때 분석에 필요한 필드만 남깁니다 (프로세스 간 전송량 절감)."""
+    return {
+        'error_key': data.get('error_key', 'Unknown'),
+        'persona_name': data.get('persona_name', 'Unknown'),
+        'persona': data.get('persona', 'Unknown'),
+        'user_message': data.get('user_message', ''),
+        'chat': [
+            {
+                'content': msg.get('content', ''),
+                'isFromUser': msg.get('isFromUser', False),
+                'emotion': msg.get('emotion', 'neutral')
+            }
+            for msg in data.get('chat', [])
+        ]
+    }
+
+# 워커 프로세스별 분석기 (프로세스당 한 번만 생성)
+_worker_analyzer = None
+
+def _init_worker(similarity_mode: str = 'index'):
+    """워커 프로세스 시작 시 분석기를 준비합니다."""
+    global _worker_analyzer
+    _worker_analyzer = ContextAnalyzer(similarity_mode=similarity_mode)
+
+def _analyze_report_chunk(reports: List[Dict]) -> List[ConversationAnalysis]:
+    """워커 프로세스에서 보고서 묶음을 분석합니다."""
+    if _worker_analyzer is None:
+        _init_worker()
+    
+    return [
+        _worker_analyzer.analyze_conversation(
+            messages=data['chat'],
+            persona_name=data['persona_name'],
+            persona_id=data['persona'],
+            error_key=data['error_key'],
+            user_comment=data['user_message']
+        )
+        for data in reports
+    ]
+
+# 분석 규칙 버전 - 탐지 규칙/점수 계산을 바꾸면 올려야 캐시가 무효화됨
+ANALYZER_RULES_VERSION = "2025.08.1"
+DEFAULT_CACHE_PATH = os.path.join("analysis_results", "analysis_cache.sqlite3")
+
+class AnalysisCache:
+    """대화 내용 해시 기준 분석 결과 캐시 (SQLite)
+    
+    키는 chat 배열(분석에 쓰이는 필드), 사용자 코멘트, 분석 규칙 버전의 해시입니다.
+    대화와 규칙이 그대로면 --recheck에서도 저장된 결과를 그대로 사용합니다.
+    """
+    
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, rules_version: str = ANALYZER_RULES_VERSION):
+        self.path = path
+        self.rules_version = rules_version
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                content_hash TEXT PRIMARY KEY,
+                rules_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+    
+    def content_key(self, data: Dict) -> str:
+        """보고서의 분석 입력과 규칙 버전으로 캐시 키를 만듭니다."""
+        payload = _report_payload(data)
+        content = json.dumps(
+            [self.rules_version, payload['chat'], payload['user_message']],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        """저장된 분석 결과(상세 결과 형식)를 키별로 조회합니다."""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        # SQLite 바인딩 변수 개수 제한을 피하기 위해 나눠서 조회
+        for i in range(0, len(unique_keys), 500):
+            chunk = unique_keys[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT content_hash, result FROM analysis_cache WHERE content_hash IN ({placeholders})",
+                chunk
+            )
+            for content_hash, result in rows:
+                found[content_hash] = json.loads(result)
+        return found
+    
+    def put_many(self, items: List[Tuple[str, ConversationAnalysis]]):
+        """분석 결과를 한 트랜잭션으로 저장합니다."""
+        if not items:
+            return
+        now = datetime.now().isoformat()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO analysis_cache (content_hash, rules_version, result, updated_at) VALUES (?, ?, ?, ?)",
+            [
+                (key, self.rules_version, json.dumps(analysis_to_dict(analysis), ensure_ascii=False), now)
+                for key, analysis in items
+            ]
+        )
+        self._conn.commit()
+    
+    def prune_stale(self) -> int:
+        """현재 규칙 버전이 아닌 항목을 삭제합니다."""
+        cursor = self._conn.execute("DELETE FROM analysis_cache WHERE rules_version != ?", (self.rules_version,))
+        self._conn.commit()
+        return cursor.rowcount
+    
+    def close(self):
+        self._conn.close()
+
+def analyze_reports(analyzer: ContextAnalyzer, reports: List[Dict],
+                    executor: Optional[ProcessPoolExecutor] = None, workers: int = 1,
+                    chunk_size: int = 0, cache: Optional[AnalysisCache] = None) -> List[ConversationAnalysis]:
+    """보고서 목록을 분석합니다. executor가 있으면 여러 프로세스에 나눠 처리합니다.
+    
+    cache가 있으면 대화 내용이 바뀌지 않은 보고서는 저장된 결과를 사용합니다.
+    결과는 항상 입력 순서와 같은 순서로 반환됩니다.
+    """
+    if cache is None:
+        return _analyze_reports_uncached(analyzer, reports, executor, workers, chunk_size)
+    
+    keys = [cache.content_key(data) for data in reports]
+    cached = cache.get_many(keys)
+    
+    analyses: List[Optional[ConversationAnalysis]] = [None] * len(reports)
+    pending = []
+    for i, (key, data) in enumerate(zip(keys, reports)):
+        if key in cached:
+            # 보고서 식별 정보는 현재 문서 기준으로 갱신
+            analyses[i] = replace(
+                analysis_from_dict(cached[key]),
+                error_key=data.get('error_key', 'Unknown'),
+                persona_id=data.get('persona', 'Unknown'),
+                persona_name=data.get('persona_name', 'Unknown')
+            )
+        else:
+            pending.append(i)
+    
+    cache.hits += len(reports) - len(pending)
+    cache.misses += len(pending)
+    
+    fresh = _analyze_reports_uncached(analyzer, [reports[i] for i in pending], executor, workers, chunk_size)
+    for i, analysis in zip(pending, fresh):
+        analyses[i] = analysis
+    cache.put_many([(keys[i], analysis) for i, analysis in zip(pending, fresh)])
+    
+    return analyses
+
+def _analyze_reports_uncached(analyzer: ContextAnalyzer, reports: List[Dict],
+                              executor: Optional[ProcessPoolExecutor] = None, workers: int = 1,
+                              chunk_size: int = 0) -> List[ConversationAnalysis]:
+    """캐시 없이 보고서 목록을 분석합니다 (입력 순서 유지)."""
+    if executor is None or len(reports) <= 1:
+        return [analyze_report(analyzer, data) for data in reports]
+    
+    # 청크 크기 자동 결정: 워커당 4개 정도의 청크로 나눠 부하 분산
+    if chunk_size <= 0:
+        chunk_size = max(1, len(reports) // (workers * 4))
+    
+    payloads = [_report_payload(data) for data in reports]
+    chunks = [payloads[i:i + chunk_size] for i in range(0, len(payloads), chunk_size)]
+    
+    analyses = []
+    # executor.map은 제출 순서대로 결과를 돌려주므로 순서가 유지됨
+    for chunk_result in executor.map(_analyze_report_chunk, chunks):
+        for analysis in chunk_result:
+            print(f"분석 완료: {analysis.error_key} - {analysis.persona_name}")
+        analyses.extend(chunk_result)
+    
+    return analyses
+
+def analyze_chat_errors_streaming(recheck=False, collection_name='chat_error_fix',
+                                  page_size=DEFAULT_PAGE_SIZE,
+                                  checkpoint_path=DEFAULT_CHECKPOINT_PATH,
+                                  executor: Optional[ProcessPoolExecutor] = None,
+                                  workers: int = 1,
+                                  similarity_mode: str = 'index',
+                                  cache: Optional[AnalysisCache] = None) -> List[ConversationAnalysis]:
+    """페이지 단위로 보고서를 가져와 분석합니다 (중단 후 재개 가능).
+    
+    Firestore 문서는 한 페이지씩만 메모리에 올리지만, 요약 출력과 결과 파일 저장을
+    위해 분석 결과(ConversationAnalysis)는 모두 누적해서 반환합니다.
+    재개 시에는 중간 결과 파일 전체를 다시 읽어 들입니다.
+    """
+    analyzer = ContextAnalyzer(similarity_mode=similarity_mode)
+    
+    checkpoint = load_checkpoint(checkpoint_path, collection_name, recheck)
+    start_after_id = None
+    analyses = []
+    if checkpoint:
+        start_after_id = checkpoint.get('last_doc_id')
+        analyses = load_partial_results(checkpoint_path, checkpoint.get('partial_offset'))
+        print(f"♻️  체크포인트에서 재개: {start_after_id} 이후 (이전 분석 {len(analyses)}개)")
+    else:
+        # 이전 실행의 찌꺼기 제거
+        clear_checkpoint(checkpoint_path)
+    
+    writer = CheckMarkWriter()
+    try:
+        for page in iter_report_pages(collection_name, recheck, page_size, start_after_id):
+            page_analyses = analyze_reports(analyzer, [doc.to_dict() for doc in page], executor, workers, cache=cache)
+            
+            # 페이지 결과를 먼저 기록한 뒤 is_check 표시 및 커서 전진
+            # (중간에 죽어도 분석 결과 없이 체크만 된 문서가 생기지 않도록)
+            # 커서 전진 전에 죽으면 재개 시 partial_offset 이후가 잘려 같은 페이지가 중복되지 않음
+            partial_offset = append_partial_results(checkpoint_path, page_analyses)
+            writer.submit(doc.reference for doc in page)
+            analyses.extend(page_analyses)
+            save_checkpoint(checkpoint_path, collection_name, recheck, page[-1].id, len(analyses), partial_offset)
+            print(f"📄 페이지 처리 완료: 누적 {len(analyses)}개 (마지막 문서: {page[-1].id})")
+    finally:
+        writer.close()
+    
+    print(f"✔️  is_check 표시: {writer.committed}개 ({writer.batches}회 배치 커밋)")
+    return analyses
+
+def analyze_chat_errors(recheck=False, collection_name=None, stream=False,
+                        page_size=DEFAULT_PAGE_SIZE, checkpoint_path=DEFAULT_CHECKPOINT_PATH,
+                        workers=1, similarity_mode='index', cache_path=DEFAULT_CACHE_PATH,
+                        columnar=False):
+    """오류 보고서를 분석합니다. cache_path가 None이면 분석 캐시를 사용하지 않습니다."""
     
     # 컬렉션 이름 설정
     if collection_name is None:
@@ -896,6 +1517,56 @@ def analyze_chat_errors(recheck=False, collection_name=None):
     
     print(f"📂 분석할 컬렉션: {collection_name}")
     
+    cache = AnalysisCache(cache_path) if cache_path else None
+    if cache:
+        # 이전 규칙 버전의 결과는 다시 쓰이지 않으므로 열 때 정리
+        pruned = cache.prune_stale()
+        if pruned:
+            print(f"🗄️  분석 캐시: 이전 규칙 버전 항목 {pruned}개 삭제")
+    try:
+        if workers > 1:
+            print(f"⚙️  병렬 분석: 워커 {workers}개")
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(similarity_mode,)) as executor:
+                _run_analysis(recheck, collection_name, stream, page_size, checkpoint_path,
+                              similarity_mode, executor, workers, cache, columnar)
+        else:
+            _run_analysis(recheck, collection_name, stream, page_size, checkpoint_path,
+                          similarity_mode, cache=cache, columnar=columnar)
+    finally:
+        if cache:
+            if cache.hits or cache.misses:
+                print(f"🗄️  분석 캐시: 재사용 {cache.hits}개, 새로 분석 {cache.misses}개 ({cache.path})")
+            cache.close()
+
+def _run_analysis(recheck, collection_name, stream, page_size, checkpoint_path, similarity_mode='index',
+                  executor: Optional[ProcessPoolExecutor] = None, workers: int = 1,
+                  cache: Optional[AnalysisCache] = None, columnar: bool = False):
+    """조회 방식(전체/스트리밍)에 따라 분석을 수행하고 결과를 저장합니다."""
+    if stream:
+        print(f"🌊 스트리밍 모드: 페이지 크기 {page_size}, 체크포인트 {checkpoint_path}\n")
+        analyses = analyze_chat_errors_streaming(
+            recheck=recheck,
+            collection_name=collection_name,
+            page_size=page_size,
+            checkpoint_path=checkpoint_path,
+            executor=executor,
+            workers=workers,
+            similarity_mode=similarity_mode,
+            cache=cache
+        )
+        
+        if not analyses:
+            print("분석할 새로운 오류 보고서가 없습니다.")
+            clear_checkpoint(checkpoint_path)
+            return
+        
+        print_analysis_summary(analyses)
+        save_analysis_results(analyses, columnar=columnar)
+        clear_checkpoint(checkpoint_path)
+        print(f"\n✅ 총 {len(analyses)}개의 오류 보고서 분석 완료")
+        return
+    
     # 체크되지 않은 문서 조회
     all_reports = db.collection(collection_name).get()
     unchecked_reports = []
@@ -912,41 +1583,23 @@ def analyze_chat_errors(recheck=False, collection_name=None):
         return
     
     # 맥락 분석기 초기화
-    analyzer = ContextAnalyzer()
-    analyses = []
+    analyzer = ContextAnalyzer(similarity_mode=similarity_mode)
     
     # 각 보고서 분석
-    for doc in unchecked_reports:
-        data = doc.to_dict()
-        error_key = data.get('error_key', 'Unknown')
-        persona_name = data.get('persona_name', 'Unknown')
-        persona_id = data.get('persona', 'Unknown')
-        chat_messages = data.get('chat', [])
-        user_comment = data.get('user_message', '')  # 사용자 코멘트 읽기
-        
-        print(f"분석 중: {error_key} - {persona_name}")
-        if user_comment:
-            print(f"  💬 사용자 코멘트: {user_comment[:80]}...")
-        
-        # 대화 분석 수행
-        analysis = analyzer.analyze_conversation(
-            messages=chat_messages,
-            persona_name=persona_name,
-            persona_id=persona_id,
-            error_key=error_key,
-            user_comment=user_comment
-        )
-        analyses.append(analysis)
-        
-        # 문서에 is_check 표시
-        doc.reference.update({'is_check': True})
+    analyses = analyze_reports(analyzer, [doc.to_dict() for doc in unchecked_reports], executor, workers, cache=cache)
     
     # 분석 결과 출력
     print_analysis_summary(analyses)
     
     # 결과 저장
     if analyses:
-        summary_path, detailed_path = save_analysis_results(analyses)
+        summary_path, detailed_path = save_analysis_results(analyses, columnar=columnar)
+        
+        # 결과 파일이 저장된 뒤에만 is_check 표시 (배치 커밋)
+        writer = CheckMarkWriter()
+        writer.submit(doc.reference for doc in unchecked_reports)
+        writer.close()
+        print(f"✔️  is_check 표시: {writer.committed}개 ({writer.batches}회 배치 커밋)")
         print(f"\n✅ 총 {len(unchecked_reports)}개의 오류 보고서 분석 완료")
 
 if __name__ == "__main__":
@@ -954,6 +1607,31 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='채팅 오류 분석 도구')
     parser.add_argument('--recheck', action='store_true', help='이미 체크된 문서도 다시 분석')
     parser.add_argument('--collection', type=str, help='분석할 컬렉션 이름 (기본: chat_error_fix)')
+    parser.add_argument('--stream', action='store_true',
+                        help='서버 측 필터 + 페이지 단위로 조회하고 체크포인트로 재개 (is_check 필드가 있는 문서만 대상)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'스트리밍 모드 페이지 크기 (기본: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--checkpoint', type=str, default=DEFAULT_CHECKPOINT_PATH,
+                        help=f'스트리밍 모드 체크포인트 파일 (기본: {DEFAULT_CHECKPOINT_PATH})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='분석에 사용할 프로세스 수 (기본: 1, 순차 처리)')
+    parser.add_argument('--similarity-mode', choices=['index', 'exact', 'check'], default='index',
+                        help='유사 응답 탐지 방식: index(기본, prefix 인덱스), exact(전수 비교), check(두 방식 결과 비교)')
+    parser.add_argument('--cache-path', type=str, default=DEFAULT_CACHE_PATH,
+                        help=f'대화 내용 해시 기준 분석 캐시 파일 (기본: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true', help='분석 캐시를 사용하지 않고 모두 새로 분석')
+    parser.add_argument('--columnar', action='store_true',
+                        help='JSON과 함께 analysis_results/columnar에 Parquet 결과 누적 (pyarrow 필요)')
     args = parser.parse_args()
     
-    analyze_chat_errors(recheck=args.recheck, collection_name=args.collection)
\ No newline at end of file
+    analyze_chat_errors(
+        recheck=args.recheck,
+        collection_name=args.collection,
+        stream=args.stream,
+        page_size=args.page_size,
+        checkpoint_path=args.checkpoint,
+        workers=args.workers,
+        similarity_mode=args.similarity_mode,
+        cache_path=None if args.no_cache else args.cache_path,
+        columnar=args.columnar
+    )
@@ -164,7 +164,7 @@ def chat_error_improvement_command():
     
     # 1단계: 검증 실행
     print("\n[Step 1] Validating improvements...")
-    validation_results = validate_chat_improvements()
+    validation_results = validate_chat_improvements(keep_results=False)
     
     if not validation_results:
         print("No errors to validate.")
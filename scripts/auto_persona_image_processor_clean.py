@@ -10,85 +10,135 @@ import sys
 import json
 import subprocess
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
 from PIL import Image
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 import argparse
 from datetime import datetime
-import numpy as np
+from persona_renditions import (
+    R2_FORMATS, R2_ORIGINAL, SIZES, Profile, encode_image, load_source_image, render_sizes,
+    rendition_params
+)
+from rendition_manifest import DEFAULT_MANIFEST_PATH, RenditionManifest, body_etag
+
+try:
+    from upload_persona_to_r2 import PersonaImageUploader, UploadManager, format_upload_stats
+except ImportError:
+    # boto3 is only needed for --direct-upload
+    PersonaImageUploader = UploadManager = format_upload_stats = None
 
 # Configuration
 PERSONAS_SOURCE_DIR = r"C:\Users\yong\Documents\personas"
 R2_BUCKET = "sona-personas"
 R2_PUBLIC_URL = "https://pub-f687f5cf7a7b4d598a1a73d0a7cca8b8.r2.dev/sona-personas"
 
-# Image size configurations
-SIZES = {
-    'thumb': 150,
-    'small': 300,
-    'medium': 600,
-    'large': 1200
-}
+# Every (size, format) rendition uploaded per persona, plus the original as WebP
+RENDITIONS = [(size_name, fmt) for size_name in SIZES for fmt in R2_FORMATS] + [('original', 'webp')]
 
-def remove_black_bars(img):
-    """Remove black letterbox bars from top and bottom of image"""
-    # Convert to numpy array
-    img_array = np.array(img)
-    
-    # For RGB images
-    if len(img_array.shape) == 3:
-        # Calculate mean brightness for each row
-        row_means = np.mean(img_array, axis=(1, 2))
-    else:
-        # For grayscale
-        row_means = np.mean(img_array, axis=1)
-    
-    # Find non-black rows (threshold of 10 to account for very dark but not pure black)
-    non_black_rows = np.where(row_means > 10)[0]
-    
-    if len(non_black_rows) == 0:
-        return img
-    
-    # Get the bounds of non-black content
-    top = non_black_rows[0]
-    bottom = non_black_rows[-1] + 1
-    
-    # Check if we found black bars (more than 5% of image height)
-    height = img_array.shape[0]
-    if top > height * 0.05 or (height - bottom) > height * 0.05:
-        print(f"    Detected black bars: top={top}px, bottom={height-bottom}px")
-        # Crop the image
-        if len(img_array.shape) == 3:
-            cropped_array = img_array[top:bottom, :, :]
-        else:
-            cropped_array = img_array[top:bottom, :]
-        return Image.fromarray(cropped_array)
-    
-    return img
+def rendition_profile(size_name: str, fmt: str) -> Profile:
+    return R2_ORIGINAL if size_name == 'original' else R2_FORMATS[fmt]
+
+def encode_rendition(img: Image.Image, size_name: str, fmt: str) -> bytes:
+    """Encode one rendition to bytes"""
+    return encode_image(img, rendition_profile(size_name, fmt))
+
+def rendition_key(persona_name: str, size_name: str, fmt: str) -> str:
+    return f"personas/{persona_name}/main_{size_name}.{fmt}"
 
-def smart_crop_square(img, size):
-    """Smart crop to square aspect ratio for persona cards"""
-    width, height = img.size
+def rendition_url(persona_name: str, size_name: str, fmt: str) -> str:
+    return f"{R2_PUBLIC_URL}/{rendition_key(persona_name, size_name, fmt)}"
+
+# Per-worker cache: all jobs of one persona on a worker share a single decode
+# and resize cascade
+@lru_cache(maxsize=2)
+def _cached_renditions(image_path: str, mtime: float) -> Dict[str, Image.Image]:
+    source = load_source_image(image_path)
+    renditions = render_sizes(source)
+    renditions['original'] = source
+    return renditions
+
+def render_rendition(job: Tuple[str, str, float, str, str]) -> Tuple[str, str, str, bytes, Tuple[int, int]]:
+    """Process pool worker: decode, resize and encode one (persona, size, format) rendition"""
+    persona_name, image_path, mtime, size_name, fmt = job
+    img = _cached_renditions(image_path, mtime)[size_name]
+    return persona_name, size_name, fmt, encode_rendition(img, size_name, fmt), img.size
+
+class RenditionEngine:
+    """Runs rendition jobs for many personas on a process pool
     
-    if width == height:
-        return img
+    Jobs are submitted per (persona, size, format) through a bounded queue of
+    at most max_pending in-flight jobs, and each persona is yielded as soon as
+    all of its renditions are done.
+    """
     
-    # For portrait images, crop from top to focus on face area
-    if width < height:
-        # Take square from top portion (usually where face is)
-        crop_height = width
-        top = min(int(height * 0.1), height - crop_height)  # Start 10% from top or less
-        return img.crop((0, top, width, top + crop_height))
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
     
-    # For landscape images, center crop
-    else:
-        crop_width = height
-        left = (width - crop_width) // 2
-        return img.crop((left, 0, left + crop_width, height))
+    def render(self, sources: Dict[str, Path]) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+        """Yield (persona_name, {(size, format): (bytes, (width, height))}, error) per persona"""
+        remaining = {persona_name: len(RENDITIONS) for persona_name in sources}
+        renditions = {persona_name: {} for persona_name in sources}
+        errors = {}
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = {}
+            
+            def collect(block: bool):
+                done, _ = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+                finished = []
+                for future in done:
+                    persona_name = in_flight.pop(future)
+                    try:
+                        _, size_name, fmt, data, dimensions = future.result()
+                        renditions[persona_name][(size_name, fmt)] = (data, dimensions)
+                    except Exception as e:
+                        errors.setdefault(persona_name, str(e))
+                    remaining[persona_name] -= 1
+                    if remaining[persona_name] == 0:
+                        finished.append(persona_name)
+                return finished
+            
+            for persona_name, image_path in sources.items():
+                mtime = os.path.getmtime(image_path)
+                # Heaviest encodes (original, large) first so they don't end up as the tail
+                for size_name, fmt in reversed(RENDITIONS):
+                    # Bounded queue: wait for a slot before submitting more work
+                    while len(in_flight) >= self.max_pending:
+                        for finished in collect(block=True):
+                            yield self._result(finished, renditions, errors)
+                    job = (persona_name, str(image_path), mtime, size_name, fmt)
+                    in_flight[pool.submit(render_rendition, job)] = persona_name
+            
+            while in_flight:
+                for finished in collect(block=True):
+                    yield self._result(finished, renditions, errors)
+    
+    @staticmethod
+    def _result(persona_name, renditions, errors):
+        if persona_name in errors:
+            renditions.pop(persona_name, None)
+            return persona_name, None, errors[persona_name]
+        return persona_name, renditions.pop(persona_name), None
 
 class AutoPersonaImageProcessor:
-    def __init__(self, source_dir: str = PERSONAS_SOURCE_DIR):
+    def __init__(self, source_dir: str = PERSONAS_SOURCE_DIR, uploader: Optional['PersonaImageUploader'] = None,
+                 manifest: Optional[RenditionManifest] = None):
+        """With an uploader, renditions are streamed from memory through its boto3
+        client instead of temp files and one MCP subprocess per file. With a
+        manifest, personas and renditions unchanged since their last successful
+        run are skipped."""
         self.source_dir = Path(source_dir)
+        self.uploader = uploader
+        self.manifest = manifest
+        # Shared concurrent uploader for a process_all_personas run
+        self.upload_manager = None
+        # Source hash per persona, and uploads recorded in the manifest once Firebase is updated
+        self.source_hashes: Dict[str, str] = {}
+        self.pending_records: Dict[str, List[Tuple]] = {}
+        self.force_update = False
         self.processed_count = 0
         self.skipped_count = 0
         self.error_count = 0
@@ -143,98 +193,127 @@ class AutoPersonaImageProcessor:
     def process_persona_image(self, image_path: Path, persona_name: str) -> Optional[Dict[str, str]]:
         """Process a single persona image to multiple sizes"""
         try:
-            with Image.open(image_path) as img:
-                # Convert RGBA to RGB if necessary
-                if img.mode in ('RGBA', 'LA'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Remove black bars if present
-                img = remove_black_bars(img)
-                
-                orig_width, orig_height = img.size
-                aspect_ratio = orig_width / orig_height
-                
-                urls = {}
-                temp_files = []
-                
-                # Process each size
-                for size_name, target_size in SIZES.items():
-                    # For thumbnail and small sizes, use smart square crop
-                    if size_name in ['thumb', 'small']:
-                        # First resize to target size maintaining aspect ratio
-                        if orig_width > orig_height:
-                            new_width = int(target_size * aspect_ratio)
-                            new_height = target_size
-                        else:
-                            new_width = target_size
-                            new_height = int(target_size / aspect_ratio)
-                        
-                        # Don't upscale
-                        if new_width > orig_width or new_height > orig_height:
-                            resized = img.copy()
-                        else:
-                            resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                        
-                        # Then smart crop to square
-                        resized = smart_crop_square(resized, target_size)
-                        
-                        # Final resize to exact target size if needed
-                        if resized.size != (target_size, target_size):
-                            resized = resized.resize((target_size, target_size), Image.Resampling.LANCZOS)
-                    else:
-                        # For medium and large, maintain aspect ratio
-                        if orig_width > orig_height:
-                            new_width = target_size
-                            new_height = int(target_size / aspect_ratio)
-                        else:
-                            new_height = target_size
-                            new_width = int(target_size * aspect_ratio)
-                        
-                        # Don't upscale images
-                        if new_width > orig_width or new_height > orig_height:
-                            new_width, new_height = orig_width, orig_height
-                        
-                        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                    
-                    # Save WebP and JPEG
-                    webp_file = f"temp_{persona_name}_{size_name}.webp"
-                    jpg_file = f"temp_{persona_name}_{size_name}.jpg"
-                    
-                    resized.save(webp_file, 'WEBP', quality=85, method=6)
-                    resized.save(jpg_file, 'JPEG', quality=90, optimize=True)
-                    
-                    temp_files.extend([webp_file, jpg_file])
-                    
-                    # Generate URLs
-                    urls[f"{size_name}_webp"] = f"{R2_PUBLIC_URL}/personas/{persona_name}/main_{size_name}.webp"
-                    urls[f"{size_name}_jpg"] = f"{R2_PUBLIC_URL}/personas/{persona_name}/main_{size_name}.jpg"
-                    
-                    print(f"    {size_name}: {new_width}x{new_height}")
-                
-                # Save original as WebP
-                orig_webp_file = f"temp_{persona_name}_original.webp"
-                img.save(orig_webp_file, 'WEBP', quality=95, method=6)
-                temp_files.append(orig_webp_file)
-                
-                urls['original_webp'] = f"{R2_PUBLIC_URL}/personas/{persona_name}/main_original.webp"
-                
-                # Upload to R2
-                upload_success = self.upload_images_to_r2(persona_name, temp_files)
-                
-                # Clean up temp files
-                for temp_file in temp_files:
-                    Path(temp_file).unlink(missing_ok=True)
-                
-                return urls if upload_success else None
+            img = load_source_image(image_path)
+            
+            renditions = {}
+            for size_name, resized in render_sizes(img).items():
+                for fmt in R2_FORMATS:
+                    renditions[(size_name, fmt)] = (encode_rendition(resized, size_name, fmt), resized.size)
+            
+            # Original as WebP
+            renditions[('original', 'webp')] = (encode_rendition(img, 'original', 'webp'), img.size)
+            
+            return self.upload_renditions(persona_name, renditions)
                 
         except Exception as e:
             print(f"    Error processing image: {e}")
             return None
     
+    def upload_renditions(self, persona_name: str, renditions: Dict[Tuple[str, str], Tuple[bytes, Tuple[int, int]]]) -> Optional[Dict[str, str]]:
+        """Upload encoded renditions and return their public URLs
+        
+        Renditions the manifest (or R2's ETag) shows as unchanged are not uploaded again.
+        """
+        urls = {}
+        for (size_name, fmt), (_, (width, height)) in renditions.items():
+            # Generate URLs
+            urls[f"{size_name}_{fmt}"] = rendition_url(persona_name, size_name, fmt)
+            if fmt == 'webp':
+                print(f"    {size_name}: {width}x{height}")
+        
+        to_upload = self.changed_renditions(persona_name, renditions)
+        if len(to_upload) < len(renditions):
+            print(f"    Unchanged: {len(renditions) - len(to_upload)} renditions")
+        
+        # Upload to R2
+        if not to_upload:
+            etags = {}
+        elif self.uploader is not None:
+            etags = self.upload_renditions_direct(persona_name, to_upload)
+        else:
+            etags = self.upload_renditions_via_temp_files(persona_name, to_upload)
+        
+        if etags is None:
+            return None
+        
+        if self.manifest is not None and persona_name in self.source_hashes:
+            records = self.pending_records.setdefault(persona_name, [])
+            for (size_name, fmt), (data, dimensions) in to_upload.items():
+                key = rendition_key(persona_name, size_name, fmt)
+                params = rendition_params(size_name, rendition_profile(size_name, fmt))
+                records.append((key, params, etags.get(key), len(data), dimensions))
+        
+        return urls
+    
+    def changed_renditions(self, persona_name: str, renditions: Dict[Tuple[str, str], Tuple[bytes, Tuple[int, int]]]) -> Dict[Tuple[str, str], Tuple[bytes, Tuple[int, int]]]:
+        """Renditions that differ from what the manifest (or R2) already holds"""
+        source_hash = self.source_hashes.get(persona_name)
+        if self.manifest is None or source_hash is None or self.force_update:
+            return renditions
+        
+        changed = {}
+        for (size_name, fmt), (data, dimensions) in renditions.items():
+            key = rendition_key(persona_name, size_name, fmt)
+            params = rendition_params(size_name, rendition_profile(size_name, fmt))
+            if self.manifest.is_current(key, source_hash, params):
+                continue
+            if self.manifest.matches_remote(key, data):
+                # R2 already holds these bytes; only the manifest needs the entry
+                self.pending_records.setdefault(persona_name, []).append(
+                    (key, params, body_etag(data), len(data), dimensions))
+                continue
+            changed[(size_name, fmt)] = (data, dimensions)
+        return changed
+    
+    def upload_renditions_direct(self, persona_name: str, renditions: Dict[Tuple[str, str], Tuple[bytes, Tuple[int, int]]]) -> Optional[Dict[str, str]]:
+        """Upload the in-memory buffers concurrently through the uploader's shared boto3 client
+        
+        Returns the ETag per key, or None if any upload failed.
+        """
+        manager = self.upload_manager or UploadManager(self.uploader)
+        try:
+            futures = [manager.submit(rendition_key(persona_name, size_name, fmt), data, fmt)
+                       for (size_name, fmt), (data, _) in renditions.items()]
+            
+            etags = {}
+            for future in futures:
+                upload = future.result()
+                if upload['error']:
+                    print(f"    Upload failed: {upload['key']} - {upload['error']}")
+                else:
+                    etags[upload['key']] = upload['etag']
+                    print(f"    Uploaded: {upload['key']}")
+        finally:
+            if manager is not self.upload_manager:
+                manager.close()
+        
+        return etags if len(etags) == len(renditions) else None
+    
+    def upload_renditions_via_temp_files(self, persona_name: str, renditions: Dict[Tuple[str, str], Tuple[bytes, Tuple[int, int]]]) -> Optional[Dict[str, str]]:
+        """Write renditions to temp files and upload them through MCP
+        
+        MCP does not report ETags, so every key maps to None; None if any upload failed.
+        """
+        temp_files = []
+        
+        try:
+            for (size_name, fmt), (data, _) in renditions.items():
+                temp_file = f"temp_{persona_name}_{size_name}.{fmt}"
+                with open(temp_file, 'wb') as f:
+                    f.write(data)
+                temp_files.append(temp_file)
+            
+            if not self.upload_images_to_r2(persona_name, temp_files):
+                return None
+            return {rendition_key(persona_name, size_name, fmt): None for size_name, fmt in renditions}
+        except Exception as e:
+            print(f"    Upload error: {e}")
+            return None
+        finally:
+            # Clean up temp files
+            for temp_file in temp_files:
+                Path(temp_file).unlink(missing_ok=True)
+    
     def upload_images_to_r2(self, persona_name: str, temp_files: List[str]) -> bool:
         """Upload all image files to Cloudflare R2"""
         try:
@@ -250,7 +329,7 @@ class AutoPersonaImageProcessor:
                 file_format = parts[1]
                 
                 # Generate R2 key
-                r2_key = f"personas/{persona_name}/main_{size_name}.{file_format}"
+                r2_key = rendition_key(persona_name, size_name, file_format)
                 
                 # Upload using MCP
                 result = subprocess.run([
@@ -351,12 +430,52 @@ class AutoPersonaImageProcessor:
             print(f"    Clear error: {e}")
             return False
     
-    def process_all_personas(self, force_update: bool = False) -> Dict[str, any]:
-        """Process all personas automatically"""
+    def _finish_persona(self, persona_name: str, urls: Optional[Dict[str, str]], results: Dict):
+        """Update Firebase for a processed persona and record the outcome"""
+        if urls:
+            # Update Firebase
+            if self.update_firebase_persona(persona_name, urls):
+                self.processed_count += 1
+                results['processed'][persona_name] = urls
+                self._record_uploads(persona_name)
+                print(f"    Completed: {persona_name}")
+            else:
+                self.error_count += 1
+                results['errors'].append(f"{persona_name}: Firebase update failed")
+        else:
+            self.error_count += 1
+            results['errors'].append(f"{persona_name}: Image processing failed")
+        self.pending_records.pop(persona_name, None)
+    
+    def _record_uploads(self, persona_name: str):
+        """Mark a persona's uploads as current, only once its Firebase document points at them"""
+        if self.manifest is None:
+            return
+        source_hash = self.source_hashes[persona_name]
+        for key, params, etag, size, dimensions in self.pending_records.get(persona_name, []):
+            self.manifest.record(key, source_hash, params, etag, size, dimensions)
+        self.manifest.save()
+    
+    def is_persona_current(self, persona_name: str, image_path: Path) -> bool:
+        """True when every rendition was uploaded from this exact source with the current parameters"""
+        source_hash = self.source_hashes[persona_name] = self.manifest.source_hash(image_path)
+        return all(
+            self.manifest.is_current(rendition_key(persona_name, size_name, fmt), source_hash,
+                                     rendition_params(size_name, rendition_profile(size_name, fmt)))
+            for size_name, fmt in RENDITIONS
+        )
+    
+    def process_all_personas(self, force_update: bool = False, workers: int = 1) -> Dict[str, any]:
+        """Process all personas automatically
+        
+        With workers > 1, renditions of all personas are rendered in parallel on
+        a process pool and each persona is uploaded as soon as it is complete.
+        """
         print("Starting automated persona image processing...")
         print("=" * 60)
         
         start_time = time.time()
+        self.force_update = force_update
         
         # Get personas from folders and Firebase
         folder_personas = self.scan_persona_folders()
@@ -377,10 +496,10 @@ class AutoPersonaImageProcessor:
         print(f"\nProcessing personas with images:")
         print("-" * 40)
         
+        sources = {}
         for persona_name, images in folder_personas.items():
-            print(f"\nProcessing: {persona_name}")
-            
             if not images:
+                print(f"\nProcessing: {persona_name}")
                 print(f"    No images found, skipping")
                 self.skipped_count += 1
                 results['skipped'].append(persona_name)
@@ -388,23 +507,49 @@ class AutoPersonaImageProcessor:
             
             # Use first image
             image_path = images[0]
-            print(f"    Using: {image_path.name}")
             
-            # Process image
-            urls = self.process_persona_image(image_path, persona_name)
+            # Skip personas whose renditions and Firebase document are already up to date
+            if self.manifest is not None and self.is_persona_current(persona_name, image_path) \
+                    and not force_update and persona_name in firebase_personas:
+                print(f"\nProcessing: {persona_name}")
+                print(f"    Unchanged since last upload ({image_path.name}), skipping")
+                self.skipped_count += 1
+                results['skipped'].append(persona_name)
+                continue
             
-            if urls:
-                # Update Firebase
-                if self.update_firebase_persona(persona_name, urls):
-                    self.processed_count += 1
-                    results['processed'][persona_name] = urls
-                    print(f"    Completed: {persona_name}")
+            sources[persona_name] = image_path
+        
+        if self.uploader is not None:
+            self.upload_manager = UploadManager(self.uploader)
+        
+        if workers > 1:
+            engine = RenditionEngine(workers)
+            print(f"Rendering {len(sources) * len(RENDITIONS)} renditions on {engine.workers} worker processes")
+            for persona_name, renditions, error in engine.render(sources):
+                print(f"\nProcessing: {persona_name}")
+                print(f"    Using: {sources[persona_name].name}")
+                if error:
+                    print(f"    Error processing image: {error}")
+                    urls = None
                 else:
-                    self.error_count += 1
-                    results['errors'].append(f"{persona_name}: Firebase update failed")
-            else:
-                self.error_count += 1
-                results['errors'].append(f"{persona_name}: Image processing failed")
+                    urls = self.upload_renditions(persona_name, renditions)
+                self._finish_persona(persona_name, urls, results)
+        else:
+            for persona_name, image_path in sources.items():
+                print(f"\nProcessing: {persona_name}")
+                print(f"    Using: {image_path.name}")
+                
+                # Process image
+                urls = self.process_persona_image(image_path, persona_name)
+                self._finish_persona(persona_name, urls, results)
+        
+        if self.manifest is not None:
+            self.manifest.save()
+        
+        if self.upload_manager is not None:
+            self.upload_manager.close()
+            results['upload_stats'] = self.upload_manager.summary()
+            self.upload_manager = None
         
         # Clear personas without folders
         personas_without_folders = firebase_personas - set(folder_personas.keys())
@@ -417,6 +562,10 @@ class AutoPersonaImageProcessor:
                 print(f"Clearing: {persona_name}")
                 if self.clear_firebase_persona_images(persona_name):
                     results['cleared'].append(persona_name)
+                    if self.manifest is not None:
+                        # A returning folder must be uploaded and linked again
+                        prefix = f"personas/{persona_name}/"
+                        self.manifest.forget([key for key in list(self.manifest.objects) if key.startswith(prefix)])
                 else:
                     results['errors'].append(f"{persona_name}: Clear failed")
         
@@ -430,6 +579,8 @@ class AutoPersonaImageProcessor:
         print(f"   Cleared: {len(results['cleared'])}")
         print(f"   Skipped: {self.skipped_count}")
         print(f"   Errors: {self.error_count}")
+        if 'upload_stats' in results:
+            print(f"   Uploads: {format_upload_stats(results['upload_stats'])}")
         
         if results['errors']:
             print(f"\nErrors:")
@@ -446,6 +597,18 @@ def main():
                         help='Force update all personas')
     parser.add_argument('--dry-run', '-d', action='store_true',
                         help='Dry run - show what would be processed')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for rendering (1 = serial, default: CPU count)')
+    parser.add_argument('--direct-upload', action='store_true',
+                        help='Upload from memory through boto3 instead of temp files and MCP')
+    parser.add_argument('--r2-config', '-c',
+                        help='R2 config file for --direct-upload (default: CLOUDFLARE_* environment variables)')
+    parser.add_argument('--manifest', '-m', default=DEFAULT_MANIFEST_PATH,
+                        help=f'Rendition manifest used to skip unchanged personas (default: {DEFAULT_MANIFEST_PATH})')
+    parser.add_argument('--no-manifest', action='store_true',
+                        help='Process every persona without consulting or updating the manifest')
+    parser.add_argument('--verify-remote', action='store_true',
+                        help='With --direct-upload, list R2 ETags first and re-upload renditions missing or changed in R2')
     
     args = parser.parse_args()
     
@@ -454,7 +617,26 @@ def main():
         print(f"Error: Source directory '{args.source}' not found")
         sys.exit(1)
     
-    processor = AutoPersonaImageProcessor(args.source)
+    uploader = None
+    if args.direct_upload and not args.dry_run:
+        if PersonaImageUploader is None:
+            print("Error: --direct-upload requires boto3 (pip install boto3)")
+            sys.exit(1)
+        try:
+            uploader = PersonaImageUploader(args.r2_config)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    
+    manifest = None if args.no_manifest else RenditionManifest(args.manifest)
+    if manifest is not None and args.verify_remote:
+        if uploader is None:
+            print("Error: --verify-remote requires --direct-upload")
+            sys.exit(1)
+        count = manifest.load_remote(uploader.s3_client, uploader.bucket_name)
+        print(f"Listed {count} objects in R2")
+    
+    processor = AutoPersonaImageProcessor(args.source, uploader, manifest)
     
     if args.dry_run:
         print("Dry run mode - scanning only...")
@@ -462,8 +644,10 @@ def main():
         firebase_personas = processor.get_firebase_personas()
         
         print(f"\nWould process {len(personas)} personas:")
-        for name in personas.keys():
-            print(f"  - {name}")
+        for name, images in personas.items():
+            unchanged = manifest is not None and not args.force and name in firebase_personas \
+                and processor.is_persona_current(name, images[0])
+            print(f"  - {name}{' (unchanged, would skip)' if unchanged else ''}")
         
         personas_to_clear = firebase_personas - set(personas.keys())
         if personas_to_clear:
@@ -471,7 +655,7 @@ def main():
             for name in personas_to_clear:
                 print(f"  - {name}")
     else:
-        results = processor.process_all_personas(args.force)
+        results = processor.process_all_personas(args.force, workers=args.workers)
         
         # Output results as JSON for potential automation
         with open('persona_processing_results.json', 'w', encoding='utf-8') as f:
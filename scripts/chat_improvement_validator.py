@@ -10,6 +10,8 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 import numpy as np
 from collections import defaultdict
+from rule_engine import Rule, RuleEngine
+from json_stream import iter_json_records
 
 # UTF-8 인코딩 설정
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -47,43 +49,75 @@ class ValidationMetrics:
     context_consistency: float  # 문맥 일관성 (0-100)
     overall_score: float  # 전체 점수 (0-100)
 
+# 질문 타입 (관련성 보너스 표의 열 순서)
+QUESTION_TYPES = ('general', 'what_doing', 'spoiler', 'direct_viewing', 'how_feeling')
+
+# 자연스러움 점수 계산에 쓰는 응답 플래그 (순서 고정)
+NATURALNESS_FLAGS = (
+    'is_question', 'ends_with_question', 'soft_expression', 'stiff_expression',
+    'empathy', 'formulaic_empathy', 'greeting', 'short_greeting', 'has_question_mark'
+)
+
+# 공감 표현 패턴 (규칙 엔진의 'empathy' 그룹)
+EMPATHY_PATTERNS = [
+    '진짜.*겠', '정말.*겠', '아.*슬프', '와.*대박',
+    '헐.*진짜', '아이고.*어떡해'
+]
+
 class ChatImprovementValidator:
     """대화 개선 검증 시스템"""
     
     def __init__(self):
         self.improvement_patterns = {
             'question_mark_fix': {
+                'target': 'response',
                 'pattern': r'[가-힣]+[나요까요][\.。]?$',
                 'improvement': self._add_question_mark,
                 'weight': 0.2
             },
             'expression_softening': {
+                'target': 'response',
                 'pattern': r'(나요|습니까|까요)\?',
                 'improvement': self._soften_expression,
                 'weight': 0.3
             },
             'empathy_enhancement': {
+                'target': 'response',
                 'pattern': r'(그런 감정|그런 기분|그런 마음) (이해해요|알아요)',
                 'improvement': self._enhance_empathy,
                 'weight': 0.4
             },
             'direct_answer': {
+                'target': 'user_message',
                 'pattern': r'(뭐해|뭐하고|뭐 하고)',
                 'improvement': self._ensure_direct_answer,
                 'weight': 0.5
             },
             'spoiler_handling': {
+                'target': 'user_message',
                 'pattern': r'스포.*말해도',
                 'improvement': self._handle_spoiler,
                 'weight': 0.4
             },
             'context_understanding': {
+                'target': 'user_message',
                 'pattern': r'직접 (보|봐)',
                 'improvement': self._understand_context,
                 'weight': 0.4
             }
         }
         
+        # 모든 패턴을 한 번만 컴파일해 대상(응답/사용자 메시지)별로 묶은 규칙 엔진
+        self.rule_engine = RuleEngine()
+        for target in ('response', 'user_message'):
+            self.rule_engine.add_group(target, [
+                Rule(name, spec['pattern'], payload=spec)
+                for name, spec in self.improvement_patterns.items() if spec['target'] == target
+            ])
+        self.rule_engine.add_group('empathy', [
+            Rule(pattern, pattern) for pattern in EMPATHY_PATTERNS
+        ])
+        
     def validate_improvement(self, user_message: str, original_response: str, 
                            improved_response: str, context: List[Dict] = None) -> ImprovementResult:
         """개선 전후 응답을 비교하여 검증"""
@@ -125,6 +159,197 @@ class ChatImprovementValidator:
             reason=reason
         )
     
+    def find_applicable_improvements(self, user_message: str, response: str) -> List[str]:
+        """패턴이 적중한 개선 규칙 이름 (응답과 사용자 메시지를 각각 한 번씩만 스캔)"""
+        return (self.rule_engine.matched_names('response', response)
+                + self.rule_engine.matched_names('user_message', user_message))
+    
+    def validate_batch(self, user_messages: List[str], original_responses: List[str],
+                       improved_responses: List[str],
+                       contexts: Optional[List[Optional[List[Dict]]]] = None) -> List[ImprovementResult]:
+        """여러 (사용자 메시지, 원본, 개선본)을 한 번에 검증
+        
+        validate_improvement를 반복 호출한 것과 같은 결과를 반환하지만,
+        질문 타입/키워드/공감 표현 등의 특징은 고유 문자열마다 한 번만 계산하고
+        관련성·자연스러움·일관성 점수는 NumPy로 배치 전체를 한 번에 계산합니다.
+        """
+        count = len(user_messages)
+        if len(original_responses) != count or len(improved_responses) != count:
+            raise ValueError("user_messages, original_responses, improved_responses의 길이가 같아야 합니다")
+        if contexts is not None and len(contexts) != count:
+            raise ValueError("contexts의 길이가 메시지 수와 같아야 합니다")
+        
+        # 원본과 개선본이 다른 행만 점수 계산
+        changed = [i for i in range(count) if original_responses[i] != improved_responses[i]]
+        users = [user_messages[i] for i in changed]
+        batch_contexts = [contexts[i] for i in changed] if contexts is not None else None
+        cache = BatchFeatureCache()
+        original_metrics = self.calculate_metrics_batch(
+            users, [original_responses[i] for i in changed], batch_contexts, cache)
+        improved_metrics = self.calculate_metrics_batch(
+            users, [improved_responses[i] for i in changed], batch_contexts, cache)
+        
+        improvement_rate = ((improved_metrics['overall'] - original_metrics['overall'])
+                            / original_metrics['overall'] * 100)
+        applied = improvement_rate >= 10.0
+        
+        # 행 단위 결과 생성은 파이썬 리스트로 (NumPy 스칼라 인덱싱 비용 회피)
+        original_rows = self._metrics_rows(original_metrics)
+        improved_rows = self._metrics_rows(improved_metrics)
+        improvement_rate, applied = improvement_rate.tolist(), applied.tolist()
+        
+        results = [
+            ImprovementResult(
+                user_message=user_messages[i],
+                original_response=original_responses[i],
+                improved_response=improved_responses[i],
+                original_score=50.0,
+                improved_score=50.0,
+                improvement_rate=0.0,
+                applied=False,
+                reason="개선사항 없음"
+            )
+            for i in range(count)
+        ]
+        for row, i in enumerate(changed):
+            original, improved = original_rows[row], improved_rows[row]
+            results[i] = ImprovementResult(
+                user_message=user_messages[i],
+                original_response=original_responses[i],
+                improved_response=improved_responses[i],
+                original_score=original.overall_score,
+                improved_score=improved.overall_score,
+                improvement_rate=improvement_rate[row],
+                applied=applied[row],
+                reason=self._generate_reason(original, improved, improvement_rate[row])
+            )
+        return results
+    
+    def calculate_metrics_batch(self, user_messages: List[str], responses: List[str],
+                                contexts: Optional[List[Optional[List[Dict]]]] = None,
+                                cache: Optional['BatchFeatureCache'] = None) -> Dict[str, np.ndarray]:
+        """_calculate_metrics의 배치 버전 (relevance/naturalness/consistency/overall 배열 반환)"""
+        if cache is None:
+            cache = BatchFeatureCache()
+        user_codes, user_texts = self._factorize(user_messages)
+        response_codes, response_texts = self._factorize(responses)
+        
+        user_types = np.array([cache.question_type(self, text) for text in user_texts], dtype=np.intp)
+        user_keywords = [cache.keywords(self, text) for text in user_texts]
+        response_keywords = [cache.keywords(self, text) for text in response_texts]
+        response_features = [cache.response_features(self, text) for text in response_texts]
+        
+        # 관련성: (고유 응답 × 질문 타입) 보너스 표 + 공통 키워드 보너스
+        bonus_table = np.array([f[0] for f in response_features], dtype=float).reshape(-1, len(QUESTION_TYPES))
+        common_counts = np.fromiter(
+            (len(user_keywords[u] & response_keywords[r]) for u, r in zip(user_codes.tolist(), response_codes.tolist())),
+            dtype=float, count=len(responses)
+        )
+        relevance = 50.0 + bonus_table[response_codes, user_types[user_codes]]
+        relevance = np.clip(relevance + np.minimum(common_counts * 10, 30), 0, 100)
+        
+        # 자연스러움: 응답에만 의존하므로 고유 응답별로 계산 후 펼침
+        flags = np.array([f[1] for f in response_features], dtype=bool).reshape(-1, len(NATURALNESS_FLAGS))
+        naturalness = self._naturalness_from_flags(flags)[response_codes]
+        
+        # 문맥 일관성: 문맥이 없으면 70점
+        consistency = np.full(len(responses), 70.0)
+        if contexts is not None:
+            for i, context in enumerate(contexts):
+                if context and len(context) >= 2:
+                    consistency[i] = self._consistency_from_keywords(
+                        response_keywords[response_codes[i]], context, cache
+                    )
+        
+        overall = relevance * 0.4 + naturalness * 0.3 + consistency * 0.3
+        return {
+            'relevance': relevance,
+            'naturalness': naturalness,
+            'consistency': consistency,
+            'overall': overall
+        }
+    
+    @staticmethod
+    def _factorize(texts: List[str]) -> Tuple[np.ndarray, List[str]]:
+        """문자열 목록을 (고유 문자열 인덱스 배열, 고유 문자열 목록)으로 변환"""
+        positions = {}
+        codes = np.fromiter((positions.setdefault(text, len(positions)) for text in texts),
+                            dtype=np.intp, count=len(texts))
+        return codes, list(positions)
+    
+    @staticmethod
+    def _metrics_rows(metrics: Dict[str, np.ndarray]) -> List[ValidationMetrics]:
+        return [
+            ValidationMetrics(relevance_score=r, naturalness_score=n, context_consistency=c, overall_score=o)
+            for r, n, c, o in zip(metrics['relevance'].tolist(), metrics['naturalness'].tolist(),
+                                  metrics['consistency'].tolist(), metrics['overall'].tolist())
+        ]
+    
+    def _relevance_bonuses(self, response: str) -> Tuple[float, ...]:
+        """QUESTION_TYPES 순서대로, 해당 타입 질문에 이 응답이 받는 관련성 가감점"""
+        if any(word in response for word in ['하고 있', '하는 중', '했어', '할 거']):
+            what_doing = 30
+        elif '그래' in response or '나도' in response:
+            what_doing = -20
+        else:
+            what_doing = 0
+            
+        if '안 봤' in response or '말하지 마' in response:
+            spoiler = 40
+        elif '괜찮아' in response or '말해' in response:
+            spoiler = -30
+        else:
+            spoiler = 0
+            
+        if '영화' in response or '드라마' in response or '콘텐츠' in response:
+            direct_viewing = 30
+        elif '만나' in response:
+            direct_viewing = -40
+        else:
+            direct_viewing = 0
+            
+        how_feeling = 20 if any(word in response for word in ['슬프', '기쁘', '화나', '좋']) else 0
+        
+        return (0, what_doing, spoiler, direct_viewing, how_feeling)
+    
+    def _naturalness_flags(self, response: str) -> Tuple[bool, ...]:
+        """NATURALNESS_FLAGS 순서의 자연스러움 판단 플래그"""
+        return (
+            self._is_question(response),
+            response.endswith('?'),
+            any(expr in response for expr in ['어요?', '을까요?', '까요?']),
+            any(expr in response for expr in ['나요?', '습니까?']),
+            self.rule_engine.any_match('empathy', response),
+            '그런 감정 이해해요' in response or '그런 기분 알아요' in response,
+            '반가워' in response or '안녕' in response,
+            response.endswith('!') and len(response) < 15,
+            '?' in response
+        )
+    
+    @staticmethod
+    def _naturalness_from_flags(flags: np.ndarray) -> np.ndarray:
+        """_calculate_naturalness와 같은 규칙을 플래그 행렬에 한 번에 적용"""
+        (is_question, ends_with_question, soft, stiff, empathy,
+         formulaic, greeting, short_greeting, has_question) = flags.T
+        score = np.full(len(flags), 70.0)
+        score += np.where(is_question, np.where(ends_with_question, 10, -20), 0)
+        score += np.where(soft, 15, np.where(stiff, -10, 0))
+        score += np.where(empathy, 15, np.where(formulaic, -15, 0))
+        score += np.where(greeting, np.where(short_greeting, -10, np.where(has_question, 10, 0)), 0)
+        return np.clip(score, 0, 100)
+    
+    def _consistency_from_keywords(self, response_keywords: frozenset, context: List[Dict],
+                                   cache: 'BatchFeatureCache') -> float:
+        """_calculate_consistency와 같은 계산 (응답 키워드는 미리 계산된 것 사용)"""
+        prev_keywords = set()
+        for msg in context[-3:]:
+            prev_keywords |= cache.keywords(self, msg.get('content', ''))
+        
+        if prev_keywords and response_keywords:
+            overlap_ratio = len(prev_keywords & response_keywords) / len(response_keywords)
+            return min(max(50 + overlap_ratio * 50, 0), 100)
+        return 80.0
+    
     def _calculate_metrics(self, user_message: str, response: str, 
                           context: List[Dict] = None) -> ValidationMetrics:
         """응답의 품질 메트릭 계산"""
@@ -205,11 +430,7 @@ class ChatImprovementValidator:
             score -= 10
             
         # 공감 표현
-        empathy_patterns = [
-            '진짜.*겠', '정말.*겠', '아.*슬프', '와.*대박', 
-            '헐.*진짜', '아이고.*어떡해'
-        ]
-        if any(re.search(pattern, response) for pattern in empathy_patterns):
+        if self.rule_engine.any_match('empathy', response):
             score += 15
         elif '그런 감정 이해해요' in response or '그런 기분 알아요' in response:
             score -= 15
@@ -358,95 +579,190 @@ class ChatImprovementValidator:
                 return response.replace('만나', '그 작품을 직접 보')
         return response
 
-def validate_chat_improvements(error_keys: List[str] = None):
-    """대화 개선 사항을 검증하고 적용"""
-    validator = ChatImprovementValidator()
+class BatchFeatureCache:
+    """validate_batch 한 번 동안 문자열별 특징을 한 번만 계산하도록 보관"""
     
-    # 분석 결과 파일 찾기
-    analysis_dir = os.path.join(os.path.dirname(__file__), "analysis_results")
+    def __init__(self):
+        self._keywords: Dict[str, frozenset] = {}
+        self._question_types: Dict[str, int] = {}
+        self._response_features: Dict[str, tuple] = {}
+    
+    def keywords(self, validator: ChatImprovementValidator, text: str) -> frozenset:
+        cached = self._keywords.get(text)
+        if cached is None:
+            cached = self._keywords[text] = frozenset(validator._extract_keywords(text))
+        return cached
+    
+    def question_type(self, validator: ChatImprovementValidator, text: str) -> int:
+        cached = self._question_types.get(text)
+        if cached is None:
+            cached = self._question_types[text] = QUESTION_TYPES.index(validator._identify_question_type(text))
+        return cached
+    
+    def response_features(self, validator: ChatImprovementValidator, text: str) -> tuple:
+        """(질문 타입별 관련성 보너스, 자연스러움 플래그)"""
+        cached = self._response_features.get(text)
+        if cached is None:
+            cached = self._response_features[text] = (
+                validator._relevance_bonuses(text), validator._naturalness_flags(text)
+            )
+        return cached
+
+# 한 번에 validate_batch로 검증할 최대 이슈 수 (메모리 상한)
+DEFAULT_VALIDATION_BATCH_SIZE = 500
+
+def improve_response(validator: ChatImprovementValidator, user_msg: str, original_response: str) -> str:
+    """개선 패턴들을 순서대로 적용한 개선본"""
+    improved_response = original_response
     
-    # 최근 3개의 분석 파일 가져오기
+    # 물음표 추가
+    improved_response = validator._add_question_mark(improved_response)
+    
+    # 표현 부드럽게
+    improved_response = validator._soften_expression(improved_response)
+    
+    # 공감 표현 강화
+    improved_response = validator._enhance_empathy(improved_response)
+    
+    # 직접 답변 보장
+    if '뭐해' in user_msg or '뭐하고' in user_msg:
+        improved_response = validator._ensure_direct_answer(user_msg, improved_response)
+    
+    # 스포일러 처리
+    if '스포' in user_msg:
+        improved_response = validator._handle_spoiler(user_msg, improved_response)
+    
+    # 문맥 이해
+    if '직접' in user_msg:
+        improved_response = validator._understand_context(user_msg, improved_response)
+    
+    return improved_response
+
+def find_detail_files(analysis_dir: str, limit: int = 3) -> List[str]:
+    """최근 분석 상세 파일 (detailed_*.json / detailed_*.jsonl)"""
     detail_files = []
     for filename in os.listdir(analysis_dir):
-        if filename.startswith("detailed_") and filename.endswith(".json"):
+        if filename.startswith("detailed_") and filename.endswith((".json", ".jsonl")):
             file_path = os.path.join(analysis_dir, filename)
             detail_files.append((file_path, os.path.getmtime(file_path)))
     
     detail_files.sort(key=lambda x: x[1], reverse=True)
-    detail_files = detail_files[:3]  # 최근 3개만
+    return [file_path for file_path, _ in detail_files[:limit]]
+
+def iter_analysis_results(detail_files: List[str]):
+    """상세 파일들의 분석 결과를 하나씩 읽습니다 (파일 전체를 메모리에 올리지 않음)."""
+    for file_path in detail_files:
+        yield from iter_json_records(file_path)
+
+class ValidationResultWriter:
+    """검증 결과를 건별로 임시 JSONL에 쓰고, 마지막에 요약과 합쳐 validation_*.json을 만듭니다.
+    
+    결과 파일 형식은 기존과 같고(요약 필드 + detailed_results), 완성되기 전에는
+    validation_*.json이 생기지 않으므로 다른 스크립트가 미완성 파일을 읽지 않습니다.
+    """
+    
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.spool_path = output_path + '.partial.jsonl'
+        self._spool = open(self.spool_path, 'w', encoding='utf-8')
+        self.count = 0
+    
+    def write(self, record: Dict):
+        self._spool.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+    
+    def close(self, summary: Dict):
+        self._spool.close()
+        
+        # json.dump(..., indent=2)와 같은 모양으로 요약 뒤에 detailed_results 배열을 붙임
+        header = json.dumps(summary, ensure_ascii=False, indent=2)
+        tmp_path = self.output_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as out, open(self.spool_path, 'r', encoding='utf-8') as spool:
+            out.write(header[:-2] + ',\n  "detailed_results": [')
+            for i, line in enumerate(spool):
+                item = json.dumps(json.loads(line), ensure_ascii=False, indent=2)
+                out.write((',\n' if i else '\n') + '    ' + item.replace('\n', '\n    '))
+            out.write('\n  ]\n}' if self.count else ']\n}')
+        os.replace(tmp_path, self.output_path)
+        os.remove(self.spool_path)
+
+def validate_chat_improvements(error_keys: List[str] = None, keep_results: bool = True,
+                               batch_size: int = DEFAULT_VALIDATION_BATCH_SIZE):
+    """대화 개선 사항을 검증하고 적용
+    
+    상세 파일을 분석 결과 하나씩 스트리밍으로 읽고 batch_size건씩 검증해 바로 기록하므로
+    최대 메모리는 파일 크기와 무관합니다. keep_results=False이면 결과 목록 대신
+    요약(dict)을 반환합니다.
+    """
+    validator = ChatImprovementValidator()
+    
+    # 분석 결과 파일 찾기
+    analysis_dir = os.path.join(os.path.dirname(__file__), "analysis_results")
+    
+    # 최근 3개의 분석 파일 가져오기
+    detail_files = find_detail_files(analysis_dir, limit=3)
     
     if not detail_files:
         print("분석 결과 파일을 찾을 수 없습니다.")
         return
     
-    # 모든 분석 결과 합치기
-    all_analysis_results = []
-    for file_path, _ in detail_files:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-            all_analysis_results.extend(results)
-    
-    print(f"📊 개선 검증 시작: {len(detail_files)}개 파일, {len(all_analysis_results)}개 분석 결과")
+    print(f"📊 개선 검증 시작: {len(detail_files)}개 파일")
     print("="*80)
     
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = os.path.join(analysis_dir, f"validation_{timestamp}.json")
+    writer = ValidationResultWriter(output_path)
+    
     # 검증 결과 저장
-    validation_results = []
+    validation_results = [] if keep_results else None
+    persona_stats = defaultdict(lambda: {'total': 0, 'applied': 0})
     total_improvements = 0
     applied_improvements = 0
+    analyzed_results = 0
     
-    for result in all_analysis_results:
-        if error_keys and result['error_key'] not in error_keys:
-            continue
-            
-        persona_name = result['persona_name']
-        issues = result['issues']
-        
-        print(f"\n👤 {persona_name} 페르소나 검증 중...")
+    # 검증 대기 중인 이슈 (batch_size건 단위로 검증)
+    pending = []
+    persona_groups = []
+    
+    def flush():
+        nonlocal total_improvements, applied_improvements
+        validations = validator.validate_batch(
+            [p[2] for p in pending], [p[3] for p in pending], [p[4] for p in pending]
+        )
         
-        for issue in issues:
-            if issue['severity'] in ['high', 'critical']:
-                user_msg = issue['user_message']
-                original_response = issue['ai_response']
-                
-                # 개선 적용
-                improved_response = original_response
-                
-                # 물음표 추가
-                improved_response = validator._add_question_mark(improved_response)
-                
-                # 표현 부드럽게
-                improved_response = validator._soften_expression(improved_response)
-                
-                # 공감 표현 강화
-                improved_response = validator._enhance_empathy(improved_response)
-                
-                # 직접 답변 보장
-                if '뭐해' in user_msg or '뭐하고' in user_msg:
-                    improved_response = validator._ensure_direct_answer(user_msg, improved_response)
-                
-                # 스포일러 처리
-                if '스포' in user_msg:
-                    improved_response = validator._handle_spoiler(user_msg, improved_response)
-                
-                # 문맥 이해
-                if '직접' in user_msg:
-                    improved_response = validator._understand_context(user_msg, improved_response)
-                
-                # 검증
-                validation = validator.validate_improvement(
-                    user_message=user_msg,
-                    original_response=original_response,
-                    improved_response=improved_response
-                )
+        for persona_name, group in persona_groups:
+            print(f"\n👤 {persona_name} 페르소나 검증 중...")
+            
+            for index in group:
+                _, issue_type, _, original_response, improved_response, matched_rules = pending[index]
+                validation = validations[index]
                 
-                validation_results.append({
+                writer.write({
                     'persona_name': persona_name,
-                    'issue_type': issue['type'],
-                    'validation': validation
+                    'issue_type': issue_type,
+                    'matched_rules': matched_rules,
+                    'user_message': validation.user_message,
+                    'original_response': validation.original_response,
+                    'improved_response': validation.improved_response,
+                    'original_score': validation.original_score,
+                    'improved_score': validation.improved_score,
+                    'improvement_rate': validation.improvement_rate,
+                    'applied': validation.applied,
+                    'reason': validation.reason
                 })
+                if keep_results:
+                    validation_results.append({
+                        'persona_name': persona_name,
+                        'issue_type': issue_type,
+                        'matched_rules': matched_rules,
+                        'validation': validation
+                    })
                 
+                stats = persona_stats[persona_name]
+                stats['total'] += 1
                 total_improvements += 1
                 if validation.applied:
+                    stats['applied'] += 1
                     applied_improvements += 1
                     print(f"  ✅ 개선 적용: {validation.reason}")
                     print(f"     원본: {original_response[:50]}...")
@@ -454,65 +770,74 @@ def validate_chat_improvements(error_keys: List[str] = None):
                     print(f"     점수: {validation.original_score:.1f} → {validation.improved_score:.1f} (+{validation.improvement_rate:.1f}%)")
                 else:
                     print(f"  ❌ 개선 미적용: {validation.reason}")
+        
+        pending.clear()
+        persona_groups.clear()
+    
+    for result in iter_analysis_results(detail_files):
+        analyzed_results += 1
+        if error_keys and result['error_key'] not in error_keys:
+            continue
+            
+        persona_name = result['persona_name']
+        group = []
+        persona_groups.append((persona_name, group))
+        
+        for issue in result['issues']:
+            if issue['severity'] in ['high', 'critical']:
+                user_msg = issue['user_message']
+                original_response = issue['ai_response']
+                improved_response = improve_response(validator, user_msg, original_response)
+                
+                group.append(len(pending))
+                pending.append((persona_name, issue['type'], user_msg, original_response, improved_response,
+                                validator.find_applicable_improvements(user_msg, original_response)))
+        
+        if len(pending) >= batch_size:
+            flush()
+    flush()
     
     # 결과 요약
     print("\n" + "="*80)
     print("📈 검증 결과 요약")
+    print(f"  - 분석 결과: {analyzed_results}개")
     print(f"  - 총 개선 시도: {total_improvements}건")
     if total_improvements > 0:
         print(f"  - 적용된 개선: {applied_improvements}건 ({applied_improvements/total_improvements*100:.1f}%)")
     else:
         print(f"  - 적용된 개선: 0건 (개선 대상 없음)")
     
-    # 페르소나별 통계
-    persona_stats = defaultdict(lambda: {'total': 0, 'applied': 0})
-    for result in validation_results:
-        stats = persona_stats[result['persona_name']]
-        stats['total'] += 1
-        if result['validation'].applied:
-            stats['applied'] += 1
-    
     print("\n페르소나별 개선 적용률:")
     for persona, stats in persona_stats.items():
         apply_rate = stats['applied'] / stats['total'] * 100 if stats['total'] > 0 else 0
         print(f"  - {persona}: {stats['applied']}/{stats['total']} ({apply_rate:.1f}%)")
     
     # 결과 저장
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = os.path.join(analysis_dir, f"validation_{timestamp}.json")
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'timestamp': timestamp,
-            'total_improvements': total_improvements,
-            'applied_improvements': applied_improvements,
-            'apply_rate': applied_improvements/total_improvements*100 if total_improvements > 0 else 0,
-            'persona_stats': dict(persona_stats),
-            'detailed_results': [
-                {
-                    'persona_name': r['persona_name'],
-                    'issue_type': r['issue_type'],
-                    'user_message': r['validation'].user_message,
-                    'original_response': r['validation'].original_response,
-                    'improved_response': r['validation'].improved_response,
-                    'original_score': r['validation'].original_score,
-                    'improved_score': r['validation'].improved_score,
-                    'improvement_rate': r['validation'].improvement_rate,
-                    'applied': r['validation'].applied,
-                    'reason': r['validation'].reason
-                }
-                for r in validation_results
-            ]
-        }, f, ensure_ascii=False, indent=2)
+    summary = {
+        'timestamp': timestamp,
+        'total_improvements': total_improvements,
+        'applied_improvements': applied_improvements,
+        'apply_rate': applied_improvements/total_improvements*100 if total_improvements > 0 else 0,
+        'persona_stats': dict(persona_stats)
+    }
+    writer.close(summary)
     
     print(f"\n💾 검증 결과 저장: {output_path}")
     
-    return validation_results
+    # 규칙별 적중/비용 (규칙이 늘어날 때 비싼 규칙 확인용)
+    print("\n⏱️  규칙 엔진 통계:")
+    validator.rule_engine.print_stats()
+    
+    if keep_results:
+        return validation_results
+    return summary if total_improvements else None
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description='대화 개선 검증 도구')
     parser.add_argument('--error-keys', nargs='+', help='특정 에러 키만 검증')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_VALIDATION_BATCH_SIZE,
+                        help=f'한 번에 검증할 최대 이슈 수 (기본: {DEFAULT_VALIDATION_BATCH_SIZE})')
     args = parser.parse_args()
     
-    validate_chat_improvements(error_keys=args.error_keys)
\ No newline at end of file
+    validate_chat_improvements(error_keys=args.error_keys, keep_results=False, batch_size=args.batch_size)
\ No newline at end of file
@@ -1,9 +1,13 @@
 import json
 import os
 from datetime import datetime
+from collections import defaultdict
 import glob
 import sys
 import io
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 
 # UTF-8 인코딩 설정
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -159,6 +163,353 @@ def compare_results(before, after):
         'achievement_rate': achievement_rate
     }
 
+# ---------------------------------------------------------------------------
+# 여러 실행에 걸친 추세 분석 (trend engine)
+# ---------------------------------------------------------------------------
+
+TREND_INDEX_DIRNAME = 'trend_index'
+RESULT_FILE_PATTERN = re.compile(r'^(summary|detailed)_(\d{8}_\d{6})\.json$')
+ALL_PERSONAS = '__all__'
+
+# (실행, 페르소나, 문제 유형)별 문제 건수
+ISSUE_COUNT_DTYPE = np.dtype([
+    ('run', '<u4'), ('persona', '<u4'), ('issue_type', '<u4'), ('count', '<u4')
+])
+# (실행, 페르소나)별 대화 수와 점수 합계 (요약 파일만 있는 실행은 topic/flow가 NaN)
+PERSONA_SCORE_DTYPE = np.dtype([
+    ('run', '<u4'), ('persona', '<u4'), ('conversations', '<u4'),
+    ('coherence_sum', '<f8'), ('topic_sum', '<f8'), ('flow_sum', '<f8')
+])
+
+class TrendIndex:
+    """summary_*/detailed_* 결과 파일을 한 번만 읽어 만든 추세 인덱스
+    
+    실행×페르소나×문제유형 집계를 .npy 파일로 저장하고 memory-map으로 읽으므로,
+    이후 조회는 JSON을 다시 파싱하지 않고 밀리초 단위로 끝납니다.
+    새 결과 파일은 기존 인덱스에 추가로만 색인합니다.
+    """
+    
+    def __init__(self, analysis_dir: str = 'analysis_results', index_dir: Optional[str] = None):
+        self.analysis_dir = analysis_dir
+        self.index_dir = index_dir or os.path.join(analysis_dir, TREND_INDEX_DIRNAME)
+        self.meta = {'files': {}, 'runs': [], 'personas': [], 'issue_types': []}
+        self.issue_counts = np.zeros(0, dtype=ISSUE_COUNT_DTYPE)
+        self.persona_scores = np.zeros(0, dtype=PERSONA_SCORE_DTYPE)
+    
+    # ----- 인덱스 생성/로드 -----
+    
+    def _meta_path(self) -> str:
+        return os.path.join(self.index_dir, 'meta.json')
+    
+    def _array_path(self, name: str) -> str:
+        return os.path.join(self.index_dir, f'{name}.npy')
+    
+    def load(self) -> bool:
+        """저장된 인덱스를 memory-map으로 엽니다."""
+        if not os.path.exists(self._meta_path()):
+            return False
+        with open(self._meta_path(), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.issue_counts = np.load(self._array_path('issue_counts'), mmap_mode='r')
+        self.persona_scores = np.load(self._array_path('persona_scores'), mmap_mode='r')
+        return True
+    
+    def _save(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        for name, array in (('issue_counts', self.issue_counts), ('persona_scores', self.persona_scores)):
+            tmp_path = self._array_path(name) + '.tmp.npy'
+            np.save(tmp_path, np.ascontiguousarray(array))
+            os.replace(tmp_path, self._array_path(name))
+        tmp_path = self._meta_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self._meta_path())
+        # 저장 후 memory-map으로 다시 열기
+        self.load()
+    
+    def _scan_result_files(self) -> Dict[str, Dict[str, str]]:
+        """실행 타임스탬프별 summary/detailed 파일 경로"""
+        runs = {}
+        if not os.path.isdir(self.analysis_dir):
+            return runs
+        for name in os.listdir(self.analysis_dir):
+            match = RESULT_FILE_PATTERN.match(name)
+            if match:
+                kind, run = match.groups()
+                runs.setdefault(run, {})[kind] = os.path.join(self.analysis_dir, name)
+        return runs
+    
+    @staticmethod
+    def _file_signature(path: str) -> List:
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime]
+    
+    def build(self, force: bool = False) -> int:
+        """새로 생긴 실행만 색인합니다. 기존 파일이 바뀌었으면 전체를 다시 만듭니다.
+        
+        반환값: 새로 색인한 실행 수
+        """
+        if not force:
+            self.load()
+        
+        result_files = self._scan_result_files()
+        indexed_files = self.meta.get('files', {})
+        
+        # 이미 색인된 파일이 바뀌거나 사라졌으면 처음부터 다시
+        changed = any(
+            not os.path.exists(path) or self._file_signature(path) != signature
+            for path, signature in indexed_files.items()
+        )
+        if force or changed:
+            self.meta = {'files': {}, 'runs': [], 'personas': [], 'issue_types': []}
+            self.issue_counts = np.zeros(0, dtype=ISSUE_COUNT_DTYPE)
+            self.persona_scores = np.zeros(0, dtype=PERSONA_SCORE_DTYPE)
+        
+        known_runs = set(self.meta['runs'])
+        new_runs = sorted(run for run in result_files if run not in known_runs)
+        if not new_runs:
+            return 0
+        
+        persona_ids = {name: i for i, name in enumerate(self.meta['personas'])}
+        issue_type_ids = {name: i for i, name in enumerate(self.meta['issue_types'])}
+        
+        def persona_id(name):
+            if name not in persona_ids:
+                persona_ids[name] = len(self.meta['personas'])
+                self.meta['personas'].append(name)
+            return persona_ids[name]
+        
+        def issue_type_id(name):
+            if name not in issue_type_ids:
+                issue_type_ids[name] = len(self.meta['issue_types'])
+                self.meta['issue_types'].append(name)
+            return issue_type_ids[name]
+        
+        issue_rows = []
+        score_rows = []
+        for run in new_runs:
+            run_id = len(self.meta['runs'])
+            files = result_files[run]
+            counts, scores = self._aggregate_run(files)
+            
+            for (persona, issue_type), count in counts.items():
+                issue_rows.append((run_id, persona_id(persona), issue_type_id(issue_type), count))
+            for persona, (conversations, coherence, topic, flow) in scores.items():
+                score_rows.append((run_id, persona_id(persona), conversations, coherence, topic, flow))
+            
+            self.meta['runs'].append(run)
+            for path in files.values():
+                self.meta['files'][path] = self._file_signature(path)
+        
+        # 기존 순서(실행 시간순)를 유지하도록 run 기준 정렬
+        self.meta['runs'], order = self._sorted_runs()
+        issue_counts = np.concatenate([np.asarray(self.issue_counts), np.array(issue_rows, dtype=ISSUE_COUNT_DTYPE)])
+        persona_scores = np.concatenate([np.asarray(self.persona_scores), np.array(score_rows, dtype=PERSONA_SCORE_DTYPE)])
+        issue_counts['run'] = order[issue_counts['run']]
+        persona_scores['run'] = order[persona_scores['run']]
+        self.issue_counts, self.persona_scores = issue_counts, persona_scores
+        
+        self._save()
+        return len(new_runs)
+    
+    def _sorted_runs(self) -> Tuple[List[str], np.ndarray]:
+        """실행을 시간순으로 정렬하고, 기존 run id -> 새 run id 매핑을 반환합니다."""
+        runs = self.meta['runs']
+        sorted_runs = sorted(runs)
+        position = {run: i for i, run in enumerate(sorted_runs)}
+        return sorted_runs, np.array([position[run] for run in runs], dtype='<u4')
+    
+    @staticmethod
+    def _aggregate_run(files: Dict[str, str]):
+        """결과 파일 하나를 (페르소나, 문제유형)별 건수와 페르소나별 점수 합계로 집계합니다."""
+        counts = defaultdict(int)
+        scores = {}
+        
+        if 'detailed' in files:
+            with open(files['detailed'], 'r', encoding='utf-8') as f:
+                detailed_results = json.load(f)
+            for result in detailed_results:
+                persona = result.get('persona_name', 'Unknown')
+                result_scores = result.get('scores', {})
+                conversations, coherence, topic, flow = scores.get(persona, (0, 0.0, 0.0, 0.0))
+                scores[persona] = (
+                    conversations + 1,
+                    coherence + result_scores.get('overall_coherence', 0),
+                    topic + result_scores.get('topic_consistency', 0),
+                    flow + result_scores.get('natural_flow', 0)
+                )
+                for issue in result.get('issues', []):
+                    counts[(persona, issue.get('type', 'unknown'))] += 1
+        else:
+            # 요약 파일만 있는 실행: 페르소나별 문제 유형 건수와 평균 일관성만 사용
+            with open(files['summary'], 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+            for persona, stats in summary.get('personas_with_issues', {}).items():
+                conversations = stats.get('total_conversations', 0)
+                scores[persona] = (
+                    conversations,
+                    stats.get('avg_coherence_score', 0) * conversations,
+                    float('nan'),
+                    float('nan')
+                )
+                for issue_type, count in stats.get('common_issue_types', {}).items():
+                    counts[(persona, issue_type)] += count
+        
+        return counts, scores
+    
+    # ----- 조회 -----
+    
+    def _persona_mask(self, array, persona_name: Optional[str]):
+        if persona_name in (None, ALL_PERSONAS):
+            return np.ones(len(array), dtype=bool)
+        if persona_name not in self.meta['personas']:
+            return np.zeros(len(array), dtype=bool)
+        return array['persona'] == self.meta['personas'].index(persona_name)
+    
+    def _conversations_per_run(self, persona_name: Optional[str]) -> np.ndarray:
+        mask = self._persona_mask(self.persona_scores, persona_name)
+        return np.bincount(self.persona_scores['run'][mask],
+                           weights=self.persona_scores['conversations'][mask],
+                           minlength=len(self.meta['runs']))
+    
+    def _issue_counts_per_run(self, issue_type: str, persona_name: Optional[str]) -> np.ndarray:
+        if issue_type not in self.meta['issue_types']:
+            return np.zeros(len(self.meta['runs']))
+        mask = self._persona_mask(self.issue_counts, persona_name) & \
+            (self.issue_counts['issue_type'] == self.meta['issue_types'].index(issue_type))
+        return np.bincount(self.issue_counts['run'][mask],
+                           weights=self.issue_counts['count'][mask],
+                           minlength=len(self.meta['runs']))
+    
+    def issue_series(self, issue_type: str, persona_name: Optional[str] = None) -> List[Dict]:
+        """문제 유형의 실행별 건수와 대화당 발생률 (페르소나 지정 시 해당 페르소나만)"""
+        conversations = self._conversations_per_run(persona_name)
+        counts = self._issue_counts_per_run(issue_type, persona_name)
+        return [
+            {
+                'run': run,
+                'conversations': int(conversations[i]),
+                'count': int(counts[i]),
+                'rate': counts[i] / conversations[i]
+            }
+            for i, run in enumerate(self.meta['runs']) if conversations[i] > 0
+        ]
+    
+    def persona_series(self, persona_name: str) -> List[Dict]:
+        """페르소나의 실행별 평균 점수와 문제 유형별 건수"""
+        mask = self._persona_mask(self.persona_scores, persona_name)
+        rows = self.persona_scores[mask]
+        issue_rows = self.issue_counts[self._persona_mask(self.issue_counts, persona_name)]
+        
+        series = []
+        for row in np.sort(rows, order='run'):
+            run_issues = issue_rows[issue_rows['run'] == row['run']]
+            conversations = int(row['conversations'])
+            series.append({
+                'run': self.meta['runs'][row['run']],
+                'conversations': conversations,
+                'avg_coherence': row['coherence_sum'] / conversations if conversations else float('nan'),
+                'avg_topic_consistency': row['topic_sum'] / conversations if conversations else float('nan'),
+                'avg_natural_flow': row['flow_sum'] / conversations if conversations else float('nan'),
+                'issues': {self.meta['issue_types'][r['issue_type']]: int(r['count']) for r in run_issues}
+            })
+        return series
+    
+    def detect_regressions(self, window: int = 3, min_rate_increase: float = 0.5,
+                           min_ratio: float = 1.5, min_coherence_drop: float = 10.0) -> List[Dict]:
+        """각 페르소나(및 전체)의 최신 실행을 직전 window개 실행 평균과 비교해 악화를 찾습니다.
+        
+        - 문제 유형: 대화당 발생률이 min_rate_increase 이상 늘고 기준의 min_ratio배 이상
+        - 일관성 점수: 평균이 min_coherence_drop점 이상 하락
+        """
+        run_count = len(self.meta['runs'])
+        persona_count = len(self.meta['personas'])
+        type_count = len(self.meta['issue_types'])
+        if run_count < 2:
+            return []
+        
+        # 페르소나×실행 대화 수 / 일관성 합계, 페르소나×유형×실행 문제 건수 (밀집 행렬)
+        conversations = np.zeros((persona_count + 1, run_count))
+        coherence = np.zeros((persona_count + 1, run_count))
+        counts = np.zeros((persona_count + 1, type_count, run_count))
+        np.add.at(conversations, (self.persona_scores['persona'], self.persona_scores['run']),
+                  self.persona_scores['conversations'])
+        np.add.at(coherence, (self.persona_scores['persona'], self.persona_scores['run']),
+                  self.persona_scores['coherence_sum'])
+        np.add.at(counts, (self.issue_counts['persona'], self.issue_counts['issue_type'], self.issue_counts['run']),
+                  self.issue_counts['count'])
+        # 마지막 행은 전체 합계
+        conversations[-1] = conversations[:-1].sum(axis=0)
+        coherence[-1] = coherence[:-1].sum(axis=0)
+        counts[-1] = counts[:-1].sum(axis=0)
+        
+        names = self.meta['personas'] + [ALL_PERSONAS]
+        regressions = []
+        for p, persona in enumerate(names):
+            active_runs = np.nonzero(conversations[p] > 0)[0]
+            if len(active_runs) < 2:
+                continue
+            latest = active_runs[-1]
+            baseline_runs = active_runs[-1 - window:-1]
+            
+            rates = counts[p][:, active_runs] / conversations[p][active_runs]
+            latest_rate = counts[p][:, latest] / conversations[p][latest]
+            baseline_rate = rates[:, :-1][:, -window:].mean(axis=1)
+            
+            flagged = (latest_rate - baseline_rate >= min_rate_increase) & \
+                (latest_rate >= baseline_rate * min_ratio)
+            for t in np.nonzero(flagged)[0]:
+                regressions.append({
+                    'persona': persona,
+                    'metric': self.meta['issue_types'][t],
+                    'run': self.meta['runs'][latest],
+                    'baseline': round(float(baseline_rate[t]), 2),
+                    'latest': round(float(latest_rate[t]), 2)
+                })
+            
+            latest_coherence = coherence[p][latest] / conversations[p][latest]
+            baseline_coherence = (coherence[p][baseline_runs] / conversations[p][baseline_runs]).mean()
+            if baseline_coherence - latest_coherence >= min_coherence_drop:
+                regressions.append({
+                    'persona': persona,
+                    'metric': 'avg_coherence',
+                    'run': self.meta['runs'][latest],
+                    'baseline': round(float(baseline_coherence), 1),
+                    'latest': round(float(latest_coherence), 1)
+                })
+        
+        return regressions
+
+def print_trend_report(index: TrendIndex, persona_name: Optional[str] = None,
+                       issue_type: Optional[str] = None, window: int = 3):
+    """추세 인덱스 조회 결과를 출력합니다."""
+    print("\n" + "="*60)
+    print(f"📈 실행별 추세 분석 ({len(index.meta['runs'])}개 실행, 페르소나 {len(index.meta['personas'])}명)")
+    print("="*60)
+    
+    if issue_type:
+        target = persona_name or '전체'
+        print(f"\n🔍 {issue_type} 추이 ({target}):")
+        series = index.issue_series(issue_type, persona_name)
+        for i, point in enumerate(series):
+            previous = [p['rate'] for p in series[max(0, i - window):i]]
+            spike = previous and point['rate'] >= 2 * (sum(previous) / len(previous)) and point['count'] > 0
+            marker = " ▲ 급증" if spike else ""
+            print(f"  {point['run']}: {point['count']}건 / 대화 {point['conversations']}개 "
+                  f"(대화당 {point['rate']:.2f}){marker}")
+    elif persona_name:
+        print(f"\n👤 {persona_name} 추이:")
+        for point in index.persona_series(persona_name):
+            top_issues = ', '.join(f"{t} {c}" for t, c in sorted(point['issues'].items(), key=lambda x: x[1], reverse=True)[:3])
+            print(f"  {point['run']}: 대화 {point['conversations']}개, 일관성 {point['avg_coherence']:.1f}"
+                  f"{' | ' + top_issues if top_issues else ''}")
+    
+    regressions = index.detect_regressions(window=window)
+    print(f"\n🚨 자동 감지된 악화 ({len(regressions)}건, 직전 {window}개 실행 대비):")
+    for r in regressions:
+        persona = '전체' if r['persona'] == ALL_PERSONAS else r['persona']
+        print(f"  - [{r['run']}] {persona} / {r['metric']}: {r['baseline']} → {r['latest']}")
+
 def main():
     # 개선 전 결과 (하드코딩 - 이전 테스트 결과)
     before_results = {
@@ -207,4 +558,22 @@ def main():
         print("python scripts/analyze_chat_errors.py --recheck")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description='분석 결과 비교 및 실행별 추세 분석')
+    parser.add_argument('--trend', action='store_true', help='모든 실행에 대한 추세 인덱스 조회 및 악화 감지')
+    parser.add_argument('--analysis-dir', type=str, default='analysis_results',
+                        help='summary_*/detailed_* 파일이 있는 폴더 (기본: analysis_results)')
+    parser.add_argument('--persona', type=str, help='특정 페르소나의 추이 조회')
+    parser.add_argument('--issue-type', type=str, help='특정 문제 유형의 추이 조회 (예: macro_response)')
+    parser.add_argument('--window', type=int, default=3, help='악화 판단 기준이 되는 직전 실행 수 (기본: 3)')
+    parser.add_argument('--rebuild', action='store_true', help='추세 인덱스를 처음부터 다시 생성')
+    args = parser.parse_args()
+    
+    if args.trend or args.persona or args.issue_type:
+        trend_index = TrendIndex(args.analysis_dir)
+        added = trend_index.build(force=args.rebuild)
+        if added:
+            print(f"🗂️  추세 인덱스에 {added}개 실행 추가: {trend_index.index_dir}")
+        print_trend_report(trend_index, args.persona, args.issue_type, args.window)
+    else:
+        main()
\ No newline at end of file
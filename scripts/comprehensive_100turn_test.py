@@ -5,29 +5,129 @@
 
 import asyncio
 import json
+import os
 import random
 import time
 from datetime import datetime
 from typing import List, Dict, Any
 import aiohttp
-import firebase_admin
-from firebase_admin import credentials, firestore
+try:
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+except ImportError:
+    # --mock / --personas-file 실행에는 필요 없음
+    firebase_admin = None
 import pandas as pd
-from collections import defaultdict
+from collections import defaultdict, deque
+from keyword_matcher import KeywordMatcher
+from rate_limiter import TokenBucketRateLimiter
+from llm_cassette import CASSETTE_MODES, DEFAULT_CASSETTE_PATH, DEFAULT_MAX_ENTRIES, LLMCassette
+from latency_histogram import LatencyHistogram, REPORT_PERCENTILES, percentile_key
 
-# Firebase 초기화
-if not firebase_admin._apps:
-    cred = credentials.Certificate('firebase-service-account-key.json')
-    firebase_admin.initialize_app(cred)
+_db = None
 
-db = firestore.client()
+def get_db():
+    """Firestore 클라이언트 (처음 필요할 때 초기화 - 로컬 페르소나로 실행하면 키 파일 불필요)"""
+    global _db
+    if _db is None:
+        if firebase_admin is None:
+            raise RuntimeError("Firestore에서 페르소나를 읽으려면 firebase-admin이 필요합니다 (pip install firebase-admin) "
+                               "- 또는 --mock / --personas-file 사용")
+        if not firebase_admin._apps:
+            cred = credentials.Certificate('firebase-service-account-key.json')
+            firebase_admin.initialize_app(cred)
+        _db = firestore.client()
+    return _db
+
+# --mock에서 --personas-file이 없을 때 쓰는 로컬 페르소나 (Firestore personas 문서와 같은 필드)
+MOCK_PERSONAS = [
+    {'id': 'mock-persona-1', 'name': '하늘', 'age': 24, 'personality': '밝고 수다스러움', 'mbti': 'ENFP', 'speaking_style': '친근한 반말'},
+    {'id': 'mock-persona-2', 'name': '서준', 'age': 27, 'personality': '차분하고 배려심 많음', 'mbti': 'ISFJ', 'speaking_style': '부드러운 존댓말'},
+    {'id': 'mock-persona-3', 'name': '민지', 'age': 22, 'personality': '장난기 많고 솔직함', 'mbti': 'ESTP', 'speaking_style': '짧은 반말'},
+]
+
+def load_personas_file(path: str) -> List[Dict]:
+    """JSON 파일에서 페르소나 목록 로드 (리스트, 또는 {"personas": [...]} 형식)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    personas = data.get('personas', []) if isinstance(data, dict) else data
+    for i, persona in enumerate(personas):
+        persona.setdefault('id', f"local-persona-{i + 1}")
+    return personas
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+MOCK_REQUESTS_PER_MINUTE = 600000  # 모의 서버 사용 시 클라이언트 측 제한 (사실상 무제한)
+
+# 동시 실행 모드 기본값
+DEFAULT_CONCURRENCY = 10          # 동시에 대화하는 페르소나 수 (= 커넥션 풀 크기)
+DEFAULT_REQUESTS_PER_MINUTE = 500  # 헤더를 받기 전 초기 요청 속도
+MAX_RATE_LIMIT_RETRIES = 3        # 429 응답 재시도 횟수
+
+# 부적절한 응답 패턴 (한 번의 스캔으로 모두 탐지)
+INAPPROPRIATE_PATTERN_MATCHER = KeywordMatcher([
+    "소울메이트", "만나자", "연락처", "번호",
+    "실제로 만나", "오프라인", "직접 만나"
+])
+
+# 일관성 체크에서 제외하는 최근 턴 수 (같은 질문이 연달아 나오는 경우는 비교하지 않음)
+CONSISTENCY_EXCLUDE_RECENT = 5
+CONSISTENCY_LENGTH_GAP = 50  # 같은 질문의 이전 답변과 길이 차이가 이보다 크면 일관성 없음
+
+
+class ConversationIndex:
+    """대화 하나의 증분 평가 상태
+
+    정규화(소문자)한 사용자 메시지 -> 이전 답변 길이의 (최소, 최대)를 해시 인덱스로 유지합니다.
+    최근 CONSISTENCY_EXCLUDE_RECENT턴은 대기열에 두었다가 창 밖으로 밀려날 때 인덱스에 넣으므로,
+    매 턴 전체 기록을 다시 훑지 않고 `history[:-5]`를 스캔한 것과 같은 결과를 O(1)에 얻습니다.
+    """
+
+    def __init__(self, exclude_recent: int = CONSISTENCY_EXCLUDE_RECENT):
+        self.exclude_recent = exclude_recent
+        self._recent = deque()
+        self._lengths: Dict[str, List[int]] = {}
+        self._synced = 0  # 인덱스에 반영한 기록 수
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        return message.lower()
+
+    def sync(self, history: List[Dict]):
+        """이전 호출 이후 추가된 기록만 반영합니다."""
+        for h in history[self._synced:]:
+            self._recent.append((self.normalize(h['user']), len(h['ai'])))
+        self._synced = len(history)
+        while len(self._recent) > self.exclude_recent:
+            key, length = self._recent.popleft()
+            bounds = self._lengths.get(key)
+            if bounds is None:
+                self._lengths[key] = [length, length]
+            else:
+                bounds[0] = min(bounds[0], length)
+                bounds[1] = max(bounds[1], length)
+
+    def is_inconsistent(self, user_message: str, ai_response: str) -> bool:
+        """창 밖의 같은 질문 답변 중 길이 차이가 큰 것이 있는지"""
+        bounds = self._lengths.get(self.normalize(user_message))
+        if bounds is None:
+            return False
+        length = len(ai_response)
+        return max(length - bounds[0], bounds[1] - length) > CONSISTENCY_LENGTH_GAP
 
 class ComprehensiveDialogueTest:
-    def __init__(self):
+    def __init__(self, api_base: str = None, seed: int = None, cassette: LLMCassette = None,
+                 personas: List[Dict] = None):
+        """personas를 넘기면 Firestore 대신 그 목록으로 테스트합니다 (Firebase 초기화 안 함)."""
         self.test_results = []
         self.personas = []
         self.api_key = None
-        self.load_config()
+        # chat-completions 엔드포인트 (모의 서버 등 호환 서버로 교체 가능)
+        self.api_base = (api_base or os.environ.get('OPENAI_BASE_URL') or DEFAULT_API_BASE).rstrip('/')
+        # 시드를 주면 페르소나별 난수열을 고정 (동시 실행에서도 실행 순서와 무관하게 재현)
+        self.seed = seed
+        # 녹화/재생 캐시 (같은 요청은 네트워크 없이 재생)
+        self.cassette = cassette
+        self.load_config(personas)
         
         # 테스트 시나리오 (100턴 대화를 위한 다양한 주제)
         self.test_scenarios = [
@@ -74,20 +174,25 @@ class ComprehensiveDialogueTest:
         ]
         
         # 평가 메트릭
-        self.metrics = {
+        self.metrics = self.new_metrics()
+        
+    @staticmethod
+    def new_metrics() -> Dict[str, Any]:
+        """페르소나 하나 분량의 빈 메트릭 (동시 실행 시 페르소나마다 따로 사용)"""
+        return {
             'coherence': [],  # 일관성
             'relevance': [],  # 관련성
             'naturalness': [],  # 자연스러움
             'consistency': [],  # 캐릭터 일관성
             'engagement': [],  # 몰입도
-            'response_time': [],  # 응답 시간
+            'response_time': LatencyHistogram(),  # 응답 시간 (고정 메모리 히스토그램)
             'error_count': 0,  # 에러 횟수
             'repetition_count': 0,  # 반복 응답
             'off_topic_count': 0,  # 주제 이탈
             'inappropriate_count': 0  # 부적절한 응답
         }
         
-    def load_config(self):
+    def load_config(self, personas: List[Dict] = None):
         """설정 및 페르소나 로드"""
         # OpenAI API 키 로드
         try:
@@ -99,105 +204,132 @@ class ComprehensiveDialogueTest:
             print("⚠️ .env 파일에서 API 키를 찾을 수 없습니다")
             
         # 페르소나 로드
-        personas_ref = db.collection('personas')
-        personas = personas_ref.limit(10).get()  # 10개 페르소나로 테스트
-        
-        for doc in personas:
-            persona_data = doc.to_dict()
-            persona_data['id'] = doc.id
-            self.personas.append(persona_data)
+        if personas is not None:
+            self.personas.extend(personas)
+        else:
+            personas_ref = get_db().collection('personas')
+            docs = personas_ref.limit(10).get()  # 10개 페르소나로 테스트
+            
+            for doc in docs:
+                persona_data = doc.to_dict()
+                persona_data['id'] = doc.id
+                self.personas.append(persona_data)
             
         print(f"✅ {len(self.personas)}개 페르소나 로드 완료")
         
-    async def simulate_conversation(self, persona: Dict, num_turns: int = 100) -> Dict:
-        """단일 페르소나와 100턴 대화 시뮬레이션"""
+    async def simulate_conversation(self, persona: Dict, num_turns: int = 100,
+                                    session: aiohttp.ClientSession = None,
+                                    rate_limiter: TokenBucketRateLimiter = None,
+                                    metrics: Dict[str, Any] = None) -> Dict:
+        """단일 페르소나와 100턴 대화 시뮬레이션
+        
+        session을 넘기면 그 세션(커넥션 풀)을 공유하고, rate_limiter를 넘기면
+        턴마다 고정 sleep 대신 토큰 버킷으로 호출 속도를 조절합니다.
+        metrics를 넘기지 않으면 self.metrics에 누적합니다.
+        """
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.simulate_conversation(persona, num_turns, own_session, rate_limiter, metrics)
+        
         print(f"\n🎭 {persona['name']} 페르소나와 {num_turns}턴 대화 시작...")
         
+        if metrics is None:
+            metrics = self.metrics
+        rng = random.Random(f"{self.seed}:{persona.get('id', persona['name'])}") if self.seed is not None else random
         conversation_history = []
+        conversation_index = ConversationIndex()
         issues = []
         
-        async with aiohttp.ClientSession() as session:
-            for turn in range(num_turns):
-                # 시나리오에서 메시지 선택
-                user_message = self.test_scenarios[turn % len(self.test_scenarios)]
+        for turn in range(num_turns):
+            # 시나리오에서 메시지 선택
+            user_message = self.test_scenarios[turn % len(self.test_scenarios)]
+            
+            # 약간의 변형 추가
+            if rng.random() > 0.7:
+                variations = ["ㅋㅋ", "ㅎㅎ", "~", "?", "!!", "..."]
+                user_message += rng.choice(variations)
+            
+            start_time = time.time()
+            
+            try:
+                # OpenAI API 호출 (실제 서비스와 동일한 방식)
+                response = await self.call_openai_api(
+                    session, 
+                    persona, 
+                    user_message, 
+                    conversation_history,
+                    rate_limiter
+                )
                 
-                # 약간의 변형 추가
-                if random.random() > 0.7:
-                    variations = ["ㅋㅋ", "ㅎㅎ", "~", "?", "!!", "..."]
-                    user_message += random.choice(variations)
+                response_time = time.time() - start_time
                 
-                start_time = time.time()
+                # 대화 기록
+                conversation_history.append({
+                    'turn': turn + 1,
+                    'user': user_message,
+                    'ai': response,
+                    'time': response_time
+                })
                 
-                try:
-                    # OpenAI API 호출 (실제 서비스와 동일한 방식)
-                    response = await self.call_openai_api(
-                        session, 
-                        persona, 
-                        user_message, 
-                        conversation_history
-                    )
-                    
-                    response_time = time.time() - start_time
-                    
-                    # 대화 기록
-                    conversation_history.append({
+                # 실시간 평가
+                evaluation = self.evaluate_response(
+                    user_message, 
+                    response, 
+                    conversation_history,
+                    metrics,
+                    conversation_index
+                )
+                
+                # 문제 감지
+                if evaluation['score'] < 70:
+                    issues.append({
                         'turn': turn + 1,
                         'user': user_message,
                         'ai': response,
-                        'time': response_time
+                        'issue': evaluation['issues']
                     })
                     
-                    # 실시간 평가
-                    evaluation = self.evaluate_response(
-                        user_message, 
-                        response, 
-                        conversation_history
-                    )
-                    
-                    # 문제 감지
-                    if evaluation['score'] < 70:
-                        issues.append({
-                            'turn': turn + 1,
-                            'user': user_message,
-                            'ai': response,
-                            'issue': evaluation['issues']
-                        })
-                        
-                    # 메트릭 업데이트
-                    self.update_metrics(evaluation, response_time)
-                    
-                    # 진행 상황 출력 (10턴마다)
-                    if (turn + 1) % 10 == 0:
-                        print(f"  📊 {turn + 1}턴 완료 - 평균 점수: {evaluation['score']:.1f}")
-                        
-                except Exception as e:
-                    print(f"  ❌ 턴 {turn + 1} 에러: {str(e)}")
-                    self.metrics['error_count'] += 1
-                    issues.append({
-                        'turn': turn + 1,
-                        'error': str(e)
-                    })
+                # 메트릭 업데이트
+                self.update_metrics(evaluation, response_time, metrics)
                 
-                # API 제한 방지
+                # 진행 상황 출력 (10턴마다)
+                if (turn + 1) % 10 == 0:
+                    print(f"  📊 {persona['name']} {turn + 1}턴 완료 - 평균 점수: {evaluation['score']:.1f}")
+                    
+            except Exception as e:
+                print(f"  ❌ 턴 {turn + 1} 에러: {str(e)}")
+                metrics['error_count'] += 1
+                issues.append({
+                    'turn': turn + 1,
+                    'error': str(e)
+                })
+            
+            # API 제한 방지 (속도 제한기가 없을 때만 고정 대기)
+            if rate_limiter is None:
                 await asyncio.sleep(0.5)
-        
+    
         # 결과 요약
         result = {
             'persona': persona['name'],
             'total_turns': num_turns,
             'completed_turns': len(conversation_history),
-            'average_score': sum(self.metrics['coherence']) / len(self.metrics['coherence']) if self.metrics['coherence'] else 0,
+            'average_score': sum(metrics['coherence']) / len(metrics['coherence']) if metrics['coherence'] else 0,
             'issues_count': len(issues),
-            'error_count': self.metrics['error_count'],
+            'error_count': metrics['error_count'],
             'conversation': conversation_history,
             'issues': issues,
-            'metrics': self.calculate_final_metrics()
+            'metrics': self.calculate_final_metrics(metrics)
         }
         
         return result
         
-    async def call_openai_api(self, session, persona, user_message, history):
-        """OpenAI API 호출 (실제 서비스 로직 시뮬레이션)"""
+    async def call_openai_api(self, session, persona, user_message, history, rate_limiter=None):
+        """OpenAI API 호출 (실제 서비스 로직 시뮬레이션)
+        
+        rate_limiter가 있으면 호출 전에 토큰을 받고, 응답의 rate limit 헤더를 반영하며,
+        429 응답은 서버가 알려준 시간만큼 기다린 뒤 재시도합니다.
+        cassette가 있으면 녹화된 응답을 먼저 찾고, 재생한 호출은 속도 제한에 포함하지 않습니다.
+        """
         # 시스템 프롬프트 구성
         system_prompt = f"""당신은 {persona['name']}입니다.
 나이: {persona.get('age', '20대')}
@@ -223,13 +355,6 @@ MBTI: {persona.get('mbti', 'ENFP')}
             
         messages.append({"role": "user", "content": user_message})
         
-        # OpenAI API 호출
-        url = "https://api.openai.com/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         data = {
             "model": "gpt-4o-mini",
             "messages": messages,
@@ -237,15 +362,53 @@ MBTI: {persona.get('mbti', 'ENFP')}
             "max_tokens": 150
         }
         
-        async with session.post(url, headers=headers, json=data) as response:
-            if response.status == 200:
-                result = await response.json()
-                return result['choices'][0]['message']['content']
-            else:
+        if self.cassette is None:
+            return await self._post_chat_completion(session, data, rate_limiter)
+        return await self.cassette.fetch(
+            data['model'], messages, data['temperature'],
+            lambda: self._post_chat_completion(session, data, rate_limiter)
+        )
+        
+    async def _post_chat_completion(self, session, data, rate_limiter=None):
+        """chat-completions 엔드포인트로 실제 요청을 보내고 응답 텍스트를 반환"""
+        url = f"{self.api_base}/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        if rate_limiter is None:
+            async with session.post(url, headers=headers, json=data) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result['choices'][0]['message']['content']
+                else:
+                    raise Exception(f"API Error: {response.status}")
+        
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            await rate_limiter.acquire()
+            async with session.post(url, headers=headers, json=data) as response:
+                rate_limiter.update_from_headers(response.headers)
+                if response.status == 200:
+                    result = await response.json()
+                    return result['choices'][0]['message']['content']
+                if response.status == 429 and attempt < MAX_RATE_LIMIT_RETRIES:
+                    if 'retry-after' not in response.headers:
+                        rate_limiter.block_for(2 ** attempt)
+                    continue
                 raise Exception(f"API Error: {response.status}")
                 
-    def evaluate_response(self, user_message, ai_response, history):
-        """응답 평가"""
+    def evaluate_response(self, user_message, ai_response, history, metrics=None, index=None):
+        """응답 평가
+        
+        대화마다 같은 ConversationIndex를 넘기면 턴당 평가 비용이 대화 길이와 무관해집니다
+        (없으면 history 전체로 임시 인덱스를 만듦).
+        """
+        if metrics is None:
+            metrics = self.metrics
+        if index is None:
+            index = ConversationIndex()
+        index.sync(history)
         issues = []
         score = 100
         
@@ -263,7 +426,7 @@ MBTI: {persona.get('mbti', 'ENFP')}
             if ai_response == last_response:
                 issues.append("동일한 응답 반복")
                 score -= 20
-                self.metrics['repetition_count'] += 1
+                metrics['repetition_count'] += 1
                 
         # 3. 관련성 체크
         if "?" in user_message and "?" not in ai_response and len(ai_response) < 20:
@@ -271,50 +434,51 @@ MBTI: {persona.get('mbti', 'ENFP')}
             score -= 15
             
         # 4. 일관성 체크 (같은 질문에 대한 다른 답변)
-        for h in history[:-5]:  # 최근 5턴 제외하고 체크
-            if h['user'].lower() == user_message.lower():
-                if abs(len(h['ai']) - len(ai_response)) > 50:
-                    issues.append("일관성 없는 응답")
-                    score -= 10
-                    break
+        if index.is_inconsistent(user_message, ai_response):  # 최근 5턴 제외하고 체크
+            issues.append("일관성 없는 응답")
+            score -= 10
                     
         # 5. 부적절한 패턴 체크
-        inappropriate_patterns = [
-            "소울메이트", "만나자", "연락처", "번호", 
-            "실제로 만나", "오프라인", "직접 만나"
-        ]
-        for pattern in inappropriate_patterns:
-            if pattern in ai_response:
-                issues.append(f"부적절한 내용: {pattern}")
-                score -= 25
-                self.metrics['inappropriate_count'] += 1
+        for hit in INAPPROPRIATE_PATTERN_MATCHER.find_distinct(ai_response):
+            issues.append(f"부적절한 내용: {hit.keyword}")
+            score -= 25
+            metrics['inappropriate_count'] += 1
                 
         # 6. 주제 이탈 체크
         if "뭐해" in user_message and "날씨" in ai_response:
             issues.append("주제 이탈")
             score -= 10
-            self.metrics['off_topic_count'] += 1
+            metrics['off_topic_count'] += 1
             
         return {
             'score': max(0, score),
             'issues': issues
         }
         
-    def update_metrics(self, evaluation, response_time):
+    def update_metrics(self, evaluation, response_time, metrics=None):
         """메트릭 업데이트"""
-        self.metrics['coherence'].append(evaluation['score'])
-        self.metrics['response_time'].append(response_time)
+        if metrics is None:
+            metrics = self.metrics
+        metrics['coherence'].append(evaluation['score'])
+        metrics['response_time'].record(response_time)
         
-    def calculate_final_metrics(self):
+    def calculate_final_metrics(self, metrics=None):
         """최종 메트릭 계산"""
-        return {
-            'average_coherence': sum(self.metrics['coherence']) / len(self.metrics['coherence']) if self.metrics['coherence'] else 0,
-            'average_response_time': sum(self.metrics['response_time']) / len(self.metrics['response_time']) if self.metrics['response_time'] else 0,
-            'error_rate': self.metrics['error_count'] / 100,
-            'repetition_rate': self.metrics['repetition_count'] / 100,
-            'off_topic_rate': self.metrics['off_topic_count'] / 100,
-            'inappropriate_rate': self.metrics['inappropriate_count'] / 100
+        if metrics is None:
+            metrics = self.metrics
+        latency = metrics['response_time']
+        final_metrics = {
+            'average_coherence': sum(metrics['coherence']) / len(metrics['coherence']) if metrics['coherence'] else 0,
+            'average_response_time': latency.mean,
+            'error_rate': metrics['error_count'] / 100,
+            'repetition_rate': metrics['repetition_count'] / 100,
+            'off_topic_rate': metrics['off_topic_count'] / 100,
+            'inappropriate_rate': metrics['inappropriate_count'] / 100
         }
+        for q in REPORT_PERCENTILES:
+            final_metrics[f'{percentile_key(q)}_response_time'] = latency.percentile(q)
+        final_metrics['latency_histogram'] = latency.to_dict()
+        return final_metrics
         
     async def run_comprehensive_test(self):
         """포괄적 테스트 실행"""
@@ -329,18 +493,7 @@ MBTI: {persona.get('mbti', 'ENFP')}
             print(f"\n[{i}/{min(3, len(self.personas))}] 테스트 중...")
             
             # 메트릭 초기화
-            self.metrics = {
-                'coherence': [],
-                'relevance': [],
-                'naturalness': [],
-                'consistency': [],
-                'engagement': [],
-                'response_time': [],
-                'error_count': 0,
-                'repetition_count': 0,
-                'off_topic_count': 0,
-                'inappropriate_count': 0
-            }
+            self.metrics = self.new_metrics()
             
             result = await self.simulate_conversation(persona, 100)
             all_results.append(result)
@@ -356,6 +509,50 @@ MBTI: {persona.get('mbti', 'ENFP')}
         
         return all_results
         
+    async def run_concurrent_test(self, num_turns: int = 100, concurrency: int = DEFAULT_CONCURRENCY,
+                                  requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                                  persona_limit: int = None):
+        """로드한 모든 페르소나를 동시에 테스트
+        
+        페르소나마다 asyncio 작업 하나로 대화하고, 모든 작업이 커넥션 풀을 가진
+        aiohttp 세션 하나와 토큰 버킷 속도 제한기 하나를 공유합니다.
+        """
+        personas = self.personas[:persona_limit] if persona_limit else self.personas
+        
+        print("=" * 80)
+        print(f"🚀 100턴 대화 품질 테스트 시작 (동시 실행: 페르소나 {len(personas)}개, 최대 {concurrency}개 동시)")
+        print("=" * 80)
+        
+        rate_limiter = TokenBucketRateLimiter.per_minute(requests_per_minute, burst=concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+        started = time.time()
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def run_persona(persona):
+                async with semaphore:
+                    result = await self.simulate_conversation(
+                        persona, num_turns, session, rate_limiter, self.new_metrics()
+                    )
+                print(f"\n📈 {persona['name']} 결과:")
+                print(f"  - 평균 점수: {result['average_score']:.1f}/100")
+                print(f"  - 문제 발생: {result['issues_count']}회")
+                print(f"  - 에러 발생: {result['error_count']}회")
+                return result
+            
+            # gather는 입력 순서대로 결과를 돌려주므로 보고서의 페르소나 순서가 유지됨
+            all_results = await asyncio.gather(*(run_persona(persona) for persona in personas))
+        
+        limiter_stats = rate_limiter.stats()
+        print(f"\n⏱️  전체 소요 시간: {time.time() - started:.1f}초 "
+              f"(요청 {limiter_stats['acquired']}회, 제한 대기 {limiter_stats['throttled']}회, "
+              f"평균 대기 {limiter_stats['average_wait_seconds']:.2f}초)")
+        
+        # 최종 보고서 생성
+        self.generate_final_report(list(all_results))
+        
+        return list(all_results)
+        
     def generate_final_report(self, results):
         """최종 보고서 생성"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -377,6 +574,14 @@ MBTI: {persona.get('mbti', 'ENFP')}
                 for i in issue['issue']:
                     issue_types[i] += 1
                     
+        # 페르소나별 히스토그램을 병합해 전체 응답 시간 분포 계산
+        latency = LatencyHistogram.merged(
+            LatencyHistogram.from_dict(r['metrics']['latency_histogram']) for r in results
+        )
+        latency_line = f"평균 {latency.mean:.2f}초, " + ", ".join(
+            f"{percentile_key(q)} {latency.percentile(q):.2f}초" for q in REPORT_PERCENTILES
+        )
+        
         # 보고서 작성
         report = f"""
 ====================================
@@ -391,6 +596,7 @@ MBTI: {persona.get('mbti', 'ENFP')}
 평균 품질 점수: {avg_score:.1f}/100
 총 문제 발생: {total_issues}회 ({total_issues/total_turns*100:.1f}%)
 총 에러 발생: {total_errors}회 ({total_errors/total_turns*100:.1f}%)
+응답 시간: {latency_line}
 
 🔍 주요 문제 패턴
 ------------------"""
@@ -405,7 +611,7 @@ MBTI: {persona.get('mbti', 'ENFP')}
             report += f"""
 {r['persona']}:
   - 평균 점수: {r['average_score']:.1f}
-  - 응답 시간: {metrics['average_response_time']:.2f}초
+  - 응답 시간: {metrics['average_response_time']:.2f}초 (p99 {metrics['p99_response_time']:.2f}초)
   - 반복률: {metrics['repetition_rate']*100:.1f}%
   - 주제이탈률: {metrics['off_topic_rate']*100:.1f}%
   - 부적절응답률: {metrics['inappropriate_rate']*100:.1f}%"""
@@ -460,13 +666,22 @@ MBTI: {persona.get('mbti', 'ENFP')}
         
         return report
 
-async def main():
+async def main(args=None):
     """메인 실행"""
-    tester = ComprehensiveDialogueTest()
+    if args is not None and args.mock:
+        await run_with_mock_server(args)
+        return
+    
+    tester = ComprehensiveDialogueTest(
+        api_base=args.api_base if args is not None else None,
+        seed=args.seed if args is not None else None,
+        cassette=open_cassette(args),
+        personas=load_personas_file(args.personas_file) if args is not None and args.personas_file else None
+    )
     
-    # .env 파일이 없으면 생성
-    import os
-    if not os.path.exists('.env'):
+    # .env 파일이 없으면 생성 (녹화된 응답만 재생할 때는 API 키 불필요)
+    replay_only = tester.cassette is not None and tester.cassette.mode == 'replay'
+    if not replay_only and not os.path.exists('.env'):
         print("⚠️ .env 파일을 생성하고 OpenAI API 키를 입력해주세요")
         with open('.env', 'w') as f:
             f.write("OPENAI_API_KEY=your-api-key-here\n")
@@ -475,12 +690,83 @@ async def main():
     # test_results 디렉토리 생성
     os.makedirs('test_results', exist_ok=True)
     
-    # 테스트 실행
-    results = await tester.run_comprehensive_test()
+    await run_tests(tester, args)
+
+async def run_tests(tester: ComprehensiveDialogueTest, args=None, default_rpm: float = DEFAULT_REQUESTS_PER_MINUTE):
+    """옵션에 따라 순차/동시 테스트 실행"""
+    if args is not None and args.concurrent:
+        results = await tester.run_concurrent_test(
+            num_turns=args.turns,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm or default_rpm,
+            persona_limit=args.personas
+        )
+    else:
+        results = await tester.run_comprehensive_test()
     
     print("\n" + "=" * 80)
     print("✅ 100턴 대화 테스트 완료!")
     print("=" * 80)
+    
+    if tester.cassette is not None:
+        stats = tester.cassette.stats()
+        print(f"📼 cassette ({stats['mode']}): 재생 {stats['hits']}회, 미스 {stats['misses']}회, "
+              f"녹화 {stats['recorded']}개, 삭제 {stats['evicted']}개, 저장 {stats['entries']}개")
+        tester.cassette.close()
+    return results
+
+def open_cassette(args) -> LLMCassette:
+    """--cassette 옵션이 있으면 녹화/재생 캐시를 엽니다."""
+    if args is None or not args.cassette:
+        return None
+    return LLMCassette(args.cassette, mode=args.cassette_mode, max_entries=args.cassette_max_entries)
+
+async def run_with_mock_server(args):
+    """로컬 모의 LLM 서버를 띄우고 그 서버를 대상으로 테스트 (API 키, Firebase 불필요)"""
+    from mock_llm_server import MockLLMServer, default_replay_patterns, load_replay_store
+    
+    print("📼 모의 서버 녹화 응답 로드 중...")
+    store = load_replay_store(args.mock_replay or default_replay_patterns())
+    server = MockLLMServer(store, latency=args.mock_latency)
+    base_url = await server.start(port=0)
+    print(f"🤖 모의 LLM 서버: {base_url} (응답 {len(store)}개, 지연 {args.mock_latency}ms)")
+    
+    try:
+        personas = load_personas_file(args.personas_file) if args.personas_file else MOCK_PERSONAS
+        tester = ComprehensiveDialogueTest(api_base=base_url, seed=args.seed, cassette=open_cassette(args),
+                                           personas=[dict(persona) for persona in personas])
+        os.makedirs('test_results', exist_ok=True)
+        await run_tests(tester, args, default_rpm=MOCK_REQUESTS_PER_MINUTE)
+    finally:
+        await server.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description='100턴 대화 품질 테스트')
+    parser.add_argument('--concurrent', action='store_true',
+                        help='로드한 모든 페르소나를 동시에 테스트 (고정 대기 대신 속도 제한기 사용)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'동시에 대화할 페르소나 수 (기본: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--rpm', type=float,
+                        help=f'초기 분당 요청 수, 응답 헤더로 자동 조정 (기본: {DEFAULT_REQUESTS_PER_MINUTE}, 모의 서버는 무제한)')
+    parser.add_argument('--turns', type=int, default=100, help='페르소나당 대화 턴 수 (기본: 100)')
+    parser.add_argument('--personas', type=int, help='테스트할 최대 페르소나 수 (기본: 로드한 전체)')
+    parser.add_argument('--api-base', type=str,
+                        help=f'chat-completions 호환 API 주소 (기본: OPENAI_BASE_URL 또는 {DEFAULT_API_BASE})')
+    parser.add_argument('--mock', action='store_true',
+                        help='로컬 모의 LLM 서버와 로컬 페르소나로 테스트 (mock_llm_server.py, Firebase 키 불필요)')
+    parser.add_argument('--personas-file', type=str,
+                        help='Firestore 대신 사용할 페르소나 JSON 파일 (--mock 기본: 내장 페르소나 3개)')
+    parser.add_argument('--mock-replay', nargs='+', help='모의 서버가 재생할 녹화 파일 (glob 가능)')
+    parser.add_argument('--mock-latency', type=str, default='0',
+                        help='모의 서버 지연 분포 ms (예: fixed:50, lognormal:80,0.5)')
+    parser.add_argument('--seed', type=int, help='메시지 변형 난수 시드 (모의 서버와 함께 쓰면 실행 결과 재현 가능)')
+    parser.add_argument('--cassette', nargs='?', const=DEFAULT_CASSETTE_PATH,
+                        help=f'LLM 응답 녹화/재생 캐시 파일 (경로 생략 시 {DEFAULT_CASSETTE_PATH})')
+    parser.add_argument('--cassette-mode', choices=CASSETTE_MODES, default='record',
+                        help='record: 없으면 호출 후 녹화, replay: 녹화된 응답만 사용, passthrough: 캐시 무시 (기본: record)')
+    parser.add_argument('--cassette-max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f'cassette 최대 저장 개수, 넘으면 오래 안 쓴 응답부터 삭제 (기본: {DEFAULT_MAX_ENTRIES})')
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Firestore 에뮬레이터 연결 + 로컬 AI 응답 대역
+성능 테스트를 실제 Firebase 프로젝트 없이 로컬에서 끝까지 돌릴 때 사용합니다.
+
+- emulator_client(): FIRESTORE_EMULATOR_HOST를 설정하고 서비스 계정 키 없이 클라이언트 생성
+  (에뮬레이터 실행: firebase emulators:start --only firestore)
+- EmulatorResponder: 서버의 AI 응답 로직 대신, 사용자 메시지가 추가되면 설정한 지연 분포만큼
+  기다렸다가 같은 messages 컬렉션에 AI 메시지를 씁니다 (응답 내용은 mock_llm_server.ReplayStore 재사용).
+
+사용법:
+    python firestore_emulator.py --latency lognormal:800,0.4
+    python quick_performance_test.py --emulator --listener
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+from firebase_admin import firestore
+
+from mock_llm_server import LatencyModel, ReplayStore
+
+DEFAULT_EMULATOR_HOST = 'localhost:8080'
+# demo- 접두사 프로젝트는 에뮬레이터 전용 (실제 프로젝트에 연결되지 않음)
+DEFAULT_EMULATOR_PROJECT = 'demo-persona-test'
+DEFAULT_RESPONDER_LATENCY = 'lognormal:800,0.4'
+
+
+def emulator_client(host: Optional[str] = None, project_id: Optional[str] = None):
+    """Firestore 에뮬레이터 클라이언트 (인증 불필요)"""
+    os.environ['FIRESTORE_EMULATOR_HOST'] = host or os.environ.get('FIRESTORE_EMULATOR_HOST') or DEFAULT_EMULATOR_HOST
+    return firestore.Client(project=project_id or os.environ.get('GCLOUD_PROJECT') or DEFAULT_EMULATOR_PROJECT)
+
+
+class EmulatorResponder:
+    """사용자 메시지에 지연 후 AI 메시지로 답하는 로컬 대역
+
+    모든 users/*/messages를 collection group 리스너로 구독하고,
+    구독 이후 추가된 사용자 메시지마다 타이머로 답장을 씁니다.
+    """
+
+    def __init__(self, db, latency: str = DEFAULT_RESPONDER_LATENCY,
+                 store: Optional[ReplayStore] = None, seed: Optional[int] = None):
+        self.db = db
+        self.latency = LatencyModel(latency)
+        self.store = store or ReplayStore()
+        self.rng = random.Random(seed)
+        self.replies = 0
+        self._watch = None
+        self._timers = set()
+        self._lock = threading.Lock()
+
+    def start(self, timeout: float = 10.0):
+        """리스너를 붙이고 첫 스냅샷(기존 메시지)을 받을 때까지 기다립니다."""
+        ready = threading.Event()
+
+        def on_snapshot(snapshots, changes, read_time):
+            if not ready.is_set():
+                # 첫 스냅샷은 구독 전부터 있던 메시지이므로 답하지 않음
+                ready.set()
+                return
+            for change in changes:
+                if change.type.name == 'ADDED':
+                    self._schedule_reply(change.document)
+
+        query = self.db.collection_group('messages').where('isFromUser', '==', True)
+        self._watch = query.on_snapshot(on_snapshot)
+        if not ready.wait(timeout):
+            raise TimeoutError("Firestore 에뮬레이터 리스너가 응답하지 않습니다 (에뮬레이터 실행 여부 확인)")
+        return self
+
+    def _schedule_reply(self, snapshot):
+        message = snapshot.to_dict()
+        with self._lock:
+            delay = self.latency.sample_ms(self.rng) / 1000
+        timer = threading.Timer(delay, self._reply, (snapshot.reference.parent, message))
+        timer.daemon = True
+        with self._lock:
+            self._timers.add(timer)
+        timer.start()
+
+    def _reply(self, messages_ref, message):
+        content = message.get('content', '')
+        messages_ref.add({
+            'content': self.store.choose(content, f"{message.get('personaId')}:{content}:{time.time()}"),
+            'timestamp': firestore.SERVER_TIMESTAMP,
+            'isFromUser': False,
+            'personaId': message.get('personaId'),
+            'type': 'text',
+            'isRead': False,
+        })
+        with self._lock:
+            self.replies += 1
+            self._timers.discard(threading.current_thread())
+
+    def stop(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        with self._lock:
+            timers, self._timers = list(self._timers), set()
+        for timer in timers:
+            timer.cancel()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    from mock_llm_server import default_replay_patterns, load_replay_store
+
+    parser = argparse.ArgumentParser(description='Firestore 에뮬레이터용 AI 응답 대역')
+    parser.add_argument('--host', type=str, help=f'에뮬레이터 주소 (기본: FIRESTORE_EMULATOR_HOST 또는 {DEFAULT_EMULATOR_HOST})')
+    parser.add_argument('--project', type=str, help=f'프로젝트 ID (기본: {DEFAULT_EMULATOR_PROJECT})')
+    parser.add_argument('--latency', type=str, default=DEFAULT_RESPONDER_LATENCY,
+                        help=f'응답 지연 분포 ms (기본: {DEFAULT_RESPONDER_LATENCY})')
+    parser.add_argument('--replay', nargs='+', help='응답으로 재생할 녹화 파일 (glob 가능)')
+    parser.add_argument('--seed', type=int, help='지연/응답 선택 난수 시드')
+    args = parser.parse_args()
+
+    db = emulator_client(args.host, args.project)
+    store = load_replay_store(args.replay or default_replay_patterns())
+    with EmulatorResponder(db, args.latency, store, args.seed) as responder:
+        print(f"[OK] 응답 대역 실행 중: {os.environ['FIRESTORE_EMULATOR_HOST']} (지연 {args.latency}ms, Ctrl+C로 종료)", flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        print(f"\n[DONE] 답장 {responder.replies}개")
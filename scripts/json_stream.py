@@ -0,0 +1,111 @@
+"""
+스트리밍 JSON 리더
+detailed_*.json처럼 최상위가 배열인 큰 JSON 파일을 전부 메모리에 올리지 않고
+원소 하나씩 읽습니다. 줄 단위 JSON(.jsonl, NDJSON) 파일도 같은 방식으로 읽습니다.
+
+표준 라이브러리 json.JSONDecoder.raw_decode만 사용하므로 추가 패키지가 필요 없고,
+최대 메모리 사용량은 파일 크기가 아니라 가장 큰 원소 하나의 크기에 비례합니다.
+"""
+
+import json
+import re
+from typing import Any, Iterator
+
+DEFAULT_CHUNK_SIZE = 1 << 16  # 64KB
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_END = re.compile(r'[,\]]')
+
+
+def _iter_array_items(f, path: str, chunk_size: int) -> Iterator[Any]:
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def fill(size: int = chunk_size) -> bool:
+        """버퍼에 다음 청크를 덧붙입니다 (처리한 앞부분은 버림)."""
+        nonlocal buffer, pos, eof
+        chunk = f.read(size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace() -> bool:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if not fill():
+                return False
+
+    # 여는 대괄호
+    if not skip_whitespace():
+        return
+    if buffer[pos] != '[':
+        raise ValueError(f"{path}: 최상위가 JSON 배열이 아닙니다")
+    pos += 1
+
+    expect_item = True
+    while True:
+        if not skip_whitespace():
+            raise ValueError(f"{path}: 배열이 닫히지 않은 채 파일이 끝났습니다")
+
+        char = buffer[pos]
+        if char == ']':
+            return
+        if char == ',':
+            if expect_item:
+                raise ValueError(f"{path}: 잘못된 쉼표 위치 (offset {pos})")
+            pos += 1
+            expect_item = True
+            continue
+        if not expect_item:
+            raise ValueError(f"{path}: 원소 사이에 쉼표가 없습니다")
+
+        # 원소 하나가 버퍼에 다 들어올 때까지 청크를 더 읽음
+        # (큰 원소를 반복 파싱하지 않도록 읽는 크기를 두 배씩 늘림)
+        read_size = chunk_size
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof or not fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            # 숫자는 청크 경계에서 잘려도('12', '1.', '1e') 앞부분만으로 디코딩되므로
+            # 뒤따르는 구분자(쉼표/닫는 괄호)가 보일 때까지 더 읽음
+            if (isinstance(item, (int, float)) and not isinstance(item, bool) and not eof
+                    and not _NUMBER_END.search(buffer, end) and fill(read_size)):
+                continue
+            break
+        pos = end
+        expect_item = False
+        yield item
+
+
+def iter_json_array(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """최상위 JSON 배열의 원소를 하나씩 반환합니다."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from _iter_array_items(f, path, chunk_size)
+
+
+def iter_json_lines(path: str) -> Iterator[Any]:
+    """줄 단위 JSON(NDJSON) 파일의 객체를 하나씩 반환합니다 (빈 줄은 건너뜀)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_json_records(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """확장자에 따라 .jsonl은 줄 단위로, 그 외는 최상위 배열로 읽습니다."""
+    if path.endswith('.jsonl'):
+        return iter_json_lines(path)
+    return iter_json_array(path, chunk_size)
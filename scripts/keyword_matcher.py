@@ -0,0 +1,89 @@
+"""
+다중 키워드 매처
+여러 키워드를 하나의 정규식으로 합쳐 텍스트를 한 번만 훑어 모든 출현을 찾습니다.
+
+analyze_chat_errors.py, quick_dialogue_test.py, comprehensive_100turn_test.py의
+키워드 기반 탐지기가 공통으로 사용합니다.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Union
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    """키워드 한 번의 출현"""
+    keyword: str   # 등록된 원래 키워드
+    value: Any     # 키워드에 연결된 값 (심각도 등)
+    start: int     # 텍스트 내 시작 위치
+    order: int     # 키워드 등록 순서 (우선순위 비교용)
+
+
+class KeywordMatcher:
+    """컴파일된 다중 패턴 매처
+
+    모든 키워드를 길이 내림차순 alternation으로 묶은 lookahead 정규식 하나로
+    텍스트를 한 번 스캔합니다. 각 시작 위치에서는 가장 긴 키워드가 잡히고,
+    그 키워드의 접두사인 다른 키워드들도 같은 위치의 출현으로 함께 보고하므로
+    겹치는 키워드(예: '만나자'와 '실제로 만나')까지 모두 찾습니다.
+    """
+
+    def __init__(self, keywords: Union[Mapping[str, Any], Iterable[str]], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+
+        if not isinstance(keywords, Mapping):
+            keywords = {keyword: None for keyword in keywords}
+
+        # 매칭 키 -> (원래 키워드, 값, 등록 순서)
+        self._entries: Dict[str, tuple] = {}
+        for order, (keyword, value) in enumerate(keywords.items()):
+            key = keyword.lower() if ignore_case else keyword
+            if key and key not in self._entries:
+                self._entries[key] = (keyword, value, order)
+
+        # 같은 위치에서 함께 매칭되는 짧은 키워드 (가장 긴 키워드의 접두사)
+        self._prefixes: Dict[str, List[str]] = {
+            key: [other for other in self._entries if other != key and key.startswith(other)]
+            for key in self._entries
+        }
+
+        if self._entries:
+            alternation = '|'.join(re.escape(key) for key in sorted(self._entries, key=len, reverse=True))
+            self._pattern = re.compile(f'(?=({alternation}))')
+        else:
+            self._pattern = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _prepare(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        """모든 키워드 출현을 위치 순으로 반환합니다 (겹치는 출현 포함)."""
+        if not text or self._pattern is None:
+            return []
+
+        hits = []
+        for match in self._pattern.finditer(self._prepare(text)):
+            start = match.start()
+            longest = match.group(1)
+            for key in [longest] + self._prefixes[longest]:
+                keyword, value, order = self._entries[key]
+                hits.append(KeywordHit(keyword, value, start, order))
+        return hits
+
+    def find_distinct(self, text: str) -> List[KeywordHit]:
+        """키워드별 첫 출현만 등록 순서대로 반환합니다."""
+        first_hits = {}
+        for hit in self.find_all(text):
+            if hit.keyword not in first_hits:
+                first_hits[hit.keyword] = hit
+        return sorted(first_hits.values(), key=lambda hit: hit.order)
+
+    def contains_any(self, text: str) -> bool:
+        """키워드가 하나라도 포함되어 있는지 확인합니다."""
+        if not text or self._pattern is None:
+            return False
+        return self._pattern.search(self._prepare(text)) is not None
@@ -0,0 +1,315 @@
+"""
+HDR 방식 지연 시간 히스토그램
+응답 시간을 목록에 모두 쌓지 않고, 고정 크기 카운터 배열(유효 숫자 2자리 기준 수천 칸)에
+기록합니다. 기록 개수와 관계없이 메모리가 일정하고, 같은 설정의 히스토그램끼리는
+칸별 합산으로 병합할 수 있으므로 여러 실행/작업자의 결과를 합쳐 백분위수를 비교할 수 있습니다.
+
+- 값은 마이크로초 정수로 기록 (입력/출력 API는 기존 코드와 같은 초 단위)
+- 각 값은 유효 숫자 significant_digits자리 정밀도로 보존 (상대 오차 < 10^-digits)
+- to_dict()/from_dict()로 test_results JSON에 저장하고 다시 읽어 병합
+
+quick_performance_test.py, load_generator.py, comprehensive_100turn_test.py가 사용합니다.
+
+사용법 (저장된 결과 병합/비교):
+    python latency_histogram.py test_results/quick_test_*.json test_results/load_test_*.json
+"""
+
+import glob
+import json
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_LOWEST_US = 1                     # 1µs
+DEFAULT_HIGHEST_US = 60 * 60 * 1_000_000  # 1시간
+DEFAULT_SIGNIFICANT_DIGITS = 2
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+
+
+def percentile_key(q: float) -> str:
+    """백분위수 키 이름 (50 -> 'p50', 99.9 -> 'p999')"""
+    return 'p' + f'{q:g}'.replace('.', '')
+
+
+class LatencyHistogram:
+    """고정 메모리 로그-선형 히스토그램 (HdrHistogram과 같은 칸 배치)"""
+
+    def __init__(self, lowest_us: int = DEFAULT_LOWEST_US, highest_us: int = DEFAULT_HIGHEST_US,
+                 significant_digits: int = DEFAULT_SIGNIFICANT_DIGITS):
+        if lowest_us < 1 or highest_us < 2 * lowest_us:
+            raise ValueError("highest_us는 lowest_us의 2배 이상이어야 합니다")
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits는 1~5 사이여야 합니다")
+        self.lowest_us = lowest_us
+        self.highest_us = highest_us
+        self.significant_digits = significant_digits
+
+        # 한 칸 묶음(bucket) 안에서 유효 숫자를 보존하는 데 필요한 하위 칸 수 (2의 거듭제곱)
+        self._unit_magnitude = int(math.floor(math.log2(lowest_us)))
+        sub_bucket_count_magnitude = int(math.ceil(math.log2(2 * 10 ** significant_digits)))
+        self._sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self._sub_bucket_count = 1 << (self._sub_bucket_half_count_magnitude + 1)
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        bucket_count = 1
+        while smallest_untrackable <= highest_us:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._counts = [0] * ((bucket_count + 1) * self._sub_bucket_half_count)
+
+        self.total_count = 0
+        self.overflow_count = 0   # highest_us를 넘어 최댓값 칸에 기록된 수
+        self.min_us = None
+        self.max_us = None
+        self._sum = 0.0           # 정확한 평균/표준편차용 (초)
+        self._sum_sq = 0.0
+        self._lock = threading.Lock()
+
+    # --- 칸 계산 ---
+
+    def _index_for(self, value: int) -> int:
+        pow2ceiling = (value | self._sub_bucket_mask).bit_length()
+        bucket_index = pow2ceiling - self._unit_magnitude - (self._sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = value >> (bucket_index + self._unit_magnitude)
+        return ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) + (sub_bucket_index - self._sub_bucket_half_count)
+
+    def _range_for_index(self, index: int):
+        """칸 index가 나타내는 값 범위 (최솟값, 크기)"""
+        bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        shift = bucket_index + self._unit_magnitude
+        return sub_bucket_index << shift, 1 << shift
+
+    def _same_layout(self, other: 'LatencyHistogram') -> bool:
+        return (self.lowest_us, self.highest_us, self.significant_digits) == \
+               (other.lowest_us, other.highest_us, other.significant_digits)
+
+    # --- 기록 ---
+
+    def record(self, seconds: float, count: int = 1):
+        """응답 시간(초) 기록"""
+        if seconds is None or seconds < 0 or count <= 0:
+            return
+        value = int(round(seconds * 1_000_000))
+        with self._lock:
+            # 최소/최대는 범위를 넘은 값도 실제 값으로 유지
+            self.min_us = value if self.min_us is None else min(self.min_us, value)
+            self.max_us = value if self.max_us is None else max(self.max_us, value)
+            if value > self.highest_us:
+                self.overflow_count += count
+                value = self.highest_us
+            self._counts[self._index_for(value)] += count
+            self.total_count += count
+            self._sum += seconds * count
+            self._sum_sq += seconds * seconds * count
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """다른 히스토그램을 더합니다 (같은 설정이어야 함)."""
+        if not self._same_layout(other):
+            raise ValueError("설정(lowest/highest/significant_digits)이 다른 히스토그램은 병합할 수 없습니다")
+        snapshot = other.snapshot()
+        with self._lock:
+            for index, count in enumerate(snapshot._counts):
+                if count:
+                    self._counts[index] += count
+            self.total_count += snapshot.total_count
+            self.overflow_count += snapshot.overflow_count
+            if snapshot.min_us is not None:
+                self.min_us = snapshot.min_us if self.min_us is None else min(self.min_us, snapshot.min_us)
+                self.max_us = snapshot.max_us if self.max_us is None else max(self.max_us, snapshot.max_us)
+            self._sum += snapshot._sum
+            self._sum_sq += snapshot._sum_sq
+        return self
+
+    def __iadd__(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        return self.merge(other)
+
+    @classmethod
+    def merged(cls, histograms: Iterable['LatencyHistogram']) -> 'LatencyHistogram':
+        result = None
+        for histogram in histograms:
+            if result is None:
+                result = cls(histogram.lowest_us, histogram.highest_us, histogram.significant_digits)
+            result.merge(histogram)
+        return result if result is not None else cls()
+
+    def snapshot(self) -> 'LatencyHistogram':
+        """기록 중에도 안전하게 읽을 수 있는 복사본"""
+        copy = LatencyHistogram(self.lowest_us, self.highest_us, self.significant_digits)
+        with self._lock:
+            copy._counts = list(self._counts)
+            copy.total_count = self.total_count
+            copy.overflow_count = self.overflow_count
+            copy.min_us = self.min_us
+            copy.max_us = self.max_us
+            copy._sum = self._sum
+            copy._sum_sq = self._sum_sq
+        return copy
+
+    # --- 통계 ---
+
+    def __len__(self) -> int:
+        return self.total_count
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.total_count if self.total_count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """표본 표준편차 (statistics.stdev와 같은 정의)"""
+        n = self.total_count
+        if n < 2:
+            return 0.0
+        variance = (self._sum_sq - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(max(0.0, variance))
+
+    @property
+    def min(self) -> float:
+        return self.min_us / 1_000_000 if self.min_us is not None else 0.0
+
+    @property
+    def max(self) -> float:
+        return self.max_us / 1_000_000 if self.max_us is not None else 0.0
+
+    def percentile(self, q: float) -> float:
+        """q 백분위수 (초). 해당 칸의 상한을 실제 최소/최대 기록값 범위로 자른 값
+        (최댓값 칸에 모인 범위 초과 값은 실제 최댓값으로 보고)"""
+        if not self.total_count:
+            return 0.0
+        target = max(1, math.ceil(q / 100 * self.total_count))
+        running = 0
+        for index, count in enumerate(self._counts):
+            if not count:
+                continue
+            running += count
+            if running >= target:
+                if self.overflow_count and index == self._index_for(self.highest_us):
+                    return self.max
+                low, size = self._range_for_index(index)
+                value = min(max(low + size - 1, self.min_us), self.max_us)
+                return value / 1_000_000
+        return self.max
+
+    def summary(self, percentiles: Sequence[float] = REPORT_PERCENTILES) -> Dict:
+        """평균/최소/최대/표준편차와 백분위수 (초)"""
+        result = {
+            'count': self.total_count,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'stdev': self.stdev,
+        }
+        for q in percentiles:
+            result[percentile_key(q)] = self.percentile(q)
+        return result
+
+    # --- 직렬화 ---
+
+    def to_dict(self) -> Dict:
+        """JSON 저장용 (0이 아닌 칸만 [index, count]로 기록)"""
+        snapshot = self.snapshot()
+        return {
+            'unit': 'us',
+            'lowest': snapshot.lowest_us,
+            'highest': snapshot.highest_us,
+            'significant_digits': snapshot.significant_digits,
+            'total_count': snapshot.total_count,
+            'overflow_count': snapshot.overflow_count,
+            'min': snapshot.min_us,
+            'max': snapshot.max_us,
+            'sum_seconds': snapshot._sum,
+            'sum_sq_seconds': snapshot._sum_sq,
+            'counts': [[index, count] for index, count in enumerate(snapshot._counts) if count],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        histogram = cls(data['lowest'], data['highest'], data['significant_digits'])
+        for index, count in data['counts']:
+            histogram._counts[index] += count
+        histogram.total_count = data['total_count']
+        histogram.overflow_count = data.get('overflow_count', 0)
+        histogram.min_us = data['min']
+        histogram.max_us = data['max']
+        histogram._sum = data['sum_seconds']
+        histogram._sum_sq = data['sum_sq_seconds']
+        return histogram
+
+
+def performance_section(histogram: LatencyHistogram, percentiles: Sequence[float] = REPORT_PERCENTILES) -> Dict:
+    """test_results JSON의 performance 항목 (기존 키 + 백분위수 + 직렬화한 히스토그램)"""
+    snapshot = histogram.snapshot()
+    section = {
+        'avg_response': snapshot.mean,
+        'median_response': snapshot.percentile(50),
+        'min_response': snapshot.min,
+        'max_response': snapshot.max,
+        'std_dev': snapshot.stdev,
+    }
+    for q in percentiles:
+        section[f'{percentile_key(q)}_response'] = snapshot.percentile(q)
+    section['latency_histogram'] = snapshot.to_dict()
+    return section
+
+
+def find_histograms(data) -> List[Dict]:
+    """결과 JSON에서 직렬화된 히스토그램(latency_histogram 키)을 모두 찾습니다."""
+    found = []
+    if isinstance(data, dict):
+        histogram = data.get('latency_histogram')
+        if isinstance(histogram, dict) and 'counts' in histogram:
+            found.append(histogram)
+        for key, value in data.items():
+            if key != 'latency_histogram':
+                found.extend(find_histograms(value))
+    elif isinstance(data, list):
+        for item in data:
+            found.extend(find_histograms(item))
+    return found
+
+
+def load_histogram(path: str) -> Optional[LatencyHistogram]:
+    """결과 파일 하나의 히스토그램 (여러 개면 병합, 없으면 None)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    # 전체 집계가 있으면 그것만 사용 (페르소나별 히스토그램과 중복 집계 방지)
+    if isinstance(data, dict) and isinstance(data.get('performance'), dict) \
+            and 'latency_histogram' in data['performance']:
+        return LatencyHistogram.from_dict(data['performance']['latency_histogram'])
+    histograms = find_histograms(data)
+    if not histograms:
+        return None
+    return LatencyHistogram.merged(LatencyHistogram.from_dict(h) for h in histograms)
+
+
+def format_summary(summary: Dict) -> str:
+    parts = [f"n={summary['count']}", f"평균 {summary['mean']:.3f}초"]
+    parts += [f"{key} {value:.3f}초" for key, value in summary.items() if key.startswith('p')]
+    parts.append(f"최대 {summary['max']:.3f}초")
+    return ', '.join(parts)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='저장된 테스트 결과의 지연 시간 히스토그램 병합/비교')
+    parser.add_argument('files', nargs='+', help='test_results JSON 파일 (glob 가능)')
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in args.files for path in glob.glob(pattern)})
+    histograms = []
+    for path in paths:
+        histogram = load_histogram(path)
+        if histogram is None:
+            print(f"  - {path}: 히스토그램 없음 (이전 형식)")
+            continue
+        histograms.append(histogram)
+        print(f"  - {path}: {format_summary(histogram.summary())}")
+
+    if len(histograms) > 1:
+        print(f"\n[MERGED] {len(histograms)}개 실행: {format_summary(LatencyHistogram.merged(histograms).summary())}")
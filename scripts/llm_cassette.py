@@ -0,0 +1,173 @@
+"""
+LLM 호출 녹화/재생 캐시 (cassette)
+같은 (모델, 메시지, temperature) 요청에 대한 응답을 SQLite 파일 하나에 저장해 두고,
+시나리오가 바뀌지 않은 턴은 네트워크 없이 바로 재생합니다.
+
+모드:
+- record: 저장된 응답이 있으면 재생, 없으면 실제로 호출하고 녹화
+- replay: 저장된 응답만 사용 (없으면 CassetteMiss, 완전 오프라인 재현용)
+- passthrough: 캐시를 쓰지 않고 항상 실제 호출
+
+저장 항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
+comprehensive_100turn_test.py가 사용합니다.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+CASSETTE_MODES = ('record', 'replay', 'passthrough')
+DEFAULT_CASSETTE_PATH = os.path.join('test_results', 'llm_cassette.sqlite3')
+DEFAULT_MAX_ENTRIES = 50000
+
+
+class CassetteMiss(KeyError):
+    """replay 모드에서 녹화되지 않은 요청"""
+
+
+def request_key(model: str, messages: List[Dict], temperature: Optional[float]) -> str:
+    """요청 내용 해시 (메시지의 role/content만 사용)"""
+    content = json.dumps(
+        [model, [[m.get('role'), m.get('content')] for m in messages], temperature],
+        ensure_ascii=False, separators=(',', ':')
+    )
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class LLMCassette:
+    """content-addressed LLM 응답 캐시 (SQLite)"""
+
+    def __init__(self, path: str = DEFAULT_CASSETTE_PATH, mode: str = 'record',
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"알 수 없는 cassette 모드: {mode} ({', '.join(CASSETTE_MODES)})")
+        self.path = path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.evicted = 0
+        # 동시에 들어온 같은 요청은 한 번만 호출
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                request_hash TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                use_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_lru ON llm_responses (last_used_at)")
+        self._conn.commit()
+        # 저장 개수는 열 때 한 번만 세고 이후 put/삭제로 갱신 (put마다 COUNT(*) 전체 스캔 방지)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, key: str) -> Optional[str]:
+        """저장된 응답 (사용 시각 갱신)"""
+        row = self._conn.execute(
+            "SELECT response FROM llm_responses WHERE request_hash = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute(
+            "UPDATE llm_responses SET last_used_at = ?, use_count = use_count + 1 WHERE request_hash = ?",
+            (time.time(), key)
+        )
+        self._conn.commit()
+        return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO llm_responses (request_hash, model, response, created_at, last_used_at, use_count) "
+            "VALUES (?, ?, ?, ?, ?, 0)",
+            (key, model, response, now, now)
+        )
+        if cursor.rowcount:
+            self._count += 1
+        else:
+            # 이미 있는 요청은 덮어쓰기 (개수 변화 없음)
+            self._conn.execute(
+                "UPDATE llm_responses SET model = ?, response = ?, created_at = ?, last_used_at = ?, use_count = 0 "
+                "WHERE request_hash = ?",
+                (model, response, now, now, key)
+            )
+        self.recorded += 1
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        """max_entries를 넘는 만큼 가장 오래 사용되지 않은 항목 삭제"""
+        if not self.max_entries:
+            return
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_responses WHERE request_hash IN "
+                "(SELECT request_hash FROM llm_responses ORDER BY last_used_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evicted += cursor.rowcount
+            self._count -= cursor.rowcount
+
+    async def fetch(self, model: str, messages: List[Dict], temperature: Optional[float],
+                    call: Callable[[], Awaitable[str]]) -> str:
+        """모드에 따라 캐시에서 재생하거나 call()로 실제 호출합니다."""
+        if self.mode == 'passthrough':
+            return await call()
+
+        key = request_key(model, messages, temperature)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        if self.mode == 'replay':
+            raise CassetteMiss(f"녹화되지 않은 요청입니다 (replay 모드): {key[:12]}")
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await call()
+        except BaseException as e:
+            future.set_exception(e)
+            # 기다리는 작업이 없을 때 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self.put(key, model, response)
+        future.set_result(response)
+        return response
+
+    def stats(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'recorded': self.recorded,
+            'evicted': self.evicted,
+        }
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+다중 사용자 부하 생성기
+QuickTester(quick_performance_test.py)를 가상 사용자마다 하나씩 만들어 여러 페르소나에
+동시에 대화를 보내고, 지연 시간 분포/처리량/오류율을 test_results JSON으로 저장합니다.
+
+도착 모델:
+- closed (기본): 가상 사용자 --users명이 (램프업 후) 계속 대화. 턴 사이에 지수분포 생각 시간
+- open: 세션이 초당 --arrival-rate의 포아송 과정으로 도착해 --turns턴 대화 후 종료
+        (동시 세션이 --max-active를 넘으면 도착을 거절하고 기록)
+
+응답 대기는 기본적으로 Firestore 리스너 모드를 사용합니다 (폴링 간격이 측정에 섞이지 않도록).
+--emulator --responder를 주면 로컬 Firestore 에뮬레이터와 AI 응답 대역으로 실행됩니다.
+
+사용법:
+    python load_generator.py --emulator --responder --users 200 --turns 20
+    python load_generator.py --mode open --arrival-rate 5 --sessions 300 --max-active 200
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from quick_performance_test import (
+    DEFAULT_PERSONA_ID, MESSAGE_PATTERNS, QuickTester, initialize_firebase
+)
+from firestore_emulator import DEFAULT_EMULATOR_HOST, DEFAULT_RESPONDER_LATENCY, EmulatorResponder, emulator_client
+from latency_histogram import LatencyHistogram, percentile_key, performance_section
+
+ARRIVAL_MODES = ('closed', 'open')
+DEFAULT_USERS = 100
+DEFAULT_TURNS = 10
+DEFAULT_THINK_TIME = 2.0      # 턴 사이 평균 생각 시간 (초, 지수분포)
+DEFAULT_RAMP_UP = 10.0        # closed 모드에서 모든 사용자가 시작될 때까지 걸리는 시간 (초)
+DEFAULT_RESPONSE_TIMEOUT = 30
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class LoadGenerator:
+    """가상 사용자 스레드들로 QuickTester를 동시에 실행"""
+
+    def __init__(self, db, persona_ids: List[str], mode: str = 'closed', users: int = DEFAULT_USERS,
+                 turns: int = DEFAULT_TURNS, think_time: float = DEFAULT_THINK_TIME,
+                 ramp_up: float = DEFAULT_RAMP_UP, arrival_rate: float = 1.0,
+                 sessions: Optional[int] = None, timeout: int = DEFAULT_RESPONSE_TIMEOUT,
+                 use_listener: bool = True, user_prefix: Optional[str] = None, seed: Optional[int] = None):
+        if mode not in ARRIVAL_MODES:
+            raise ValueError(f"알 수 없는 도착 모델: {mode} ({', '.join(ARRIVAL_MODES)})")
+        if not persona_ids:
+            raise ValueError("테스트할 페르소나가 없습니다")
+        self.db = db
+        self.persona_ids = persona_ids
+        self.mode = mode
+        self.users = users                      # closed: 사용자 수, open: 최대 동시 세션 수
+        self.turns = turns
+        self.think_time = think_time
+        self.ramp_up = ramp_up
+        self.arrival_rate = arrival_rate
+        self.sessions = sessions if sessions is not None else users
+        self.timeout = timeout
+        self.use_listener = use_listener
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.user_prefix = user_prefix or f"loadtest_{self.run_id}"
+        self.seed = seed
+
+        self.testers: List[QuickTester] = []
+        # 모든 가상 사용자가 하나의 히스토그램에 기록 (사용자/응답 수와 무관한 고정 메모리)
+        self.latency = LatencyHistogram()
+        self.completed_turns = 0
+        self.throughput_timeline: Dict[int, int] = {}  # 시작 후 경과 초 -> 응답 완료 수
+        self.rejected_arrivals = 0
+        self.peak_active = 0
+        self.start_time = None
+        self.end_time = None
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def _rng(self, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{index}") if self.seed is not None else random.Random()
+
+    def _run_user(self, index: int):
+        """가상 사용자 하나의 세션"""
+        rng = self._rng(index)
+        persona_id = self.persona_ids[index % len(self.persona_ids)]
+        tester = QuickTester(f"{self.user_prefix}_{index:05d}", persona_id,
+                             db=self.db, use_listener=self.use_listener, latency=self.latency)
+        with self._lock:
+            self.testers.append(tester)
+
+        try:
+            if self.use_listener:
+                tester.start_listener()
+            for turn in range(1, self.turns + 1):
+                ok = tester.run_turn(rng.choice(MESSAGE_PATTERNS), turn, self.timeout)
+                with self._lock:
+                    self.completed_turns += 1
+                    if ok:
+                        second = int(time.time() - self.start_time)
+                        self.throughput_timeline[second] = self.throughput_timeline.get(second, 0) + 1
+                if turn < self.turns and self.think_time > 0:
+                    time.sleep(rng.expovariate(1 / self.think_time))
+        except Exception as e:
+            tester.errors.append(f"세션 실패: {str(e)}")
+        finally:
+            tester.stop_listener()
+            with self._lock:
+                self._active -= 1
+
+    def _spawn(self, index: int) -> Optional[threading.Thread]:
+        with self._lock:
+            if self._active >= self.users:
+                self.rejected_arrivals += 1
+                return None
+            self._active += 1
+            self.peak_active = max(self.peak_active, self._active)
+        thread = threading.Thread(target=self._run_user, args=(index,), daemon=True)
+        thread.start()
+        return thread
+
+    def run(self) -> Dict:
+        """부하를 생성하고 집계 결과를 반환합니다."""
+        print(f"\n[START] 부하 테스트 ({self.mode}-loop)")
+        if self.mode == 'closed':
+            print(f"  가상 사용자 {self.users}명 x {self.turns}턴, 램프업 {self.ramp_up:.0f}초, "
+                  f"생각 시간 평균 {self.think_time:.1f}초")
+        else:
+            print(f"  세션 {self.sessions}개, 도착률 {self.arrival_rate:.2f}/초, 최대 동시 {self.users}개, "
+                  f"세션당 {self.turns}턴")
+        print(f"  페르소나 {len(self.persona_ids)}개, 응답 대기: {'listener' if self.use_listener else 'polling'}")
+        print("-" * 50)
+
+        self.start_time = time.time()
+        arrivals = random.Random(f"{self.seed}:arrivals") if self.seed is not None else random.Random()
+        threads = []
+        count = self.users if self.mode == 'closed' else self.sessions
+        for index in range(count):
+            if index > 0:
+                if self.mode == 'closed':
+                    time.sleep(self.ramp_up / count)
+                else:
+                    time.sleep(arrivals.expovariate(self.arrival_rate))
+            thread = self._spawn(index)
+            if thread is not None:
+                threads.append(thread)
+            if (index + 1) % max(1, count // 10) == 0:
+                print(f"  [PROGRESS] 시작 {index + 1}/{count}, 동시 {self._active}, 완료 턴 {self.completed_turns}")
+
+        for thread in threads:
+            thread.join()
+        self.end_time = time.time()
+
+        return self.summarize()
+
+    def summarize(self) -> Dict:
+        """테스터별 결과를 합쳐 지연 분포/처리량/오류율 계산"""
+        duration = (self.end_time or time.time()) - self.start_time
+        messages_sent = sum(tester.messages_sent for tester in self.testers)
+        messages_received = sum(tester.messages_received for tester in self.testers)
+        errors = [f"{tester.user_id}: {error}" for tester in self.testers for error in tester.errors]
+
+        return {
+            'test_info': {
+                'user_id': self.user_prefix,
+                'persona_id': ','.join(self.persona_ids),
+                'timestamp': self.run_id,
+                'duration': duration,
+                'messages_sent': messages_sent,
+                'messages_received': messages_received,
+                'wait_mode': 'listener' if self.use_listener else 'polling'
+            },
+            'performance': performance_section(self.latency, PERCENTILES),
+            'load': {
+                'mode': self.mode,
+                'virtual_users': len(self.testers),
+                'max_active': self.users,
+                'peak_active': self.peak_active,
+                'rejected_arrivals': self.rejected_arrivals,
+                'turns_per_user': self.turns,
+                'think_time': self.think_time,
+                'arrival_rate': self.arrival_rate if self.mode == 'open' else None,
+                'throughput_per_second': messages_received / duration if duration > 0 else 0,
+                'error_rate': (messages_sent - messages_received) / messages_sent if messages_sent else 0,
+                'throughput_timeline': [self.throughput_timeline.get(s, 0) for s in range(int(duration) + 1)]
+            },
+            'errors': errors
+        }
+
+
+def print_load_results(results: Dict):
+    info, perf, load = results['test_info'], results['performance'], results['load']
+    print("\n" + "=" * 50)
+    print("[LOAD TEST RESULTS]")
+    print("=" * 50)
+    print(f"\n[SUMMARY]")
+    print(f"  총 시간: {info['duration']:.1f}초, 가상 사용자 {load['virtual_users']}명 (최대 동시 {load['peak_active']})")
+    print(f"  전송: {info['messages_sent']}, 응답: {info['messages_received']}")
+    print(f"  처리량: {load['throughput_per_second']:.2f} 응답/초")
+    print(f"  오류율: {load['error_rate'] * 100:.1f}% (오류 {len(results['errors'])}건)")
+    if load['rejected_arrivals']:
+        print(f"  [!] 동시 세션 한도로 거절된 도착: {load['rejected_arrivals']}개")
+    if perf['latency_histogram']['total_count']:
+        print(f"\n[RESPONSE TIME]")
+        print(f"  평균: {perf['avg_response']:.2f}초, 최소: {perf['min_response']:.2f}초, 최대: {perf['max_response']:.2f}초")
+        print("  " + ", ".join(f"{percentile_key(q)}: {perf[f'{percentile_key(q)}_response']:.2f}초" for q in PERCENTILES))
+
+
+def save_load_results(results: Dict) -> str:
+    os.makedirs('test_results', exist_ok=True)
+    filename = f"test_results/load_test_{results['test_info']['timestamp']}.json"
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n[SAVED] {filename}")
+    return filename
+
+
+def load_persona_ids(db, limit: int) -> List[str]:
+    """personas 컬렉션에서 테스트할 페르소나 ID 로드 (없으면 기본 페르소나)"""
+    try:
+        persona_ids = [doc.id for doc in db.collection('personas').limit(limit).get()]
+    except Exception as e:
+        print(f"[WARN] 페르소나 로드 실패: {e}")
+        persona_ids = []
+    return persona_ids or [DEFAULT_PERSONA_ID]
+
+
+def main(args):
+    responder = None
+    if args.emulator:
+        db = emulator_client(args.emulator_host)
+        print(f"[OK] Firestore 에뮬레이터 연결: {os.environ['FIRESTORE_EMULATOR_HOST']}")
+        if args.responder:
+            responder = EmulatorResponder(db, latency=args.responder_latency, seed=args.seed).start()
+            print(f"[OK] AI 응답 대역 실행 (지연 {args.responder_latency}ms)")
+    else:
+        initialize_firebase()
+        from firebase_admin import firestore
+        db = firestore.client()
+
+    persona_ids = args.persona_ids.split(',') if args.persona_ids else load_persona_ids(db, args.personas)
+
+    generator = LoadGenerator(
+        db, persona_ids,
+        mode=args.mode,
+        users=args.users if args.mode == 'closed' else args.max_active,
+        turns=args.turns,
+        think_time=args.think_time,
+        ramp_up=args.ramp_up,
+        arrival_rate=args.arrival_rate,
+        sessions=args.sessions,
+        timeout=args.timeout,
+        use_listener=not args.polling,
+        user_prefix=args.user_prefix,
+        seed=args.seed
+    )
+    try:
+        results = generator.run()
+    finally:
+        if responder is not None:
+            responder.stop()
+
+    print_load_results(results)
+    save_load_results(results)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='다중 사용자 부하 테스트 (QuickTester 기반)')
+    parser.add_argument('--mode', choices=ARRIVAL_MODES, default='closed',
+                        help='closed: 고정 사용자 수 + 생각 시간, open: 포아송 세션 도착 (기본: closed)')
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS, help=f'closed 모드 가상 사용자 수 (기본: {DEFAULT_USERS})')
+    parser.add_argument('--turns', type=int, default=DEFAULT_TURNS, help=f'사용자(세션)당 턴 수 (기본: {DEFAULT_TURNS})')
+    parser.add_argument('--think-time', type=float, default=DEFAULT_THINK_TIME,
+                        help=f'턴 사이 평균 생각 시간(초, 지수분포) (기본: {DEFAULT_THINK_TIME})')
+    parser.add_argument('--ramp-up', type=float, default=DEFAULT_RAMP_UP,
+                        help=f'closed 모드 램프업 시간(초) (기본: {DEFAULT_RAMP_UP})')
+    parser.add_argument('--arrival-rate', type=float, default=1.0, help='open 모드 초당 세션 도착률 (기본: 1.0)')
+    parser.add_argument('--sessions', type=int, default=DEFAULT_USERS, help=f'open 모드 총 세션 수 (기본: {DEFAULT_USERS})')
+    parser.add_argument('--max-active', type=int, default=DEFAULT_USERS * 2,
+                        help=f'open 모드 최대 동시 세션 수 (기본: {DEFAULT_USERS * 2})')
+    parser.add_argument('--timeout', type=int, default=DEFAULT_RESPONSE_TIMEOUT,
+                        help=f'응답 대기 시간 초과(초) (기본: {DEFAULT_RESPONSE_TIMEOUT})')
+    parser.add_argument('--personas', type=int, default=10, help='personas 컬렉션에서 로드할 페르소나 수 (기본: 10)')
+    parser.add_argument('--persona-ids', type=str, help='쉼표로 구분한 페르소나 ID (지정 시 로드 생략)')
+    parser.add_argument('--user-prefix', type=str, help='가상 사용자 ID 접두사 (기본: loadtest_<실행 시각>)')
+    parser.add_argument('--polling', action='store_true', help='리스너 대신 폴링으로 응답 대기')
+    parser.add_argument('--seed', type=int, help='메시지/생각 시간/도착 난수 시드')
+    parser.add_argument('--emulator', action='store_true', help='로컬 Firestore 에뮬레이터에 연결')
+    parser.add_argument('--emulator-host', type=str, help=f'에뮬레이터 주소 (기본: FIRESTORE_EMULATOR_HOST 또는 {DEFAULT_EMULATOR_HOST})')
+    parser.add_argument('--responder', action='store_true', help='에뮬레이터 모드에서 AI 응답 대역을 함께 실행')
+    parser.add_argument('--responder-latency', type=str, default=DEFAULT_RESPONDER_LATENCY,
+                        help=f'응답 대역 지연 분포 ms (기본: {DEFAULT_RESPONDER_LATENCY})')
+    main(parser.parse_args())
@@ -0,0 +1,316 @@
+"""
+로컬 모의 LLM 서버
+OpenAI chat-completions 형식(POST /v1/chat/completions)을 흉내 내는 aiohttp 서버입니다.
+실제 API 없이 대화 테스트 하네스 자체를 벤치마크하거나 CI/오프라인에서 회귀를 재현할 때 사용합니다.
+
+- 응답: 녹화된 (사용자 메시지 → AI 응답) 쌍을 재생. 같은 요청에는 항상 같은 응답 (결정적)
+- 지연: fixed / uniform / normal / lognormal 분포 (요청 내용으로 시드를 정해 재현 가능)
+- 선택적으로 분당 요청 수 제한과 x-ratelimit-* 헤더, 429 응답까지 흉내
+
+녹화 파일 형식:
+- comprehensive_100turn_test.py의 detailed_test_*.json (conversation: [{user, ai}])
+- analyze_chat_errors.py의 detailed_*.json (issues: [{user_message, ai_response}])
+- 줄 단위 JSON: {"user": ..., "ai": ...}
+
+사용법:
+    python mock_llm_server.py --replay test_results/detailed_test_*.json --latency lognormal:80,0.5
+    python comprehensive_100turn_test.py --concurrent --api-base http://127.0.0.1:8787/v1
+"""
+
+import asyncio
+import glob
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import io
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+DEFAULT_MODEL = 'mock-gpt'
+
+# 녹화에 없는 메시지에 쓰는 기본 응답
+FALLBACK_RESPONSES = [
+    "아 그렇구나! 더 얘기해줘",
+    "오 진짜? 나도 궁금하다",
+    "음 그럴 수 있지~ 너는 어떻게 생각해?",
+    "헐 대박ㅋㅋ 그래서 어떻게 됐어?",
+    "그랬구나ㅎㅎ 오늘 하루는 어땠어?",
+]
+
+_NORMALIZE_PATTERN = re.compile(r'[\s~!?.,ㅋㅎㅠㅜ]+')
+
+
+def normalize_message(text: str) -> str:
+    """재생 키로 쓸 사용자 메시지 정규화 (공백/문장부호/ㅋㅎ 제거)"""
+    return _NORMALIZE_PATTERN.sub('', (text or '').lower())
+
+
+def _stable_hash(*parts: str) -> int:
+    digest = hashlib.sha256('\x1f'.join(parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class LatencyModel:
+    """응답 지연 분포 (단위: ms)
+
+    spec 예시: "0", "fixed:50", "uniform:20,80", "normal:50,10", "lognormal:80,0.5"
+    lognormal은 (중앙값 ms, sigma)입니다.
+    """
+
+    def __init__(self, spec: str = '0'):
+        self.spec = spec
+        kind, _, args = spec.partition(':') if ':' in spec else ('fixed', '', spec)
+        self.kind = kind
+        self.args = [float(a) for a in args.split(',')] if args else [0.0]
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if kind not in expected or len(self.args) != expected[kind]:
+            raise ValueError(f"잘못된 지연 분포: {spec} (예: fixed:50, uniform:20,80, normal:50,10, lognormal:80,0.5)")
+
+    def sample_ms(self, rng: random.Random) -> float:
+        if self.kind == 'fixed':
+            value = self.args[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(*self.args)
+        elif self.kind == 'normal':
+            value = rng.gauss(*self.args)
+        else:
+            median, sigma = self.args
+            value = rng.lognormvariate(math.log(max(median, 1e-6)), sigma)
+        return max(0.0, value)
+
+
+class ReplayStore:
+    """녹화된 응답 저장소 (정규화한 사용자 메시지 → 응답 목록)"""
+
+    def __init__(self):
+        self.responses: Dict[str, List[str]] = defaultdict(list)
+        self.pool: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    def add(self, user_message: str, response: str):
+        if not user_message or not response:
+            return
+        self.responses[normalize_message(user_message)].append(response)
+        self.pool.append(response)
+
+    def add_pairs(self, pairs: Iterable[Tuple[str, str]]):
+        for user_message, response in pairs:
+            self.add(user_message, response)
+
+    def load(self, path: str) -> int:
+        """녹화 파일 하나를 읽어 추가한 응답 수를 반환합니다."""
+        before = len(self.pool)
+        if path.endswith('.jsonl'):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.add(record.get('user', ''), record.get('ai', ''))
+            return len(self.pool) - before
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for record in data if isinstance(data, list) else [data]:
+            if not isinstance(record, dict):
+                continue
+            # comprehensive_100turn_test 결과
+            for turn in record.get('conversation', []):
+                self.add(turn.get('user', ''), turn.get('ai', ''))
+            # analyze_chat_errors 상세 결과
+            for issue in record.get('issues', []):
+                if isinstance(issue, dict):
+                    self.add(issue.get('user_message', ''), issue.get('ai_response', ''))
+            if 'user' in record and 'ai' in record:
+                self.add(record['user'], record['ai'])
+        return len(self.pool) - before
+
+    def choose(self, user_message: str, request_key: str) -> str:
+        """같은 요청에는 항상 같은 응답을 고릅니다."""
+        candidates = self.responses.get(normalize_message(user_message)) or self.pool or FALLBACK_RESPONSES
+        return candidates[_stable_hash(request_key) % len(candidates)]
+
+
+class MockLLMServer:
+    """chat-completions 모의 서버"""
+
+    def __init__(self, store: Optional[ReplayStore] = None, latency: str = '0',
+                 requests_per_minute: Optional[float] = None, seed: int = 0):
+        if web is None:
+            raise RuntimeError("aiohttp가 필요합니다: pip install aiohttp")
+        self.store = store or ReplayStore()
+        self.latency = LatencyModel(latency)
+        self.requests_per_minute = requests_per_minute
+        self.seed = seed
+
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._runner = None
+        self.base_url = None
+
+        # 통계
+        self.requests = 0
+        self.rate_limited = 0
+
+    def _rate_limit_headers(self) -> Tuple[bool, Dict[str, str]]:
+        """분당 요청 수 제한 (고정 60초 창). (허용 여부, 헤더) 반환"""
+        if not self.requests_per_minute:
+            return True, {}
+        now = time.monotonic()
+        if now - self._window_start >= 60:
+            self._window_start, self._window_count = now, 0
+        limit = int(self.requests_per_minute)
+        reset = 60 - (now - self._window_start)
+        allowed = self._window_count < limit
+        if allowed:
+            self._window_count += 1
+        headers = {
+            'x-ratelimit-limit-requests': str(limit),
+            'x-ratelimit-remaining-requests': str(max(0, limit - self._window_count)),
+            'x-ratelimit-reset-requests': f'{reset:.3f}s',
+        }
+        if not allowed:
+            headers['retry-after'] = f'{reset:.3f}'
+        return allowed, headers
+
+    async def handle_chat_completions(self, request):
+        body = await request.json()
+        messages = body.get('messages', [])
+        model = body.get('model', DEFAULT_MODEL)
+        self.requests += 1
+
+        allowed, headers = self._rate_limit_headers()
+        if not allowed:
+            self.rate_limited += 1
+            return web.json_response(
+                {'error': {'message': 'Rate limit reached (mock)', 'type': 'requests', 'code': 'rate_limit_exceeded'}},
+                status=429, headers=headers
+            )
+
+        user_message = next((m.get('content', '') for m in reversed(messages) if m.get('role') == 'user'), '')
+        request_key = json.dumps([model, messages, body.get('temperature')], ensure_ascii=False, sort_keys=True)
+
+        delay_ms = self.latency.sample_ms(random.Random(_stable_hash(str(self.seed), request_key)))
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+
+        content = self.store.choose(user_message, request_key)
+        prompt_tokens = sum(len(m.get('content', '')) for m in messages) // 2
+        completion_tokens = len(content) // 2
+        return web.json_response({
+            'id': f'chatcmpl-mock-{_stable_hash(request_key) % 10**12:012d}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }, headers=headers)
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_post('/v1/chat/completions', self.handle_chat_completions)
+        return app
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> str:
+        """서버를 시작하고 base URL(…/v1)을 반환합니다. port=0이면 빈 포트를 사용합니다."""
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f'http://{host}:{bound_port}/v1'
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start(port=0)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+def load_replay_store(patterns: Iterable[str]) -> ReplayStore:
+    """glob 패턴들에 해당하는 녹화 파일을 모두 읽습니다."""
+    store = ReplayStore()
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            count = store.load(path)
+            print(f"  - {path}: 응답 {count}개")
+    return store
+
+
+def default_replay_patterns() -> List[str]:
+    """기본 녹화 소스: 100턴 테스트 상세 결과와 분석 상세 결과"""
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    return [
+        os.path.join('test_results', 'detailed_test_*.json'),
+        os.path.join(scripts_dir, 'analysis_results', 'detailed_*.json'),
+    ]
+
+
+async def _serve_forever(server: MockLLMServer, host: str, port: int):
+    base_url = await server.start(host, port)
+    print(f"🤖 모의 LLM 서버 실행 중: {base_url}/chat/completions (Ctrl+C로 종료)")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # UTF-8 인코딩 설정
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    parser = argparse.ArgumentParser(description='로컬 모의 LLM(chat-completions) 서버')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--replay', nargs='+', help='재생할 녹화 파일 (glob 가능, 기본: 테스트/분석 상세 결과)')
+    parser.add_argument('--latency', type=str, default='0',
+                        help='지연 분포 ms (fixed:50, uniform:20,80, normal:50,10, lognormal:80,0.5)')
+    parser.add_argument('--rpm', type=float, help='분당 요청 수 제한 흉내 (429와 rate limit 헤더 반환)')
+    parser.add_argument('--seed', type=int, default=0, help='지연 샘플링 시드')
+    args = parser.parse_args()
+
+    if web is None:
+        print("Error: aiohttp 패키지가 설치되지 않았습니다.")
+        print("설치: pip install aiohttp")
+        sys.exit(1)
+
+    print("📼 녹화 응답 로드 중...")
+    replay_store = load_replay_store(args.replay or default_replay_patterns())
+    print(f"✅ 응답 {len(replay_store)}개 (고유 메시지 {len(replay_store.responses)}개)")
+
+    mock_server = MockLLMServer(replay_store, args.latency, args.rpm, args.seed)
+    try:
+        asyncio.run(_serve_forever(mock_server, args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\n종료 (요청 {mock_server.requests}회, 제한 {mock_server.rate_limited}회)")
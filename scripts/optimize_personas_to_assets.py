@@ -5,9 +5,9 @@
 
 import os
 import sys
-from PIL import Image
 from pathlib import Path
 import json
+from persona_renditions import ASSET_FORMAT, ASSET_ORIGINAL, load_source_image, render_sizes, save_image
 
 # UTF-8 인코딩 설정
 if sys.platform.startswith('win'):
@@ -46,33 +46,6 @@ name_mapping = {
     "현우": "hyunwoo"
 }
 
-# 이미지 크기 설정
-SIZES = {
-    'thumb': 150,
-    'small': 300, 
-    'medium': 600,
-    'large': 1200
-}
-
-def smart_crop_square(img, size):
-    """스마트 정사각형 크롭"""
-    width, height = img.size
-    
-    if width == height:
-        return img
-    
-    # 세로가 더 긴 경우 (인물 사진), 상단 중심으로 크롭
-    if width < height:
-        crop_height = width
-        top = min(int(height * 0.1), height - crop_height)  # 상단 10% 지점에서 시작
-        return img.crop((0, top, width, top + crop_height))
-    
-    # 가로가 더 긴 경우, 중앙 크롭
-    else:
-        crop_width = height
-        left = (width - crop_width) // 2
-        return img.crop((left, 0, left + crop_width, height))
-
 def optimize_persona_images(korean_name, english_name):
     """페르소나 이미지 최적화"""
     
@@ -106,71 +79,22 @@ def optimize_persona_images(korean_name, english_name):
         print(f"  처리중: {source_image.name} -> {prefix}_*.jpg")
         
         try:
-            with Image.open(source_image) as img:
-                # RGB로 변환
-                if img.mode in ('RGBA', 'LA'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'RGBA':
-                        background.paste(img, mask=img.split()[3])
-                    else:
-                        background.paste(img)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                orig_width, orig_height = img.size
-                aspect_ratio = orig_width / orig_height
-                
-                # 각 크기별로 처리
-                for size_name, target_size in SIZES.items():
-                    # thumb과 small은 정사각형 크롭
-                    if size_name in ['thumb', 'small']:
-                        # 먼저 적절한 크기로 리사이즈
-                        if orig_width > orig_height:
-                            new_width = int(target_size * aspect_ratio)
-                            new_height = target_size
-                        else:
-                            new_width = target_size
-                            new_height = int(target_size / aspect_ratio)
-                        
-                        # 업스케일링 방지
-                        if new_width > orig_width or new_height > orig_height:
-                            resized = img.copy()
-                        else:
-                            resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                        
-                        # 스마트 크롭
-                        resized = smart_crop_square(resized, target_size)
-                        
-                        # 최종 크기로 리사이즈
-                        if resized.size != (target_size, target_size):
-                            resized = resized.resize((target_size, target_size), Image.Resampling.LANCZOS)
-                    else:
-                        # medium과 large는 비율 유지
-                        if orig_width > orig_height:
-                            new_width = target_size
-                            new_height = int(target_size / aspect_ratio)
-                        else:
-                            new_height = target_size
-                            new_width = int(target_size * aspect_ratio)
-                        
-                        # 업스케일링 방지
-                        if new_width > orig_width or new_height > orig_height:
-                            new_width, new_height = orig_width, orig_height
-                        
-                        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                    
-                    # 저장
-                    output_file = output_dir / f"{prefix}_{size_name}.jpg"
-                    resized.save(output_file, 'JPEG', quality=95, optimize=True, progressive=True)
-                    print(f"    - {size_name}: {resized.size[0]}x{resized.size[1]}")
-                
-                # 원본도 저장
-                output_original = output_dir / f"{prefix}_original.jpg"
-                img.save(output_original, 'JPEG', quality=98, optimize=True, progressive=True)
-                print(f"    - original: {orig_width}x{orig_height}")
-                
-                processed_count += 1
+            # RGB 변환 + 레터박스 제거 후 공용 리사이즈 캐스케이드
+            img = load_source_image(source_image)
+            orig_width, orig_height = img.size
+            
+            # 각 크기별로 저장 (thumb/small은 정사각형 크롭, medium/large는 비율 유지)
+            for size_name, resized in render_sizes(img).items():
+                output_file = output_dir / f"{prefix}_{size_name}.jpg"
+                save_image(resized, output_file, ASSET_FORMAT)
+                print(f"    - {size_name}: {resized.size[0]}x{resized.size[1]}")
+            
+            # 원본도 저장
+            output_original = output_dir / f"{prefix}_original.jpg"
+            save_image(img, output_original, ASSET_ORIGINAL)
+            print(f"    - original: {orig_width}x{orig_height}")
+            
+            processed_count += 1
                 
         except Exception as e:
             print(f"    [ERROR] {source_image.name} 처리 실패: {e}")
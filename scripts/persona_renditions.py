@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Shared persona image rendition policy
+One place that decides how a persona source image becomes thumb/small/medium/large
+renditions, used by auto_persona_image_processor_clean.py, upload_persona_to_r2.py,
+optimize_personas_to_assets.py and local_image_optimizer_english.py so that every
+script produces the same pixels for the same source.
+
+Renditions are computed as a resize cascade instead of resizing every size from the
+full-resolution source:
+
+    source -> large -> medium -> square crop -> small -> thumb
+
+Each step only downsamples by about 2x, and large downsamples from very big sources
+first take a cheap Image.reduce() box pass (reducing_gap) before the final LANCZOS pass.
+"""
+
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+SIZES = {
+    'thumb': 150,
+    'small': 300,
+    'medium': 600,
+    'large': 1200
+}
+
+# Sizes that are smart-cropped to an exact square (persona cards)
+SQUARE_SIZES = ('thumb', 'small')
+
+# Image.resize(reducing_gap=...) first shrinks by an integer factor with reduce()
+# while the remaining scale is at least this large; 3.0 is visually indistinguishable
+# from a pure LANCZOS pass
+REDUCING_GAP = 3.0
+
+# Encoder profiles: (PIL format, save options)
+R2_FORMATS = {
+    'webp': ('WEBP', {'quality': 85, 'method': 6}),
+    'jpg': ('JPEG', {'quality': 90, 'optimize': True}),
+}
+R2_ORIGINAL = ('WEBP', {'quality': 95, 'method': 6})
+ASSET_FORMAT = ('JPEG', {'quality': 95, 'optimize': True, 'progressive': True})
+ASSET_ORIGINAL = ('JPEG', {'quality': 98, 'optimize': True, 'progressive': True})
+
+Profile = Tuple[str, dict]
+
+# Bump whenever the geometry above changes in a way the constants do not capture, so
+# rendition manifests treat every previously uploaded rendition as stale
+RENDITION_POLICY_VERSION = 1
+
+
+def remove_black_bars(img):
+    """Remove black letterbox bars from top and bottom of image"""
+    # Convert to numpy array
+    img_array = np.array(img)
+
+    # For RGB images
+    if len(img_array.shape) == 3:
+        # Calculate mean brightness for each row
+        row_means = np.mean(img_array, axis=(1, 2))
+    else:
+        # For grayscale
+        row_means = np.mean(img_array, axis=1)
+
+    # Find non-black rows (threshold of 10 to account for very dark but not pure black)
+    non_black_rows = np.where(row_means > 10)[0]
+
+    if len(non_black_rows) == 0:
+        return img
+
+    # Get the bounds of non-black content
+    top = non_black_rows[0]
+    bottom = non_black_rows[-1] + 1
+
+    # Check if we found black bars (more than 5% of image height)
+    height = img_array.shape[0]
+    if top > height * 0.05 or (height - bottom) > height * 0.05:
+        print(f"    Detected black bars: top={top}px, bottom={height-bottom}px")
+        # Crop the image
+        if len(img_array.shape) == 3:
+            cropped_array = img_array[top:bottom, :, :]
+        else:
+            cropped_array = img_array[top:bottom, :]
+        return Image.fromarray(cropped_array)
+
+    return img
+
+
+def smart_crop_square(img, size=None):
+    """Smart crop to square aspect ratio for persona cards"""
+    width, height = img.size
+
+    if width == height:
+        return img
+
+    # For portrait images, crop from top to focus on face area
+    if width < height:
+        # Take square from top portion (usually where face is)
+        crop_height = width
+        top = min(int(height * 0.1), height - crop_height)  # Start 10% from top or less
+        return img.crop((0, top, width, top + crop_height))
+
+    # For landscape images, center crop
+    else:
+        crop_width = height
+        left = (width - crop_width) // 2
+        return img.crop((left, 0, left + crop_width, height))
+
+
+def to_rgb(img: Image.Image) -> Image.Image:
+    """Flatten transparency onto white and convert to RGB"""
+    if img.mode in ('RGBA', 'LA'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def load_source_image(image_path: Union[str, Path]) -> Image.Image:
+    """Decode a source image as RGB with letterbox bars removed"""
+    with Image.open(image_path) as img:
+        img.load()
+        rgb = to_rgb(img)
+        if rgb is img:
+            rgb = img.copy()
+    return remove_black_bars(rgb)
+
+
+def fit_size(source_size: Tuple[int, int], target_size: int) -> Tuple[int, int]:
+    """Aspect-preserving size whose long side is target_size (never upscales)"""
+    orig_width, orig_height = source_size
+    aspect_ratio = orig_width / orig_height
+    if orig_width > orig_height:
+        new_width, new_height = target_size, int(target_size / aspect_ratio)
+    else:
+        new_width, new_height = int(target_size * aspect_ratio), target_size
+    if new_width > orig_width or new_height > orig_height:
+        return orig_width, orig_height
+    return new_width, new_height
+
+
+def _resize(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    if img.size == size:
+        return img
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+
+def render_sizes(img: Image.Image, sizes: Dict[str, int] = SIZES) -> Dict[str, Image.Image]:
+    """Compute all renditions of a prepared (RGB) source through the resize cascade
+
+    Aspect sizes keep the source aspect ratio and never upscale; square sizes are
+    smart-cropped and always exactly target x target.
+    """
+    renditions = {}
+
+    # Aspect-preserving sizes, largest first, each from the previous one
+    aspect_names = sorted((n for n in sizes if n not in SQUARE_SIZES), key=sizes.get, reverse=True)
+    current = img
+    for name in aspect_names:
+        current = _resize(current, fit_size(img.size, sizes[name]))
+        renditions[name] = current
+
+    # Square sizes: crop from the smallest aspect rendition still big enough, then cascade down
+    square_names = sorted((n for n in sizes if n in SQUARE_SIZES), key=sizes.get, reverse=True)
+    if square_names:
+        needed = sizes[square_names[0]]
+        candidates = [renditions[n] for n in aspect_names if min(renditions[n].size) >= needed]
+        current = smart_crop_square(min(candidates, key=lambda r: r.size[0]) if candidates else img)
+        for name in square_names:
+            target = sizes[name]
+            # Small sources are scaled up to the exact card size
+            current = _resize(current, (target, target))
+            renditions[name] = current
+
+    return {name: renditions[name] for name in sizes}
+
+
+def rendition_params(size_name: str, profile: Profile, sizes: Dict[str, int] = SIZES) -> Dict:
+    """Everything that determines a rendition's bytes besides the source image"""
+    image_format, options = profile
+    return {
+        'policy': RENDITION_POLICY_VERSION,
+        'size': size_name,
+        'target': sizes.get(size_name),
+        'square': size_name in SQUARE_SIZES,
+        'reducing_gap': REDUCING_GAP,
+        'format': image_format,
+        'options': options,
+    }
+
+
+def encode_image(img: Image.Image, profile: Profile) -> bytes:
+    """Encode an image with an encoder profile"""
+    image_format, options = profile
+    buffer = BytesIO()
+    img.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def save_image(img: Image.Image, path: Union[str, Path], profile: Profile):
+    image_format, options = profile
+    img.save(path, image_format, **options)
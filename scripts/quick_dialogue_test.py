@@ -10,6 +10,7 @@ import json
 import random
 import sys
 import io
+from keyword_matcher import KeywordMatcher
 
 # UTF-8 인코딩 설정
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -21,6 +22,13 @@ if not firebase_admin._apps:
 
 db = firestore.client()
 
+# AI 응답에서 찾을 하드코딩 패턴 / 부적절한 내용 (한 번의 스캔으로 모두 탐지)
+HARDCODED_PATTERN_MATCHER = KeywordMatcher([
+    "소울메이트", "그런 얘기보다", "만나고 싶긴 한데",
+    "완벽한 소울메이트가 되었어요", "다른 재밌는 얘기하자"
+])
+INAPPROPRIATE_WORD_MATCHER = KeywordMatcher(["만나자", "연락처", "번호", "실제로", "오프라인"])
+
 class QuickDialogueTest:
     def __init__(self):
         self.test_scenarios = [
@@ -128,21 +136,16 @@ class QuickDialogueTest:
                 
                 if not is_user and content:  # AI 응답
                     # 1. 하드코딩 패턴 체크
-                    hardcoded_patterns = [
-                        "소울메이트", "그런 얘기보다", "만나고 싶긴 한데",
-                        "완벽한 소울메이트가 되었어요", "다른 재밌는 얘기하자"
-                    ]
-                    
-                    for pattern in hardcoded_patterns:
-                        if pattern in content:
-                            issues.append({
-                                'type': '하드코딩',
-                                'turn': i,
-                                'description': f'하드코딩된 패턴 발견: "{pattern}"',
-                                'content': content
-                            })
-                            self.patterns['하드코딩'].append(pattern)
-                            
+                    for hit in HARDCODED_PATTERN_MATCHER.find_distinct(content):
+                        pattern = hit.keyword
+                        issues.append({
+                            'type': '하드코딩',
+                            'turn': i,
+                            'description': f'하드코딩된 패턴 발견: "{pattern}"',
+                            'content': content
+                        })
+                        self.patterns['하드코딩'].append(pattern)
+                        
                     # 2. 반복 체크
                     if content in previous_responses:
                         issues.append({
@@ -173,17 +176,16 @@ class QuickDialogueTest:
                         self.patterns['너무짧은응답'].append(content)
                         
                     # 4. 부적절한 내용
-                    inappropriate = ["만나자", "연락처", "번호", "실제로", "오프라인"]
-                    for word in inappropriate:
-                        if word in content:
-                            issues.append({
-                                'type': '부적절',
-                                'turn': i,
-                                'description': f'부적절한 내용: {word}',
-                                'content': content
-                            })
-                            self.patterns['부적절'].append(word)
-                            
+                    for hit in INAPPROPRIATE_WORD_MATCHER.find_distinct(content):
+                        word = hit.keyword
+                        issues.append({
+                            'type': '부적절',
+                            'turn': i,
+                            'description': f'부적절한 내용: {word}',
+                            'content': content
+                        })
+                        self.patterns['부적절'].append(word)
+                        
                     previous_responses.append(content)
                     
         return issues
@@ -1,6 +1,14 @@
 #!/usr/bin/env python3
 """
 빠른 성능 테스트 스크립트 (50턴)
+
+응답 대기 방식:
+- polling (기본): 0.5초마다 최근 메시지 10개를 조회
+- listener (--listener): Firestore on_snapshot 리스너가 AI 메시지 도착 시각을 바로 기록
+  (폴링 간격만큼의 인위적 지연과 반복 조회 비용이 없음)
+
+--emulator를 주면 로컬 Firestore 에뮬레이터에 연결하고, --responder로 AI 응답 대역까지
+같은 프로세스에서 띄워 실제 프로젝트 없이 테스트합니다 (firestore_emulator.py).
 """
 
 import os
@@ -8,11 +16,14 @@ import sys
 import time
 import random
 import json
+import queue
+import threading
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
 import psutil
-import statistics
+from firestore_emulator import DEFAULT_EMULATOR_HOST, DEFAULT_RESPONDER_LATENCY, EmulatorResponder, emulator_client
+from latency_histogram import LatencyHistogram, REPORT_PERCENTILES, percentile_key, performance_section
 
 # Firebase 초기화
 def initialize_firebase():
@@ -43,16 +54,28 @@ MESSAGE_PATTERNS = [
 ]
 
 class QuickTester:
-    def __init__(self, user_id: str, persona_id: str):
-        self.db = firestore.client()
+    def __init__(self, user_id: str, persona_id: str, db=None, use_listener: bool = False,
+                 latency: LatencyHistogram = None):
+        self.db = db if db is not None else firestore.client()
         self.user_id = user_id
         self.persona_id = persona_id
         self.messages_sent = 0
         self.messages_received = 0
-        self.response_times = []
+        # 응답 시간은 고정 메모리 히스토그램에 기록 (턴 수와 무관, 여러 테스터가 공유 가능)
+        self.latency = latency if latency is not None else LatencyHistogram()
+        self.last_response_time = None
         self.errors = []
         self.start_time = None
         
+        # 리스너 모드: 콜백 스레드가 AI 메시지 도착 시각을 큐에 넣음
+        self.use_listener = use_listener
+        self._arrivals = queue.Queue()
+        self._watch = None
+        self._last_sent_at = None
+        
+    def messages_ref(self):
+        return self.db.collection('users').document(self.user_id).collection('messages')
+        
     def send_message(self, content: str) -> bool:
         """메시지 전송"""
         try:
@@ -65,9 +88,9 @@ class QuickTester:
                 'isRead': False,
             }
             
-            self.db.collection('users').document(self.user_id)\
-                   .collection('messages').add(message_data)
+            self.messages_ref().add(message_data)
             
+            self._last_sent_at = time.time()
             self.messages_sent += 1
             return True
             
@@ -75,8 +98,38 @@ class QuickTester:
             self.errors.append(f"전송 실패: {str(e)}")
             return False
     
+    def start_listener(self, timeout: float = 10.0):
+        """이 페르소나의 AI 메시지 추가를 구독합니다 (첫 스냅샷을 받을 때까지 대기)."""
+        ready = threading.Event()
+        
+        def on_snapshot(snapshots, changes, read_time):
+            arrived_at = time.time()
+            if not ready.is_set():
+                # 첫 스냅샷은 구독 전부터 있던 메시지
+                ready.set()
+                return
+            for change in changes:
+                if change.type.name == 'ADDED':
+                    self._arrivals.put(arrived_at)
+        
+        query = self.messages_ref()\
+                    .where('personaId', '==', self.persona_id)\
+                    .where('isFromUser', '==', False)
+        self._watch = query.on_snapshot(on_snapshot)
+        if not ready.wait(timeout):
+            self.stop_listener()
+            raise TimeoutError("Firestore 리스너 초기 스냅샷 대기 시간 초과")
+    
+    def stop_listener(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+    
     def wait_for_response(self, timeout: int = 30) -> bool:
         """AI 응답 대기"""
+        if self.use_listener:
+            return self._wait_for_arrival(timeout)
+        
         start_wait = time.time()
         
         while time.time() - start_wait < timeout:
@@ -88,13 +141,15 @@ class QuickTester:
                                  .limit(10)\
                                  .get()
                 
-                ai_messages = [msg for msg in messages 
-                             if msg.to_dict().get('personaId') == self.persona_id 
-                             and not msg.to_dict().get('isFromUser', False)]
+                ai_messages = []
+                for msg in messages:
+                    data = msg.to_dict()
+                    if data.get('personaId') == self.persona_id and not data.get('isFromUser', False):
+                        ai_messages.append(msg)
                 
                 if len(ai_messages) > self.messages_received:
                     response_time = time.time() - start_wait
-                    self.response_times.append(response_time)
+                    self.record_response_time(response_time)
                     self.messages_received = len(ai_messages)
                     return True
                     
@@ -105,13 +160,47 @@ class QuickTester:
         
         return False
     
+    def _wait_for_arrival(self, timeout: float) -> bool:
+        """리스너가 기록한 도착 시각으로 응답 시간 측정 (전송 완료 시각 기준)"""
+        sent_at = self._last_sent_at if self._last_sent_at is not None else time.time()
+        deadline = sent_at + timeout
+        
+        while True:
+            try:
+                arrived_at = self._arrivals.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                return False
+            # 이전 턴에서 시간 초과 후 늦게 도착한 응답은 버림
+            if arrived_at < sent_at:
+                continue
+            self.record_response_time(arrived_at - sent_at)
+            self.messages_received += 1
+            return True
+    
+    def record_response_time(self, response_time: float):
+        self.latency.record(response_time)
+        self.last_response_time = response_time
+    
+    def run_turn(self, content: str, turn: int, timeout: int = 30) -> bool:
+        """메시지 하나를 보내고 응답을 기다립니다 (부하 생성기에서 사용)."""
+        if not self.send_message(content):
+            return False
+        if self.wait_for_response(timeout):
+            return True
+        self.errors.append(f"Turn {turn}: Response timeout")
+        return False
+    
     def run_test(self, num_turns: int = 50):
         """테스트 실행"""
         print(f"\n[START] {num_turns}턴 빠른 성능 테스트 시작")
         print(f"[USER] {self.user_id}")
         print(f"[PERSONA] {self.persona_id}")
+        print(f"[MODE] {'listener' if self.use_listener else 'polling'}")
         print("-" * 50)
         
+        if self.use_listener:
+            self.start_listener()
+        
         self.start_time = time.time()
         
         # 초기 메모리 측정
@@ -123,7 +212,7 @@ class QuickTester:
             # 진행률 표시 (10턴마다)
             if i % 10 == 0:
                 elapsed = time.time() - self.start_time
-                avg_response = sum(self.response_times) / len(self.response_times) if self.response_times else 0
+                avg_response = self.latency.mean
                 current_memory = process.memory_info().rss / 1024 / 1024
                 
                 print(f"\n[PROGRESS] {i}/{num_turns} ({i/num_turns*100:.1f}%)")
@@ -137,7 +226,7 @@ class QuickTester:
                 # AI 응답 대기
                 if self.wait_for_response():
                     if i % 10 == 0:  # 10턴마다만 표시
-                        print(f"  [{i}] 응답 시간: {self.response_times[-1]:.2f}초")
+                        print(f"  [{i}] 응답 시간: {self.last_response_time:.2f}초")
                 else:
                     self.errors.append(f"Turn {i}: Response timeout")
                     if i % 10 == 0:
@@ -146,6 +235,8 @@ class QuickTester:
             # 대화 간격
             time.sleep(random.uniform(0.2, 0.5))
         
+        self.stop_listener()
+        
         # 최종 결과
         self.print_results()
     
@@ -165,22 +256,23 @@ class QuickTester:
         print(f"  응답률: {self.messages_received/self.messages_sent*100:.1f}%")
         print(f"  오류: {len(self.errors)}건")
         
-        if self.response_times:
+        if self.latency.total_count:
             print(f"\n[RESPONSE TIME]")
-            print(f"  평균: {statistics.mean(self.response_times):.2f}초")
-            print(f"  중간값: {statistics.median(self.response_times):.2f}초")
-            print(f"  최소: {min(self.response_times):.2f}초")
-            print(f"  최대: {max(self.response_times):.2f}초")
-            if len(self.response_times) > 1:
-                print(f"  표준편차: {statistics.stdev(self.response_times):.2f}초")
+            print(f"  평균: {self.latency.mean:.2f}초")
+            print(f"  중간값: {self.latency.percentile(50):.2f}초")
+            print(f"  최소: {self.latency.min:.2f}초")
+            print(f"  최대: {self.latency.max:.2f}초")
+            if self.latency.total_count > 1:
+                print(f"  표준편차: {self.latency.stdev:.2f}초")
+            print("  " + ", ".join(f"{percentile_key(q)}: {self.latency.percentile(q):.2f}초" for q in REPORT_PERCENTILES))
         
         print(f"\n[MEMORY]")
         print(f"  최종: {final_memory:.1f}MB")
         
         # 성능 분석
         print(f"\n[ANALYSIS]")
-        if self.response_times:
-            avg_response = statistics.mean(self.response_times)
+        if self.latency.total_count:
+            avg_response = self.latency.mean
             if avg_response > 5:
                 print("  [!] 응답 시간이 느립니다 (평균 5초 초과)")
             elif avg_response > 3:
@@ -188,8 +280,8 @@ class QuickTester:
             else:
                 print("  [OK] 응답 시간이 양호합니다 (평균 3초 이하)")
             
-            if len(self.response_times) > 1:
-                std_dev = statistics.stdev(self.response_times)
+            if self.latency.total_count > 1:
+                std_dev = self.latency.stdev
                 if std_dev > 3:
                     print("  [!] 응답 시간 편차가 큽니다 (표준편차 3초 초과)")
                 else:
@@ -214,16 +306,10 @@ class QuickTester:
                 'timestamp': timestamp,
                 'duration': time.time() - self.start_time if self.start_time else 0,
                 'messages_sent': self.messages_sent,
-                'messages_received': self.messages_received
-            },
-            'performance': {
-                'response_times': self.response_times,
-                'avg_response': statistics.mean(self.response_times) if self.response_times else 0,
-                'median_response': statistics.median(self.response_times) if self.response_times else 0,
-                'min_response': min(self.response_times) if self.response_times else 0,
-                'max_response': max(self.response_times) if self.response_times else 0,
-                'std_dev': statistics.stdev(self.response_times) if len(self.response_times) > 1 else 0
+                'messages_received': self.messages_received,
+                'wait_mode': 'listener' if self.use_listener else 'polling'
             },
+            'performance': performance_section(self.latency),
             'errors': self.errors
         }
         
@@ -235,17 +321,49 @@ class QuickTester:
         
         print(f"\n[SAVED] {filename}")
 
-def main():
+DEFAULT_USER_ID = "05SMvhBIw7WEf6pNXyN4zcBhLvr2"
+DEFAULT_PERSONA_ID = "1aD0ZX6NFq3Ij2FScLCK"
+
+def main(args=None):
     """메인 함수"""
-    # Firebase 초기화
-    initialize_firebase()
+    responder = None
+    if args is not None and args.emulator:
+        db = emulator_client(args.emulator_host)
+        print(f"[OK] Firestore 에뮬레이터 연결: {os.environ['FIRESTORE_EMULATOR_HOST']}")
+        if args.responder:
+            responder = EmulatorResponder(db, latency=args.responder_latency).start()
+            print(f"[OK] AI 응답 대역 실행 (지연 {args.responder_latency}ms)")
+    else:
+        # Firebase 초기화
+        initialize_firebase()
+        db = None
     
     # 테스트 실행
-    user_id = "05SMvhBIw7WEf6pNXyN4zcBhLvr2"
-    persona_id = "1aD0ZX6NFq3Ij2FScLCK"
-    
-    tester = QuickTester(user_id, persona_id)
-    tester.run_test(50)
+    tester = QuickTester(
+        args.user_id if args is not None else DEFAULT_USER_ID,
+        args.persona_id if args is not None else DEFAULT_PERSONA_ID,
+        db=db,
+        use_listener=args is not None and args.listener
+    )
+    try:
+        tester.run_test(args.turns if args is not None else 50)
+    finally:
+        tester.stop_listener()
+        if responder is not None:
+            responder.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description='빠른 성능 테스트 (50턴)')
+    parser.add_argument('--turns', type=int, default=50, help='대화 턴 수 (기본: 50)')
+    parser.add_argument('--user-id', type=str, default=DEFAULT_USER_ID, help='테스트 사용자 ID')
+    parser.add_argument('--persona-id', type=str, default=DEFAULT_PERSONA_ID, help='테스트 페르소나 ID')
+    parser.add_argument('--listener', action='store_true',
+                        help='폴링 대신 Firestore 리스너로 응답 도착 시각 측정')
+    parser.add_argument('--emulator', action='store_true', help='로컬 Firestore 에뮬레이터에 연결 (서비스 계정 키 불필요)')
+    parser.add_argument('--emulator-host', type=str, help=f'에뮬레이터 주소 (기본: FIRESTORE_EMULATOR_HOST 또는 {DEFAULT_EMULATOR_HOST})')
+    parser.add_argument('--responder', action='store_true',
+                        help='에뮬레이터 모드에서 AI 응답 대역을 함께 실행 (firestore_emulator.py)')
+    parser.add_argument('--responder-latency', type=str, default=DEFAULT_RESPONDER_LATENCY,
+                        help=f'응답 대역 지연 분포 ms (기본: {DEFAULT_RESPONDER_LATENCY})')
+    main(parser.parse_args())
\ No newline at end of file
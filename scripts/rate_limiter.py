@@ -0,0 +1,126 @@
+"""
+비동기 토큰 버킷 속도 제한기
+여러 asyncio 작업이 같은 API를 동시에 호출할 때 고정 sleep 대신 사용합니다.
+
+- 초당 rate개씩 채워지는 토큰 버킷 (최대 capacity개까지 버스트 허용)
+- OpenAI 형식의 응답 헤더(x-ratelimit-remaining-*, x-ratelimit-reset-*, retry-after)를
+  반영해, 남은 한도가 없으면 리셋 시각까지 모든 작업을 멈춥니다.
+"""
+
+import asyncio
+import re
+import time
+from typing import Mapping, Optional
+
+# "1s", "6m0s", "20ms", "1h2m3.5s" 같은 OpenAI 리셋 시간 표기
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """리셋 시간 문자열을 초로 변환합니다 (숫자만 있으면 초 단위)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucketRateLimiter:
+    """asyncio용 토큰 버킷
+
+    acquire()는 토큰이 생길 때까지 기다린 뒤 하나를 소비합니다.
+    응답을 받을 때마다 update_from_headers()를 호출하면 서버가 알려준
+    남은 한도에 맞춰 버킷을 줄이고, 한도가 바닥나면 리셋 시각까지 대기합니다.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate는 0보다 커야 합니다")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+        # 통계
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self.throttled = 0
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: Optional[float] = None) -> 'TokenBucketRateLimiter':
+        return cls(requests_per_minute / 60.0, burst)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 기다립니다."""
+        started = time.monotonic()
+        # 락을 잡은 작업부터 순서대로 토큰을 받으므로 대기 순서가 공정함
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        self.acquired += 1
+        self.waited_seconds += time.monotonic() - started
+
+    def block_for(self, seconds: float):
+        """seconds초 동안 새 요청을 보내지 않습니다 (429 응답 등)."""
+        if seconds <= 0:
+            return
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self.throttled += 1
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """서버의 rate limit 헤더를 반영합니다."""
+        retry_after = parse_reset_duration(headers.get('retry-after'))
+        if retry_after is not None:
+            self.block_for(retry_after)
+
+        for kind in ('requests', 'tokens'):
+            remaining = _header_int(headers, f'x-ratelimit-remaining-{kind}')
+            if remaining is None:
+                continue
+            if remaining <= 0:
+                reset = parse_reset_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                self.block_for(reset if reset is not None else 1.0 / self.rate)
+            elif kind == 'requests':
+                # 서버가 허용하는 남은 요청 수보다 많이 버스트하지 않도록
+                self._refill(time.monotonic())
+                self._tokens = min(self._tokens, float(remaining))
+
+    def stats(self) -> dict:
+        return {
+            'rate_per_second': self.rate,
+            'acquired': self.acquired,
+            'throttled': self.throttled,
+            'average_wait_seconds': self.waited_seconds / self.acquired if self.acquired else 0.0,
+        }
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Rendition Manifest
+Local record of what is already in R2 for each rendition key, so routine syncs skip
+unchanged renditions instead of re-encoding and re-uploading every size.
+
+Each entry stores the SHA-256 of the source image, a digest of the rendition
+parameters (persona_renditions.rendition_params) and the ETag R2 returned. A
+rendition is current when the source and parameters still match, and - with
+remote verification - R2 still reports the recorded ETag.
+
+Usage:
+    python rendition_manifest.py                  # summary of the default manifest
+    python rendition_manifest.py --prune personas/윤미/
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+DEFAULT_MANIFEST_PATH = 'persona_r2_manifest.json'
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def params_digest(params: Dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def body_etag(body: bytes) -> str:
+    """ETag R2 reports for a single-part upload of body"""
+    return hashlib.md5(body).hexdigest()
+
+
+def normalize_etag(etag: Optional[str]) -> Optional[str]:
+    return etag.strip('"') if etag else None
+
+
+def list_remote_etags(s3_client, bucket: str, prefix: str = 'personas/') -> Dict[str, str]:
+    """ETags of every object under prefix, 1000 keys per request instead of one head_object each"""
+    etags = {}
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            etags[obj['Key']] = normalize_etag(obj['ETag'])
+    return etags
+
+
+class RenditionManifest:
+    """JSON manifest of uploaded renditions keyed by R2 object key (thread-safe)"""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        self.objects: Dict[str, Dict] = {}
+        # Source hashes keyed by path, reused while size and mtime are unchanged
+        self.sources: Dict[str, Dict] = {}
+        self.remote_etags: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: ignoring unreadable manifest {self.path}: {e}")
+            return
+        if data.get('version') != MANIFEST_VERSION:
+            print(f"Warning: manifest {self.path} has version {data.get('version')}, starting fresh")
+            return
+        self.objects = data.get('objects', {})
+        self.sources = data.get('sources', {})
+
+    def save(self):
+        """Write the manifest atomically (no-op when nothing changed)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'version': MANIFEST_VERSION,
+                'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'objects': dict(sorted(self.objects.items())),
+                'sources': dict(sorted(self.sources.items())),
+            }
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def source_hash(self, path: Union[str, Path]) -> str:
+        """SHA-256 of a source image, rehashed only when its size or mtime changed"""
+        stat = os.stat(path)
+        key = str(Path(path).resolve())
+        with self._lock:
+            cached = self.sources.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime:
+            return cached['sha256']
+        digest = file_sha256(path)
+        with self._lock:
+            self.sources[key] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': digest}
+            self._dirty = True
+        return digest
+
+    def load_remote(self, s3_client, bucket: str, prefix: str = 'personas/') -> int:
+        """Fetch remote ETags so is_current() also checks that objects still exist unchanged"""
+        self.remote_etags = list_remote_etags(s3_client, bucket, prefix)
+        return len(self.remote_etags)
+
+    def is_current(self, key: str, source_hash: str, params: Dict) -> bool:
+        entry = self.get(key)
+        if not entry or entry['source_sha256'] != source_hash or entry['params'] != params_digest(params):
+            return False
+        if self.remote_etags is not None:
+            return entry.get('etag') is not None and self.remote_etags.get(key) == entry['etag']
+        return True
+
+    def matches_remote(self, key: str, body: bytes) -> bool:
+        """True when R2 already holds exactly these bytes (single-part ETag == MD5)"""
+        if self.remote_etags is None or key not in self.remote_etags:
+            return False
+        return self.remote_etags[key] == body_etag(body)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self.objects.get(key)
+
+    def record(self, key: str, source_hash: str, params: Dict, etag: Optional[str], size: int,
+               dimensions: Optional[Tuple[int, int]] = None):
+        with self._lock:
+            self.objects[key] = {
+                'source_sha256': source_hash,
+                'params': params_digest(params),
+                'etag': normalize_etag(etag),
+                'bytes': size,
+                'dimensions': list(dimensions) if dimensions else None,
+                'uploaded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }
+            self._dirty = True
+
+    def forget(self, keys: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for key in list(keys):
+                if self.objects.pop(key, None) is not None:
+                    removed += 1
+            self._dirty = self._dirty or removed > 0
+        return removed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect or prune the persona rendition manifest')
+    parser.add_argument('--manifest', '-m', default=DEFAULT_MANIFEST_PATH,
+                        help=f'Manifest path (default: {DEFAULT_MANIFEST_PATH})')
+    parser.add_argument('--prune', metavar='PREFIX',
+                        help='Forget every entry whose key starts with PREFIX (forces re-upload)')
+    args = parser.parse_args()
+
+    manifest = RenditionManifest(args.manifest)
+    if args.prune:
+        removed = manifest.forget(key for key in manifest.objects if key.startswith(args.prune))
+        manifest.save()
+        print(f"Removed {removed} entries under {args.prune}")
+
+    personas = {key.split('/')[1] for key in manifest.objects if key.count('/') >= 2}
+    total_bytes = sum(entry.get('bytes') or 0 for entry in manifest.objects.values())
+    print(f"{manifest.path}: {len(manifest.objects)} renditions for {len(personas)} personas "
+          f"({total_bytes / (1024 * 1024):.1f} MB), {len(manifest.sources)} hashed sources")
@@ -0,0 +1,212 @@
+"""
+정규식 규칙 엔진
+규칙 그룹마다 모든 패턴을 한 번만 컴파일하고 하나의 alternation으로 합쳐,
+텍스트 하나를 한 번 스캔해 그룹 안의 어떤 규칙들이 적중했는지 찾습니다.
+
+규칙별 적중 수와 (표본 측정한) 지연 시간을 누적하므로 규칙이 늘어날 때
+어떤 규칙이 가장 비싼지 확인할 수 있습니다.
+chat_improvement_validator.py가 사용합니다.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+# 기본값: 100번 스캔마다 한 번씩 규칙별로 따로 실행해 지연 시간을 측정
+DEFAULT_PROFILE_EVERY = 100
+
+# 합친 정규식 안에서는 그룹 번호/이름이 달라지므로 역참조가 있는 패턴은 따로 검색
+BACKREFERENCE_PATTERN = re.compile(r'\\[1-9]|\(\?P=')
+
+
+@dataclass
+class Rule:
+    """규칙 하나 (패턴 + 적중 시 사용할 임의의 값)"""
+    name: str
+    pattern: str
+    payload: Any = None
+    flags: int = 0
+
+
+@dataclass
+class RuleStats:
+    """규칙별 누적 카운터"""
+    hits: int = 0               # 적중한 텍스트 수
+    sampled_calls: int = 0      # 지연 시간을 측정한 횟수
+    sampled_seconds: float = 0.0
+
+    @property
+    def avg_latency_us(self) -> float:
+        return self.sampled_seconds / self.sampled_calls * 1e6 if self.sampled_calls else 0.0
+
+
+@dataclass
+class GroupStats:
+    """그룹별 누적 카운터 (합쳐진 패턴 스캔 비용)"""
+    scans: int = 0
+    scan_seconds: float = 0.0
+    rule_stats: Dict[str, RuleStats] = field(default_factory=dict)
+
+
+class RuleGroup:
+    """한 번의 스캔으로 평가되는 규칙 묶음
+
+    모든 규칙을 `(?=(?P<r0>...)|(?P<r1>...)|...)` 형태의 lookahead 하나로 합쳐
+    규칙이 시작될 수 있는 위치만 찾고, 그 위치에서 아직 적중하지 않은 규칙만
+    개별 컴파일된 패턴으로 확인합니다. 따라서 결과는 규칙마다 re.search를
+    따로 실행한 것과 같습니다.
+    """
+
+    def __init__(self, name: str, rules: Iterable[Rule], profile_every: int = DEFAULT_PROFILE_EVERY):
+        self.name = name
+        self.rules: List[Rule] = list(rules)
+        self.profile_every = profile_every
+
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"규칙 그룹 '{name}'에 중복된 규칙 이름이 있습니다")
+
+        self._compiled = [re.compile(rule.pattern, rule.flags) for rule in self.rules]
+        # 전역 인라인 플래그/역참조가 있는 패턴은 합칠 수 없으므로 따로 검색
+        self._merged_indexes = [i for i, rule in enumerate(self.rules) if self._is_mergeable(rule)]
+        self._standalone_indexes = [i for i in range(len(self.rules)) if i not in self._merged_indexes]
+        if self._merged_indexes:
+            alternation = '|'.join(
+                f'(?P<r{i}>{self._inline(self.rules[i])})' for i in self._merged_indexes
+            )
+            self._merged = re.compile(f'(?=(?:{alternation}))')
+        else:
+            self._merged = None
+
+        self.stats = GroupStats(rule_stats={rule.name: RuleStats() for rule in self.rules})
+
+    @classmethod
+    def _is_mergeable(cls, rule: Rule) -> bool:
+        if BACKREFERENCE_PATTERN.search(rule.pattern):
+            return False
+        try:
+            re.compile(f'(?=(?:(?P<r0>{cls._inline(rule)})))')
+        except re.error:
+            return False
+        return True
+
+    @staticmethod
+    def _inline(rule: Rule) -> str:
+        """규칙별 플래그를 인라인 플래그로 옮긴 패턴 (합쳐진 정규식 안에서도 유지되도록)"""
+        inline = ''
+        if rule.flags & re.IGNORECASE:
+            inline += 'i'
+        if rule.flags & re.MULTILINE:
+            inline += 'm'
+        if rule.flags & re.DOTALL:
+            inline += 's'
+        return f'(?{inline}:{rule.pattern})' if inline else f'(?:{rule.pattern})'
+
+    def scan(self, text: str) -> List[Rule]:
+        """텍스트에서 적중한 규칙들을 등록 순서대로 반환합니다."""
+        if not self.rules or text is None:
+            return []
+
+        stats = self.stats
+        stats.scans += 1
+        start = time.perf_counter()
+
+        hit = [False] * len(self.rules)
+        if self._merged is not None:
+            remaining = len(self._merged_indexes)
+            for match in self._merged.finditer(text):
+                pos = match.start()
+                for i in self._merged_indexes:
+                    if hit[i]:
+                        continue
+                    # 합쳐진 패턴에서 잡힌 규칙은 다시 확인할 필요 없음
+                    if match.group(f'r{i}') is not None or self._compiled[i].match(text, pos):
+                        hit[i] = True
+                        remaining -= 1
+                if remaining == 0:
+                    break
+        for i in self._standalone_indexes:
+            hit[i] = self._compiled[i].search(text) is not None
+
+        stats.scan_seconds += time.perf_counter() - start
+
+        matched = [rule for i, rule in enumerate(self.rules) if hit[i]]
+        for rule in matched:
+            stats.rule_stats[rule.name].hits += 1
+
+        # 첫 스캔부터 profile_every번마다 표본 측정
+        if self.profile_every and (stats.scans - 1) % self.profile_every == 0:
+            self._profile(text)
+
+        return matched
+
+    def _profile(self, text: str):
+        """규칙마다 따로 실행해 지연 시간을 표본 측정합니다."""
+        for rule, compiled in zip(self.rules, self._compiled):
+            start = time.perf_counter()
+            compiled.search(text)
+            rule_stats = self.stats.rule_stats[rule.name]
+            rule_stats.sampled_seconds += time.perf_counter() - start
+            rule_stats.sampled_calls += 1
+
+
+class RuleEngine:
+    """이름으로 구분되는 규칙 그룹 모음"""
+
+    def __init__(self, profile_every: int = DEFAULT_PROFILE_EVERY):
+        self.profile_every = profile_every
+        self.groups: Dict[str, RuleGroup] = {}
+
+    def add_group(self, name: str, rules: Iterable[Rule]) -> RuleGroup:
+        group = RuleGroup(name, rules, self.profile_every)
+        self.groups[name] = group
+        return group
+
+    def scan(self, group_name: str, text: str) -> List[Rule]:
+        """그룹의 적중 규칙 목록"""
+        return self.groups[group_name].scan(text)
+
+    def matched_names(self, group_name: str, text: str) -> List[str]:
+        """그룹의 적중 규칙 이름 목록"""
+        return [rule.name for rule in self.scan(group_name, text)]
+
+    def any_match(self, group_name: str, text: str) -> bool:
+        """그룹 규칙 중 하나라도 적중하는지"""
+        return bool(self.scan(group_name, text))
+
+    def stats(self) -> List[Dict]:
+        """규칙별 통계 (표본 평균 지연 시간 내림차순)"""
+        rows = []
+        for group in self.groups.values():
+            for rule in group.rules:
+                rule_stats = group.stats.rule_stats[rule.name]
+                rows.append({
+                    'group': group.name,
+                    'rule': rule.name,
+                    'hits': rule_stats.hits,
+                    'scans': group.stats.scans,
+                    'sampled_calls': rule_stats.sampled_calls,
+                    'avg_latency_us': round(rule_stats.avg_latency_us, 2),
+                })
+        rows.sort(key=lambda row: row['avg_latency_us'], reverse=True)
+        return rows
+
+    def group_stats(self) -> Dict[str, Dict]:
+        """그룹별 스캔 횟수와 누적 스캔 시간"""
+        return {
+            name: {'scans': group.stats.scans, 'scan_ms': round(group.stats.scan_seconds * 1000, 3)}
+            for name, group in self.groups.items()
+        }
+
+    def reset_stats(self):
+        for group in self.groups.values():
+            group.stats = GroupStats(rule_stats={rule.name: RuleStats() for rule in group.rules})
+
+    def print_stats(self, limit: Optional[int] = None):
+        """규칙별 적중/지연 통계 출력"""
+        for name, group in self.group_stats().items():
+            print(f"  [{name}] 스캔 {group['scans']}회, 누적 {group['scan_ms']:.1f}ms")
+        for row in self.stats()[:limit]:
+            print(f"    - {row['group']}/{row['rule']}: 적중 {row['hits']}/{row['scans']}, "
+                  f"평균 {row['avg_latency_us']:.1f}µs (표본 {row['sampled_calls']}회)")
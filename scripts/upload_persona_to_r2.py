@@ -7,18 +7,96 @@ Processes and uploads persona images with optimization
 import os
 import sys
 import json
+import random
+import re
+import threading
+import time
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
 from PIL import Image
 import argparse
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from latency_histogram import LatencyHistogram
+from persona_renditions import (
+    R2_FORMATS, R2_ORIGINAL, SIZES, Profile, encode_image, load_source_image, render_sizes,
+    rendition_params
+)
+from rendition_manifest import DEFAULT_MANIFEST_PATH, RenditionManifest, body_etag, normalize_etag
+
+CONTENT_TYPES = {
+    'webp': 'image/webp',
+    'jpg': 'image/jpeg',
+}
+
+# Upload concurrency: threads sharing one client, each with its own pooled connection
+DEFAULT_UPLOAD_WORKERS = 16
+
+# Objects at least this large (full-resolution originals) go up as multipart uploads
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+MULTIPART_CONCURRENCY = 4
+
+# Transient failures are retried with full-jitter exponential backoff
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+RETRYABLE_ERROR_CODES = {
+    'InternalError', 'RequestTimeout', 'ServiceUnavailable', 'SlowDown',
+    'Throttling', 'ThrottlingException', 'TooManyRequests',
+}
+
+# "An error occurred (AccessDenied) when calling the UploadPart operation: ..."
+CLIENT_ERROR_CODE_PATTERN = re.compile(r'An error occurred \((\w+)\)')
+
+def is_retryable(error: Exception) -> bool:
+    """Connection errors, timeouts, throttling and 5xx responses are worth retrying"""
+    if isinstance(error, ClientError):
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return status >= 500 or error.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+    if isinstance(error, S3UploadFailedError):
+        # s3transfer wraps every failed multipart upload, including AccessDenied and
+        # NoSuchBucket, so judge by the underlying error
+        cause = error.__cause__ or error.__context__
+        if cause is not None and cause is not error:
+            return is_retryable(cause)
+        match = CLIENT_ERROR_CODE_PATTERN.search(str(error))
+        if match:
+            return match.group(1) in RETRYABLE_ERROR_CODES
+        return True
+    return isinstance(error, (BotoConnectionError, HTTPClientError))
+
+def backoff_delay(attempt: int) -> float:
+    """Full jitter: uniform in [0, min(max delay, base * 2^(attempt - 1))]"""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
 
 class PersonaImageUploader:
-    def __init__(self, config_path: Optional[str] = None):
-        """Initialize uploader with R2 credentials"""
+    def __init__(self, config_path: Optional[str] = None, workers: int = DEFAULT_UPLOAD_WORKERS,
+                 manifest: Optional[RenditionManifest] = None):
+        """Initialize uploader with R2 credentials
+        
+        With a manifest, versions whose source image and rendition parameters are
+        unchanged since their last upload are skipped.
+        """
+        self.workers = workers
+        self.manifest = manifest
         self.config = self.load_config(config_path)
         self.s3_client = self.create_r2_client()
         self.bucket_name = self.config.get('bucket_name', 'sona-personas')
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD,
+            multipart_chunksize=MULTIPART_CHUNKSIZE,
+            max_concurrency=MULTIPART_CONCURRENCY
+        )
+        # Throughput metrics of the most recent process_and_upload_image/upload_catalog run
+        self.last_upload_stats = None
         
     def load_config(self, config_path: Optional[str] = None) -> Dict:
         """Load R2 configuration from file or environment"""
@@ -46,118 +124,215 @@ class PersonaImageUploader:
             endpoint_url=f"https://{self.config['account_id']}.r2.cloudflarestorage.com",
             aws_access_key_id=self.config['access_key_id'],
             aws_secret_access_key=self.config['secret_access_key'],
-            region_name='auto'
+            region_name='auto',
+            config=Config(
+                # Enough connections for every worker to run a multipart upload
+                max_pool_connections=self.workers * MULTIPART_CONCURRENCY,
+                # Retries are done in put_object_with_retry
+                retries={'total_max_attempts': 1}
+            )
         )
     
-    def process_and_upload_image(self, input_path: str, persona_name: str) -> List[Dict]:
-        """Process image and upload all versions to R2"""
-        sizes = {
-            'thumb': 150,
-            'small': 300,
-            'medium': 600,
-            'large': 1200
-        }
+    def process_and_upload_image(self, input_path: str, persona_name: str,
+                                 manager: Optional['UploadManager'] = None, force: bool = False) -> List[Dict]:
+        """Process image and upload all versions to R2
         
-        results = []
+        The versions are uploaded concurrently on the given manager, or on a
+        private one for this image.
+        """
+        if manager is not None:
+            return self.collect_results(self.submit_persona_image(input_path, persona_name, manager, force))
+        
+        with UploadManager(self) as manager:
+            results = self.collect_results(self.submit_persona_image(input_path, persona_name, manager, force))
+        if self.manifest is not None:
+            self.manifest.save()
+        self.last_upload_stats = manager.summary()
+        print(f"📊 {format_upload_stats(self.last_upload_stats)}")
+        return results
+    
+    def submit_persona_image(self, input_path: str, persona_name: str, manager: 'UploadManager',
+                             force: bool = False) -> List[Tuple[str, Tuple[int, int], Future]]:
+        """Encode every changed version and queue its upload; returns (size, dimensions, future) per version
+        
+        The source is only decoded when at least one version is stale in the manifest
+        (or force is set).
+        """
+        pending = []
         
         try:
-            with Image.open(input_path) as img:
-                # Convert RGBA to RGB if necessary
-                if img.mode in ('RGBA', 'LA'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                
-                orig_width, orig_height = img.size
-                aspect_ratio = orig_width / orig_height
-                
-                # Process each size
-                for size_name, target_size in sizes.items():
-                    # Calculate dimensions
-                    if orig_width > orig_height:
-                        new_width = target_size
-                        new_height = int(target_size / aspect_ratio)
-                    else:
-                        new_height = target_size
-                        new_width = int(target_size * aspect_ratio)
-                    
-                    # Don't upscale
-                    if new_width > orig_width or new_height > orig_height:
-                        new_width, new_height = orig_width, orig_height
-                    
-                    # Resize image
-                    resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                    
-                    # Upload as WebP
-                    webp_key = f"personas/{persona_name}/main_{size_name}.webp"
-                    webp_url = self.upload_image_to_r2(resized, webp_key, 'webp')
-                    
-                    if webp_url:
-                        results.append({
-                            'size': size_name,
-                            'format': 'webp',
-                            'url': webp_url,
-                            'key': webp_key,
-                            'dimensions': f'{new_width}x{new_height}'
-                        })
-                        print(f"✅ Uploaded {size_name} ({new_width}x{new_height}): {webp_url}")
-                
-                # Upload original as well
-                orig_key = f"personas/{persona_name}/main_original.webp"
-                orig_url = self.upload_image_to_r2(img, orig_key, 'webp', quality=95)
+            # Every size as WebP, plus the original
+            versions = {size_name: R2_FORMATS['webp'] for size_name in SIZES}
+            versions['original'] = R2_ORIGINAL
+            source_hash = self.manifest.source_hash(input_path) if self.manifest else None
+            
+            stale = set()
+            for size_name, profile in versions.items():
+                key = f"personas/{persona_name}/main_{size_name}.webp"
+                if force or self.manifest is None or \
+                        not self.manifest.is_current(key, source_hash, rendition_params(size_name, profile)):
+                    stale.add(size_name)
+            
+            renditions = {}
+            if stale:
+                img = load_source_image(input_path)
+                renditions = render_sizes(img)
+                renditions['original'] = img
+            
+            for size_name, profile in versions.items():
+                key = f"personas/{persona_name}/main_{size_name}.webp"
+                if size_name not in stale:
+                    dimensions = tuple(self.manifest.get(key).get('dimensions') or (0, 0))
+                    pending.append((size_name, dimensions, manager.skip(key)))
+                    continue
                 
-                if orig_url:
-                    results.append({
-                        'size': 'original',
-                        'format': 'webp',
-                        'url': orig_url,
-                        'key': orig_key,
-                        'dimensions': f'{orig_width}x{orig_height}'
-                    })
-                    print(f"✅ Uploaded original ({orig_width}x{orig_height}): {orig_url}")
+                image = renditions[size_name]
+                body = encode_image(image, profile)
+                future = self.submit_rendition(manager, key, body, 'webp', source_hash,
+                                               rendition_params(size_name, profile), image.size)
+                pending.append((size_name, image.size, future))
                 
         except Exception as e:
             print(f"❌ Error processing image: {e}")
             return []
         
-        return results
+        return pending
     
-    def upload_image_to_r2(self, image: Image.Image, key: str, format: str, quality: int = 85) -> Optional[str]:
-        """Upload PIL Image to R2"""
-        from io import BytesIO
+    def submit_rendition(self, manager: 'UploadManager', key: str, body: bytes, format: str,
+                         source_hash: Optional[str], params: Dict, dimensions: Tuple[int, int]) -> Future:
+        """Queue one encoded version and record it in the manifest once uploaded
         
-        try:
-            # Convert image to bytes
-            buffer = BytesIO()
-            if format == 'webp':
-                image.save(buffer, 'WEBP', quality=quality, method=6)
-                content_type = 'image/webp'
-            else:
-                image.save(buffer, 'JPEG', quality=quality, optimize=True)
-                content_type = 'image/jpeg'
-            
-            buffer.seek(0)
-            
-            # Upload to R2
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=buffer.getvalue(),
-                ContentType=content_type,
-                CacheControl='public, max-age=31536000',
-                Metadata={
-                    'persona': key.split('/')[1],
-                    'type': 'profile'
-                }
-            )
-            
-            # Return public URL
-            return f"https://{self.bucket_name}.{self.config['account_id']}.r2.cloudflarestorage.com/{key}"
+        When remote ETags were loaded and R2 already holds these exact bytes, the
+        upload itself is skipped.
+        """
+        if self.manifest is None:
+            return manager.submit(key, body, format)
+        
+        if self.manifest.matches_remote(key, body):
+            self.manifest.record(key, source_hash, params, body_etag(body), len(body), dimensions)
+            return manager.skip(key)
+        
+        def record(upload: Dict):
+            if not upload['error']:
+                self.manifest.record(key, source_hash, params, upload['etag'], len(body), dimensions)
+        
+        return manager.submit(key, body, format, on_uploaded=record)
+    
+    def collect_results(self, pending: List[Tuple[str, Tuple[int, int], Future]]) -> List[Dict]:
+        """Wait for queued uploads and return the uploaded (or unchanged) versions"""
+        results = []
+        
+        for size_name, (width, height), future in pending:
+            upload = future.result()
+            if upload['error']:
+                print(f"❌ Upload error for {upload['key']}: {upload['error']}")
+                continue
             
+            results.append({
+                'size': size_name,
+                'format': 'webp',
+                'url': upload['url'],
+                'key': upload['key'],
+                'dimensions': f'{width}x{height}',
+                'skipped': upload['skipped']
+            })
+            if upload['skipped']:
+                print(f"⏭️  Unchanged {size_name} ({width}x{height}): {upload['url']}")
+            else:
+                print(f"✅ Uploaded {size_name} ({width}x{height}): {upload['url']}")
+        
+        if self.manifest is not None:
+            self.manifest.save()
+        
+        return results
+    
+    def upload_image_to_r2(self, image: Image.Image, key: str, format: str,
+                           profile: Optional[Profile] = None) -> Optional[str]:
+        """Upload PIL Image to R2 (encoded with the shared R2 profile for the format)"""
+        try:
+            body = encode_image(image, profile or R2_FORMATS[format])
+        except Exception as e:
+            print(f"❌ Encode error for {key}: {e}")
+            return None
+        return self.upload_bytes(key, body, format)
+    
+    def upload_bytes(self, key: str, body: bytes, format: str) -> Optional[str]:
+        """Upload already-encoded image bytes to R2 and return the object URL"""
+        try:
+            self.put_object_with_retry(key, body, format)
+            return self.object_url(key)
         except Exception as e:
             print(f"❌ Upload error for {key}: {e}")
             return None
     
+    def put_object_with_retry(self, key: str, body: bytes, format: str,
+                              on_retry: Optional[Callable[[str, Exception, float], None]] = None) -> Optional[str]:
+        """Upload one object, multipart above MULTIPART_THRESHOLD
+        
+        Transient errors are retried with jittered backoff; returns the object's
+        ETag and raises the last error when all attempts fail.
+        """
+        extra_args = {
+            'ContentType': CONTENT_TYPES.get(format, 'application/octet-stream'),
+            'CacheControl': 'public, max-age=31536000',
+            'Metadata': {
+                # S3 user metadata must be ASCII and persona names are Korean (e.g. 윤미),
+                # so store the name percent-encoded (urllib.parse.unquote to read it back)
+                'persona': quote(key.split('/')[1], safe=''),
+                'type': 'profile'
+            }
+        }
+        
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            try:
+                if len(body) >= MULTIPART_THRESHOLD:
+                    self.s3_client.upload_fileobj(BytesIO(body), self.bucket_name, key,
+                                                  ExtraArgs=extra_args, Config=self.transfer_config)
+                    # Multipart ETags are not an MD5 of the body, so ask R2 for it
+                    response = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+                else:
+                    response = self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=body, **extra_args)
+                return normalize_etag(response.get('ETag'))
+            except Exception as e:
+                if attempt == RETRY_ATTEMPTS or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                if on_retry:
+                    on_retry(key, e, delay)
+                time.sleep(delay)
+    
+    def object_url(self, key: str) -> str:
+        return f"https://{self.bucket_name}.{self.config['account_id']}.r2.cloudflarestorage.com/{key}"
+    
+    def upload_catalog(self, source_dir: str, force: bool = False) -> Dict[str, List[Dict]]:
+        """Upload the first image of every persona folder in source_dir
+        
+        The next persona is encoded while the previous ones are still uploading.
+        """
+        folders = {}
+        for folder in sorted(Path(source_dir).iterdir()):
+            if folder.is_dir():
+                images = sorted(image for ext in ['*.png', '*.jpg', '*.jpeg', '*.webp']
+                                for image in folder.glob(ext))
+                if images:
+                    folders[folder.name] = images[0]
+        
+        with UploadManager(self) as manager:
+            pending = {}
+            for persona_name, image_path in folders.items():
+                print(f"🖼️  Encoding {persona_name}: {image_path.name}")
+                pending[persona_name] = self.submit_persona_image(str(image_path), persona_name, manager, force)
+            
+            results = {}
+            for persona_name, persona_pending in pending.items():
+                results[persona_name] = self.collect_results(persona_pending)
+        
+        if self.manifest is not None:
+            self.manifest.save()
+        self.last_upload_stats = manager.summary()
+        print(f"\n📊 {format_upload_stats(self.last_upload_stats)}")
+        return results
+    
     def save_results(self, results: List[Dict], persona_name: str):
         """Save upload results to JSON file"""
         output_file = f"persona_{persona_name}_urls.json"
@@ -169,31 +344,209 @@ class PersonaImageUploader:
                 'timestamp': str(Path(output_file).stat().st_mtime)
             }, f, indent=2, ensure_ascii=False)
         print(f"\n📄 Results saved to: {output_file}")
+    
+    def save_catalog_results(self, catalog: Dict[str, List[Dict]], stats: Dict):
+        """Save catalog upload results and throughput metrics to JSON file"""
+        output_file = "persona_catalog_urls.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'personas': catalog,
+                'base_url': f"https://{self.bucket_name}.{self.config['account_id']}.r2.cloudflarestorage.com",
+                'upload_stats': stats
+            }, f, indent=2, ensure_ascii=False)
+        print(f"📄 Results saved to: {output_file}")
+
+class UploadManager:
+    """Uploads objects concurrently through one uploader's shared boto3 client
+    
+    submit() returns immediately, so callers can keep encoding while earlier
+    uploads are in flight. Per-object latency, bytes, retries and failures are
+    collected for summary().
+    """
+    
+    def __init__(self, uploader: PersonaImageUploader, workers: Optional[int] = None):
+        self.uploader = uploader
+        self.workers = workers or uploader.workers
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='r2-upload')
+        self.latency = LatencyHistogram()
+        self.uploaded = 0
+        self.failed = 0
+        self.bytes_uploaded = 0
+        self.retries = 0
+        self.skipped = 0
+        self.started_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+    
+    def submit(self, key: str, body: bytes, format: str,
+               on_uploaded: Optional[Callable[[Dict], None]] = None) -> Future:
+        """Queue an upload; the future resolves to {'key', 'url', 'etag', 'bytes', 'seconds', 'skipped', 'error'}
+        
+        on_uploaded runs on the worker with that dict before the future resolves,
+        so anything it records is visible to whoever waits on the future.
+        """
+        return self.executor.submit(self._upload, key, body, format, on_uploaded)
+    
+    def skip(self, key: str) -> Future:
+        """Completed future for an object that is already up to date in R2"""
+        with self._lock:
+            self.skipped += 1
+        future = Future()
+        future.set_result({
+            'key': key,
+            'url': self.uploader.object_url(key),
+            'etag': None,
+            'bytes': 0,
+            'seconds': 0.0,
+            'skipped': True,
+            'error': None
+        })
+        return future
+    
+    def _upload(self, key: str, body: bytes, format: str,
+                on_uploaded: Optional[Callable[[Dict], None]] = None) -> Dict:
+        start = time.perf_counter()
+        etag = None
+        try:
+            etag = self.uploader.put_object_with_retry(key, body, format, on_retry=self._on_retry)
+            error = None
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - start
+        
+        with self._lock:
+            if error:
+                self.failed += 1
+            else:
+                self.uploaded += 1
+                self.bytes_uploaded += len(body)
+        if not error:
+            self.latency.record(elapsed)
+        
+        upload = {
+            'key': key,
+            'url': None if error else self.uploader.object_url(key),
+            'etag': etag,
+            'bytes': len(body),
+            'seconds': elapsed,
+            'skipped': False,
+            'error': error
+        }
+        if on_uploaded is not None:
+            on_uploaded(upload)
+        return upload
+    
+    def _on_retry(self, key: str, error: Exception, delay: float):
+        with self._lock:
+            self.retries += 1
+        print(f"⚠️  Retrying {key} in {delay:.2f}s: {error}")
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.finished_at is None:
+            self.finished_at = time.time()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def summary(self) -> Dict:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        with self._lock:
+            uploaded, failed, total_bytes = self.uploaded, self.failed, self.bytes_uploaded
+            retries, skipped = self.retries, self.skipped
+        return {
+            'objects': uploaded,
+            'skipped': skipped,
+            'failed': failed,
+            'bytes': total_bytes,
+            'retries': retries,
+            'workers': self.workers,
+            'elapsed_seconds': elapsed,
+            'objects_per_second': uploaded / elapsed if elapsed > 0 else 0.0,
+            'mb_per_second': total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+            'latency': self.latency.summary()
+        }
+
+def format_upload_stats(stats: Dict) -> str:
+    latency = stats['latency']
+    parts = [
+        f"{stats['objects']} objects ({stats['bytes'] / (1024 * 1024):.1f} MB) in {stats['elapsed_seconds']:.1f}s",
+        f"{stats['objects_per_second']:.1f} obj/s",
+        f"{stats['mb_per_second']:.2f} MB/s",
+    ]
+    if latency['count']:
+        parts.append(f"p50 {latency['p50']:.3f}s / p99 {latency['p99']:.3f}s per object")
+    parts.append(f"{stats['skipped']} unchanged, {stats['retries']} retries, {stats['failed']} failed")
+    return ', '.join(parts)
+
+def create_uploader(args) -> PersonaImageUploader:
+    """Uploader with the manifest (and remote ETags) requested on the command line"""
+    manifest = None if args.no_manifest else RenditionManifest(args.manifest)
+    uploader = PersonaImageUploader(args.config, workers=args.workers, manifest=manifest)
+    if manifest is not None and args.verify_remote:
+        count = manifest.load_remote(uploader.s3_client, uploader.bucket_name)
+        print(f"🔎 Listed {count} objects in R2")
+    return uploader
 
 def main():
     parser = argparse.ArgumentParser(description='Upload persona images to Cloudflare R2')
-    parser.add_argument('input', help='Input image path')
-    parser.add_argument('--persona', '-p', required=True, help='Persona name')
+    parser.add_argument('input', help='Input image path (or a folder of persona folders with --catalog)')
+    parser.add_argument('--persona', '-p', help='Persona name (required for a single image)')
+    parser.add_argument('--catalog', action='store_true',
+                        help='Upload the first image of every persona folder under input')
     parser.add_argument('--config', '-c', help='R2 config file path')
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_UPLOAD_WORKERS,
+                        help=f'Concurrent uploads (default: {DEFAULT_UPLOAD_WORKERS})')
+    parser.add_argument('--manifest', '-m', default=DEFAULT_MANIFEST_PATH,
+                        help=f'Rendition manifest used to skip unchanged versions (default: {DEFAULT_MANIFEST_PATH})')
+    parser.add_argument('--no-manifest', action='store_true',
+                        help='Upload every version without consulting or updating the manifest')
+    parser.add_argument('--force', '-f', action='store_true',
+                        help='Re-upload every version even if the manifest says it is unchanged')
+    parser.add_argument('--verify-remote', action='store_true',
+                        help='List R2 ETags first; re-upload versions that are missing or changed in R2 '
+                             'and adopt versions R2 already holds byte-for-byte')
     
     args = parser.parse_args()
     
+    if not args.catalog and not args.persona:
+        parser.error('--persona is required unless --catalog is given')
+    
     # Check if input file exists
     if not os.path.exists(args.input):
         print(f"❌ Error: Input file '{args.input}' not found")
         sys.exit(1)
     
+    if args.catalog:
+        try:
+            print(f"🚀 Uploading persona catalog to Cloudflare R2 ({args.workers} workers)")
+            print(f"📁 Input: {args.input}")
+            print()
+            uploader = create_uploader(args)
+            catalog = uploader.upload_catalog(args.input, force=args.force)
+            uploader.save_catalog_results(catalog, uploader.last_upload_stats)
+            if uploader.last_upload_stats['failed']:
+                sys.exit(1)
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            sys.exit(1)
+        return
+    
     print(f"🚀 Uploading persona image to Cloudflare R2")
     print(f"👤 Persona: {args.persona}")
     print(f"📁 Input: {args.input}")
     print()
     
     try:
-        uploader = PersonaImageUploader(args.config)
-        results = uploader.process_and_upload_image(args.input, args.persona)
+        uploader = create_uploader(args)
+        results = uploader.process_and_upload_image(args.input, args.persona, force=args.force)
         
         if results:
-            print(f"\n✨ Successfully uploaded {len(results)} images!")
+            skipped = sum(1 for result in results if result['skipped'])
+            print(f"\n✨ Successfully uploaded {len(results) - skipped} images ({skipped} unchanged)!")
             uploader.save_results(results, args.persona)
         else:
             print("\n❌ Upload failed")
@@ -204,4 +557,4 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()